@@ -0,0 +1,15 @@
+-- Migration 001: keyset pagination index for GET /books
+
+-- Matches ORDER BY created_at DESC, book_id DESC and the
+-- (created_at, book_id) < (cursor) seek predicate in BookRepository.get_books_page
+CREATE INDEX IF NOT EXISTS idx_books_created_at_book_id
+    ON books (created_at DESC, book_id DESC);
+
+-- The cursor carries created_at, and a NULL would sort first and never match the
+-- seek predicate, so the column is made NOT NULL. Rows without a creation time
+-- are dated to the epoch and therefore come last.
+BEGIN;
+UPDATE books SET created_at = 'epoch' WHERE created_at IS NULL;
+ALTER TABLE books ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE books ALTER COLUMN created_at SET NOT NULL;
+COMMIT;
@@ -0,0 +1,23 @@
+-- Migration 002: full-text and trigram search for GET /books/search
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Weighted document kept in sync by Postgres itself; 'simple' config so author
+-- names and ISBNs are not stemmed. Typo tolerance comes from pg_trgm instead.
+ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(isbn, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(author, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(genre, '') || ' ' || coalesce(publisher, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_books_search_vector ON books USING GIN (search_vector);
+
+-- Serve "title % $q" / "author % $q" fuzzy matching and "author ILIKE '%...%'" filters
+CREATE INDEX IF NOT EXISTS idx_books_title_trgm ON books USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_books_author_trgm ON books USING GIN (author gin_trgm_ops);
+
+-- Exact facet filters used alongside the text match
+CREATE INDEX IF NOT EXISTS idx_books_genre ON books (genre);
+CREATE INDEX IF NOT EXISTS idx_books_publication_year ON books (publication_year);
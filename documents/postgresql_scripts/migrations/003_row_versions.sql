@@ -0,0 +1,52 @@
+-- Migration 003: row versions and table change counters for ETags / conditional GET
+
+-- Per-row version, bumped on every UPDATE. Single resources use it as their ETag.
+ALTER TABLE books ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 1;
+ALTER TABLE members ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_row_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.row_version := OLD.row_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_books_row_version ON books;
+CREATE TRIGGER trg_books_row_version
+    BEFORE UPDATE ON books
+    FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS trg_members_row_version ON members;
+CREATE TRIGGER trg_members_row_version
+    BEFORE UPDATE ON members
+    FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+-- One counter per table, bumped once per writing statement. List ETags are
+-- derived from it, so an unchanged list is answered without scanning a row.
+-- Updated transactionally: readers never see a new version before the data.
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (table_name) VALUES ('books'), ('members')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_books_table_version ON books;
+CREATE TRIGGER trg_books_table_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON books
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_members_table_version ON members;
+CREATE TRIGGER trg_members_table_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON members
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
@@ -0,0 +1,31 @@
+-- Migration 004: maintained facet counts for GET /books/facets
+
+-- One row per (facet, value), e.g. ('genre', 'Fiction'). BookRepository applies
+-- +1/-1 deltas in the same transaction as every create/update/delete and bulk
+-- import. A facets request reads the top N values of each requested facet
+-- through idx_book_facets_facet_count: O(facets x N), not O(catalog).
+CREATE TABLE IF NOT EXISTS book_facets (
+    facet VARCHAR(30) NOT NULL CHECK (facet IN ('genre', 'author', 'publication_year')),
+    value TEXT NOT NULL,
+    book_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (facet, value)
+);
+
+-- Serves the per-facet ORDER BY book_count DESC, value LIMIT N as a bounded scan.
+-- Values whose count dropped to zero stay in the table but not in the index.
+-- Dropped first so re-running this migration upgrades the earlier definition.
+DROP INDEX IF EXISTS idx_book_facets_facet_count;
+CREATE INDEX idx_book_facets_facet_count
+    ON book_facets (facet, book_count DESC, value)
+    WHERE book_count > 0;
+
+-- Initial fill; POST /books/facets/rebuild runs the same aggregation on demand
+INSERT INTO book_facets (facet, value, book_count)
+SELECT facet, value, count(*)
+FROM books,
+     LATERAL (VALUES ('genre', genre),
+                     ('author', author),
+                     ('publication_year', publication_year::text)) AS f(facet, value)
+WHERE value IS NOT NULL
+GROUP BY facet, value
+ON CONFLICT (facet, value) DO UPDATE SET book_count = EXCLUDED.book_count;
@@ -0,0 +1,57 @@
+-- Migration 005: single round-trip, race-free book issue
+
+-- Called by BookTransactionRepository.issue_book. Returns one row whose outcome is
+-- 'issued', 'member_not_found', 'limit_reached', 'book_not_found' or 'unavailable'.
+--
+-- Each statement of a plpgsql function takes a fresh snapshot, so after the member
+-- row lock is granted the quota count sees every loan committed by a concurrent
+-- issue for the same member. The copy decrement is conditional, so copies can
+-- never go negative.
+CREATE OR REPLACE FUNCTION issue_book_atomic(
+    p_book_id INTEGER,
+    p_member_id INTEGER,
+    p_issue_date DATE,
+    p_due_date DATE,
+    p_max_books INTEGER
+) RETURNS TABLE (outcome TEXT, transaction_id INTEGER, issue_date DATE, due_date DATE) AS $$
+#variable_conflict use_column
+DECLARE
+    v_active INTEGER;
+    v_transaction book_transactions%ROWTYPE;
+BEGIN
+    PERFORM 1 FROM members m WHERE m.member_id = p_member_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'member_not_found'::TEXT, NULL::INTEGER, NULL::DATE, NULL::DATE;
+        RETURN;
+    END IF;
+
+    SELECT count(*) INTO v_active
+    FROM book_transactions bt
+    WHERE bt.member_id = p_member_id AND bt.status IN ('Issued', 'Overdue');
+
+    IF v_active >= p_max_books THEN
+        RETURN QUERY SELECT 'limit_reached'::TEXT, NULL::INTEGER, NULL::DATE, NULL::DATE;
+        RETURN;
+    END IF;
+
+    UPDATE books b
+    SET available_copies = b.available_copies - 1
+    WHERE b.book_id = p_book_id AND b.available_copies > 0;
+
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM books b WHERE b.book_id = p_book_id) THEN
+            RETURN QUERY SELECT 'unavailable'::TEXT, NULL::INTEGER, NULL::DATE, NULL::DATE;
+        ELSE
+            RETURN QUERY SELECT 'book_not_found'::TEXT, NULL::INTEGER, NULL::DATE, NULL::DATE;
+        END IF;
+        RETURN;
+    END IF;
+
+    INSERT INTO book_transactions (book_id, member_id, issue_date, due_date, status)
+    VALUES (p_book_id, p_member_id, p_issue_date, p_due_date, 'Issued')
+    RETURNING * INTO v_transaction;
+
+    RETURN QUERY SELECT 'issued'::TEXT, v_transaction.transaction_id,
+                        v_transaction.issue_date, v_transaction.due_date;
+END;
+$$ LANGUAGE plpgsql;
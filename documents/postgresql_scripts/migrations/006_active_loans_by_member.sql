@@ -0,0 +1,8 @@
+-- Migration 006: active-loan lookups by member
+
+-- Covers BookTransactionRepository.get_active_transactions_by_member and the
+-- quota counts in issue_book_atomic / issue_books_batch. Only open loans are
+-- indexed, so the index stays small however long members' histories grow.
+CREATE INDEX IF NOT EXISTS idx_book_transactions_member_active
+    ON book_transactions (member_id)
+    WHERE status IN ('Issued', 'Overdue');
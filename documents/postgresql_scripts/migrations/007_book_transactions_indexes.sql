@@ -0,0 +1,21 @@
+-- Migration 007: secondary indexes for the book_transactions hot queries
+
+-- Open loans of a book: is_book_available, get_book_issued_members
+CREATE INDEX IF NOT EXISTS idx_book_transactions_book_active
+    ON book_transactions (book_id)
+    WHERE status IN ('Issued', 'Overdue');
+
+-- Open loans by due date: get_active_transactions, get_overdue_transactions
+-- (ORDER BY due_date) and the overdue sweeper's update_overdue_status
+CREATE INDEX IF NOT EXISTS idx_book_transactions_due_active
+    ON book_transactions (due_date)
+    WHERE status IN ('Issued', 'Overdue');
+
+-- Full histories newest first: get_transactions_by_member / get_transactions_by_book
+CREATE INDEX IF NOT EXISTS idx_book_transactions_member_created
+    ON book_transactions (member_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_book_transactions_book_created
+    ON book_transactions (book_id, created_at DESC);
+
+ANALYZE book_transactions;
@@ -0,0 +1,192 @@
+-- Migration 008: monthly range partitioning of book_transactions by issue_date
+
+-- Rebuilds book_transactions as a partitioned table, creates the monthly
+-- partitions, and installs maintain_book_transaction_partitions(), which the app
+-- calls periodically (src/tasks/partition_maintenance.py).
+--
+-- Notes:
+--   * issue_date becomes NOT NULL and the primary key becomes
+--     (transaction_id, issue_date), because a partitioned table's unique keys must
+--     include the partition key. transaction_id stays unique because it comes from
+--     the sequence. Do not point foreign keys at book_transactions; they would
+--     block detaching partitions.
+--   * Open loans are never archived. Only partitions where every loan has been
+--     returned are detached, so active-loan queries only probe the small partial
+--     indexes of the attached partitions.
+--   * Run during a maintenance window: the copy rewrites the whole table.
+
+BEGIN;
+
+ALTER TABLE book_transactions RENAME TO book_transactions_legacy;
+ALTER TABLE book_transactions_legacy RENAME CONSTRAINT book_transactions_pkey TO book_transactions_legacy_pkey;
+
+CREATE TABLE book_transactions (
+    transaction_id INTEGER NOT NULL DEFAULT nextval('book_transactions_transaction_id_seq'),
+    book_id INTEGER REFERENCES books(book_id) ON DELETE CASCADE,
+    member_id INTEGER REFERENCES members(member_id) ON DELETE CASCADE,
+    issue_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    due_date DATE NOT NULL,
+    return_date DATE,
+    status VARCHAR(20) DEFAULT 'Issued' CHECK (status IN ('Issued', 'Returned', 'Overdue')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (transaction_id, issue_date)
+) PARTITION BY RANGE (issue_date);
+
+ALTER SEQUENCE book_transactions_transaction_id_seq OWNED BY book_transactions.transaction_id;
+
+-- Catches anything outside the monthly partitions; maintenance moves such rows
+-- into a proper partition once it is created.
+CREATE TABLE book_transactions_default PARTITION OF book_transactions DEFAULT;
+
+CREATE SCHEMA IF NOT EXISTS archive;
+
+-- Partitions are named book_transactions_pYYYY_MM and cover one calendar month.
+CREATE OR REPLACE FUNCTION create_book_transaction_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_stop DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    v_name TEXT := format('book_transactions_p%s', to_char(v_start, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Built standalone and attached, so rows that landed in the default
+    -- partition for this month can be moved in first.
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE book_transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name
+    );
+    EXECUTE format(
+        'ALTER TABLE %I ADD CONSTRAINT %I CHECK (issue_date >= %L AND issue_date < %L)',
+        v_name, v_name || '_bounds', v_start, v_stop
+    );
+    EXECUTE format(
+        'WITH moved AS (
+             DELETE FROM book_transactions_default
+             WHERE issue_date >= %L AND issue_date < %L
+             RETURNING *
+         )
+         INSERT INTO %I SELECT * FROM moved',
+        v_start, v_stop, v_name
+    );
+    EXECUTE format(
+        'ALTER TABLE book_transactions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_stop
+    );
+    -- The bounds check only exists to let ATTACH skip its validation scan
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_name, v_name || '_bounds');
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Creates the partitions for the current month and the next p_months_ahead months.
+-- Detaches partitions that ended more than p_archive_after_months ago once all
+-- their loans are returned, and moves them into the archive schema; a NULL
+-- p_archive_after_months skips archiving. Returns one row per action taken.
+--
+-- Every worker runs this periodically, so runs are serialized on an advisory
+-- lock: a run that finds another one in progress returns without doing anything.
+CREATE OR REPLACE FUNCTION maintain_book_transaction_partitions(
+    p_months_ahead INTEGER DEFAULT 3,
+    p_archive_after_months INTEGER DEFAULT 24
+) RETURNS TABLE (action TEXT, partition_name TEXT) AS $$
+DECLARE
+    v_month DATE;
+    v_created TEXT;
+    v_cutoff DATE;
+    v_partition RECORD;
+    v_open BOOLEAN;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('maintain_book_transaction_partitions')) THEN
+        RETURN;
+    END IF;
+
+    FOR i IN 0..p_months_ahead LOOP
+        v_month := (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::DATE;
+        v_created := create_book_transaction_partition(v_month);
+        IF v_created IS NOT NULL THEN
+            action := 'created';
+            partition_name := v_created;
+            RETURN NEXT;
+        END IF;
+    END LOOP;
+
+    IF p_archive_after_months IS NULL THEN
+        RETURN;
+    END IF;
+    v_cutoff := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_archive_after_months))::DATE;
+
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'book_transactions'::regclass
+          AND c.relname ~ '^book_transactions_p[0-9]{4}_[0-9]{2}$'
+          AND (to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month')::DATE <= v_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE return_date IS NULL)', v_partition.relname)
+            INTO v_open;
+        CONTINUE WHEN v_open;
+
+        EXECUTE format('ALTER TABLE book_transactions DETACH PARTITION %I', v_partition.relname);
+        EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_partition.relname);
+        action := 'archived';
+        partition_name := v_partition.relname;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One partition for every month that already has history, plus the months ahead
+DO $$
+DECLARE
+    v_first DATE;
+BEGIN
+    SELECT date_trunc('month', min(COALESCE(issue_date, created_at::DATE, CURRENT_DATE)))::DATE
+    INTO v_first
+    FROM book_transactions_legacy;
+
+    WHILE v_first IS NOT NULL AND v_first < date_trunc('month', CURRENT_DATE) LOOP
+        PERFORM create_book_transaction_partition(v_first);
+        v_first := (v_first + INTERVAL '1 month')::DATE;
+    END LOOP;
+END;
+$$;
+
+-- Nothing is archived while the history is still being copied
+SELECT * FROM maintain_book_transaction_partitions(3, NULL);
+
+INSERT INTO book_transactions
+    (transaction_id, book_id, member_id, issue_date, due_date, return_date, status, created_at)
+SELECT transaction_id, book_id, member_id,
+       COALESCE(issue_date, created_at::DATE, CURRENT_DATE),
+       due_date, return_date, status, created_at
+FROM book_transactions_legacy;
+
+DROP TABLE book_transactions_legacy;
+
+-- Indexes from migrations 006 and 007, recreated on the partitioned table.
+-- Partitioned indexes are cloned onto every current and future partition.
+CREATE INDEX IF NOT EXISTS idx_book_transactions_member_active
+    ON book_transactions (member_id)
+    WHERE status IN ('Issued', 'Overdue');
+
+CREATE INDEX IF NOT EXISTS idx_book_transactions_book_active
+    ON book_transactions (book_id)
+    WHERE status IN ('Issued', 'Overdue');
+
+CREATE INDEX IF NOT EXISTS idx_book_transactions_due_active
+    ON book_transactions (due_date)
+    WHERE status IN ('Issued', 'Overdue');
+
+CREATE INDEX IF NOT EXISTS idx_book_transactions_member_created
+    ON book_transactions (member_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_book_transactions_book_created
+    ON book_transactions (book_id, created_at DESC);
+
+COMMIT;
+
+ANALYZE book_transactions;
@@ -0,0 +1,16 @@
+-- Migration 009: keyset pagination index for GET /transactions
+
+-- Matches ORDER BY created_at DESC, transaction_id DESC and the
+-- (created_at, transaction_id) < (cursor) seek predicate in
+-- BookTransactionRepository.get_transactions_page. Member / book filtered
+-- pages use the (member_id, created_at) / (book_id, created_at) indexes from 007.
+CREATE INDEX IF NOT EXISTS idx_book_transactions_created_at_transaction_id
+    ON book_transactions (created_at DESC, transaction_id DESC);
+
+-- The cursor carries created_at, so the column must never be NULL: such a row
+-- would sort first and never match the seek predicate. Old rows without one
+-- take the start of their issue date.
+BEGIN;
+UPDATE book_transactions SET created_at = issue_date::TIMESTAMP WHERE created_at IS NULL;
+ALTER TABLE book_transactions ALTER COLUMN created_at SET NOT NULL;
+COMMIT;
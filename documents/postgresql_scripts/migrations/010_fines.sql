@@ -0,0 +1,29 @@
+-- Migration 010: fines ledger for the overdue fine engine
+
+-- The fines table in Library_sql_script.txt references borrowing_records, which
+-- does not exist, so the ledger is created here against book_transactions.
+--
+-- transaction_id deliberately has no foreign key: book_transactions is
+-- partitioned (migration 008) and old partitions are detached to the archive
+-- schema, which a foreign key would block. Fines outlive archived loans.
+CREATE TABLE IF NOT EXISTS fines (
+    fine_id BIGSERIAL PRIMARY KEY,
+    transaction_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL REFERENCES members(member_id) ON DELETE CASCADE,
+    days_overdue INTEGER NOT NULL,
+    amount NUMERIC(10, 2) NOT NULL,
+    fine_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    paid_date DATE,
+    reason VARCHAR(100) NOT NULL DEFAULT 'Overdue',
+    status VARCHAR(20) NOT NULL DEFAULT 'Unpaid' CHECK (status IN ('Unpaid', 'Paid', 'Waived')),
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- One fine per loan and reason; the assessment upserts on it
+    UNIQUE (transaction_id, reason)
+);
+
+CREATE INDEX IF NOT EXISTS idx_fines_member_id ON fines (member_id);
+
+-- Unpaid fines are re-assessed daily until the loan is returned
+CREATE INDEX IF NOT EXISTS idx_fines_unpaid
+    ON fines (transaction_id)
+    WHERE status = 'Unpaid';
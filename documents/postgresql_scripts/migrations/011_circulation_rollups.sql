@@ -0,0 +1,142 @@
+-- Migration 011: daily circulation rollups for GET /transactions/statistics
+
+-- Loans issued and returned per day, kept current by statement-level triggers
+-- on book_transactions. Range statistics read one row per day (per shard)
+-- instead of aggregating the loan history.
+--
+-- Every issue of the day updates the same day row, so the row is split into
+-- 16 shards picked by backend pid. Concurrent checkouts then rarely wait on
+-- each other's row lock; readers sum the shards.
+
+-- Writers are held off until the triggers and the backfill commit together,
+-- so no loan is counted twice or missed
+BEGIN;
+
+LOCK TABLE book_transactions IN SHARE ROW EXCLUSIVE MODE;
+
+CREATE TABLE IF NOT EXISTS circulation_daily_stats (
+    day DATE NOT NULL,
+    shard SMALLINT NOT NULL,
+    issued_count BIGINT NOT NULL DEFAULT 0,
+    returned_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, shard)
+);
+
+-- Issues per day per book / member, for the most borrowed book and most active member
+CREATE TABLE IF NOT EXISTS circulation_daily_book_stats (
+    day DATE NOT NULL,
+    book_id INTEGER NOT NULL,
+    issued_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, book_id)
+);
+
+CREATE TABLE IF NOT EXISTS circulation_daily_member_stats (
+    day DATE NOT NULL,
+    member_id INTEGER NOT NULL,
+    issued_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, member_id)
+);
+
+-- Applies the difference between the rows a statement wrote and the rows it
+-- replaced: a loan counts as issued on issue_date and as returned on
+-- return_date. That one rule covers inserts, returns, deletes and corrections.
+-- Detaching archived partitions fires no trigger, so history is kept.
+CREATE OR REPLACE FUNCTION rollup_circulation()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_new TEXT := 'SELECT issue_date AS day, book_id, member_id, 1 AS issued, 0 AS returned FROM new_rows
+                   UNION ALL
+                   SELECT return_date, NULL, NULL, 0, 1 FROM new_rows WHERE return_date IS NOT NULL';
+    v_old TEXT := 'SELECT issue_date AS day, book_id, member_id, -1 AS issued, 0 AS returned FROM old_rows
+                   UNION ALL
+                   SELECT return_date, NULL, NULL, 0, -1 FROM old_rows WHERE return_date IS NOT NULL';
+    v_delta TEXT;
+BEGIN
+    v_delta := CASE TG_OP
+        WHEN 'INSERT' THEN v_new
+        WHEN 'DELETE' THEN v_old
+        ELSE v_new || ' UNION ALL ' || v_old
+    END;
+
+    -- Transition tables are visible to EXECUTE, so one statement serves all three events
+    EXECUTE format($sql$
+        WITH delta AS (%s),
+        daily AS (
+            INSERT INTO circulation_daily_stats AS s (day, shard, issued_count, returned_count)
+            SELECT day, $1, sum(issued), sum(returned)
+            FROM delta
+            GROUP BY day
+            HAVING sum(issued) <> 0 OR sum(returned) <> 0
+            ON CONFLICT (day, shard) DO UPDATE
+            SET issued_count = s.issued_count + EXCLUDED.issued_count,
+                returned_count = s.returned_count + EXCLUDED.returned_count
+        ),
+        books AS (
+            INSERT INTO circulation_daily_book_stats AS s (day, book_id, issued_count)
+            SELECT day, book_id, sum(issued)
+            FROM delta
+            WHERE issued <> 0 AND book_id IS NOT NULL
+            GROUP BY day, book_id
+            HAVING sum(issued) <> 0
+            ON CONFLICT (day, book_id) DO UPDATE
+            SET issued_count = s.issued_count + EXCLUDED.issued_count
+        )
+        INSERT INTO circulation_daily_member_stats AS s (day, member_id, issued_count)
+        SELECT day, member_id, sum(issued)
+        FROM delta
+        WHERE issued <> 0 AND member_id IS NOT NULL
+        GROUP BY day, member_id
+        HAVING sum(issued) <> 0
+        ON CONFLICT (day, member_id) DO UPDATE
+        SET issued_count = s.issued_count + EXCLUDED.issued_count
+    $sql$, v_delta)
+    USING (pg_backend_pid() % 16)::SMALLINT;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow a single event per trigger, hence three triggers
+DROP TRIGGER IF EXISTS trg_book_transactions_rollup_insert ON book_transactions;
+CREATE TRIGGER trg_book_transactions_rollup_insert
+    AFTER INSERT ON book_transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_circulation();
+
+DROP TRIGGER IF EXISTS trg_book_transactions_rollup_update ON book_transactions;
+CREATE TRIGGER trg_book_transactions_rollup_update
+    AFTER UPDATE ON book_transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_circulation();
+
+DROP TRIGGER IF EXISTS trg_book_transactions_rollup_delete ON book_transactions;
+CREATE TRIGGER trg_book_transactions_rollup_delete
+    AFTER DELETE ON book_transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_circulation();
+
+-- One-off backfill from the existing history
+TRUNCATE circulation_daily_stats, circulation_daily_book_stats, circulation_daily_member_stats;
+
+INSERT INTO circulation_daily_stats (day, shard, issued_count, returned_count)
+SELECT day, 0, sum(issued), sum(returned)
+FROM (
+    SELECT issue_date AS day, 1 AS issued, 0 AS returned FROM book_transactions
+    UNION ALL
+    SELECT return_date, 0, 1 FROM book_transactions WHERE return_date IS NOT NULL
+) d
+GROUP BY day;
+
+INSERT INTO circulation_daily_book_stats (day, book_id, issued_count)
+SELECT issue_date, book_id, count(*)
+FROM book_transactions
+WHERE book_id IS NOT NULL
+GROUP BY issue_date, book_id;
+
+INSERT INTO circulation_daily_member_stats (day, member_id, issued_count)
+SELECT issue_date, member_id, count(*)
+FROM book_transactions
+WHERE member_id IS NOT NULL
+GROUP BY issue_date, member_id;
+
+COMMIT;
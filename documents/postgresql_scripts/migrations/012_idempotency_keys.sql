@@ -0,0 +1,19 @@
+-- Migration 012: Idempotency-Key storage for the issue / return endpoints
+
+-- One row per (endpoint scope, client key). The row is written in the same
+-- transaction as the request's own work, together with its response, so a
+-- committed row always means the work committed. Retries are answered from the
+-- stored response by a primary-key lookup; a retry racing the first request
+-- waits on the uncommitted row. Rows expire after IDEMPOTENCY_KEY_TTL_SECONDS
+-- and are purged by the idempotency cleanup task.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    response JSONB,
+    locked_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (scope, idempotency_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys (expires_at);
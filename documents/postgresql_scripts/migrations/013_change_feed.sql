@@ -0,0 +1,106 @@
+-- Migration 013: LISTEN/NOTIFY change feed for cross-worker cache invalidation
+
+-- Every writing statement on books, members and book_transactions sends one
+-- compact event on the library_changes channel, delivered at commit:
+--
+--     {"t": "books", "op": "UPDATE", "ids": [1, 2], "isbn": ["9780451524935"]}
+--
+-- ids holds the distinct values of the key column named by the first trigger
+-- argument. An optional second argument adds the distinct values of that column
+-- under its own name. TRUNCATE, and statements whose event would not fit in a
+-- NOTIFY payload, send {"t": ..., "op": ..., "all": true} instead. Each worker
+-- listens on a dedicated connection (src/tasks/change_feed.py).
+CREATE OR REPLACE FUNCTION notify_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_rows TEXT := CASE WHEN TG_OP = 'DELETE' THEN 'old_rows' ELSE 'new_rows' END;
+    v_ids JSONB;
+    v_extra JSONB;
+    v_payload TEXT;
+BEGIN
+    IF TG_OP <> 'TRUNCATE' THEN
+        EXECUTE format('SELECT jsonb_agg(DISTINCT %I) FROM %I', TG_ARGV[0], v_rows) INTO v_ids;
+        IF v_ids IS NULL THEN
+            -- The statement touched no rows
+            RETURN NULL;
+        END IF;
+
+        v_payload := jsonb_build_object('t', TG_TABLE_NAME, 'op', TG_OP, 'ids', v_ids)::TEXT;
+        IF TG_NARGS > 1 THEN
+            EXECUTE format('SELECT jsonb_agg(DISTINCT %I) FROM %I WHERE %I IS NOT NULL', TG_ARGV[1], v_rows, TG_ARGV[1])
+                INTO v_extra;
+            v_payload := (v_payload::JSONB || jsonb_build_object(TG_ARGV[1], COALESCE(v_extra, '[]'::JSONB)))::TEXT;
+        END IF;
+    END IF;
+
+    -- NOTIFY payloads are limited to 8000 bytes
+    IF v_payload IS NULL OR octet_length(v_payload) > 7900 THEN
+        v_payload := jsonb_build_object('t', TG_TABLE_NAME, 'op', TG_OP, 'all', true)::TEXT;
+    END IF;
+
+    PERFORM pg_notify('library_changes', v_payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow a single event per trigger, hence one trigger per event
+DROP TRIGGER IF EXISTS trg_books_notify_insert ON books;
+CREATE TRIGGER trg_books_notify_insert
+    AFTER INSERT ON books REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id', 'isbn');
+
+DROP TRIGGER IF EXISTS trg_books_notify_update ON books;
+CREATE TRIGGER trg_books_notify_update
+    AFTER UPDATE ON books REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id', 'isbn');
+
+DROP TRIGGER IF EXISTS trg_books_notify_delete ON books;
+CREATE TRIGGER trg_books_notify_delete
+    AFTER DELETE ON books REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id', 'isbn');
+
+DROP TRIGGER IF EXISTS trg_books_notify_truncate ON books;
+CREATE TRIGGER trg_books_notify_truncate
+    AFTER TRUNCATE ON books
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id');
+
+DROP TRIGGER IF EXISTS trg_members_notify_insert ON members;
+CREATE TRIGGER trg_members_notify_insert
+    AFTER INSERT ON members REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('member_id');
+
+DROP TRIGGER IF EXISTS trg_members_notify_update ON members;
+CREATE TRIGGER trg_members_notify_update
+    AFTER UPDATE ON members REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('member_id');
+
+DROP TRIGGER IF EXISTS trg_members_notify_delete ON members;
+CREATE TRIGGER trg_members_notify_delete
+    AFTER DELETE ON members REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('member_id');
+
+DROP TRIGGER IF EXISTS trg_members_notify_truncate ON members;
+CREATE TRIGGER trg_members_notify_truncate
+    AFTER TRUNCATE ON members
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('member_id');
+
+-- Loan events carry the affected book ids, the key availability caches care about
+DROP TRIGGER IF EXISTS trg_book_transactions_notify_insert ON book_transactions;
+CREATE TRIGGER trg_book_transactions_notify_insert
+    AFTER INSERT ON book_transactions REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id');
+
+DROP TRIGGER IF EXISTS trg_book_transactions_notify_update ON book_transactions;
+CREATE TRIGGER trg_book_transactions_notify_update
+    AFTER UPDATE ON book_transactions REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id');
+
+DROP TRIGGER IF EXISTS trg_book_transactions_notify_delete ON book_transactions;
+CREATE TRIGGER trg_book_transactions_notify_delete
+    AFTER DELETE ON book_transactions REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id');
+
+DROP TRIGGER IF EXISTS trg_book_transactions_notify_truncate ON book_transactions;
+CREATE TRIGGER trg_book_transactions_notify_truncate
+    AFTER TRUNCATE ON book_transactions
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_change('book_id');
@@ -0,0 +1,70 @@
+-- Migration 014: store ISBNs as canonical ISBN-13
+
+-- GET /books/isbn/{isbn} matches the digit-only ISBN-13 and ISBN-10 spellings
+-- through the UNIQUE index on books.isbn, so a book stored as "0-7432-7356-7"
+-- was never found. The app now canonicalizes valid ISBNs on every write
+-- (src/models/book_model.py); this migration rewrites the existing rows.
+-- Values that are not valid ISBNs are left as they are.
+
+BEGIN;
+
+-- Mirrors normalize_isbn() in src/utils/isbn.py: the ISBN-13 for an ISBN-10 or
+-- ISBN-13 with optional hyphens / spaces, or NULL if the check digit is wrong
+CREATE OR REPLACE FUNCTION normalize_isbn(p_raw TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_isbn TEXT := upper(regexp_replace(p_raw, '[\s-]', '', 'g'));
+    v_body TEXT;
+    v_sum INTEGER := 0;
+    v_check TEXT;
+BEGIN
+    IF v_isbn ~ '^[0-9]{9}[0-9X]$' THEN
+        FOR i IN 1..9 LOOP
+            v_sum := v_sum + (11 - i) * substr(v_isbn, i, 1)::INTEGER;
+        END LOOP;
+        v_check := CASE (11 - v_sum % 11) % 11 WHEN 10 THEN 'X' ELSE ((11 - v_sum % 11) % 11)::TEXT END;
+        IF v_check <> right(v_isbn, 1) THEN
+            RETURN NULL;
+        END IF;
+        v_body := '978' || left(v_isbn, 9);
+    ELSIF v_isbn ~ '^97[89][0-9]{10}$' THEN
+        v_body := left(v_isbn, 12);
+    ELSE
+        RETURN NULL;
+    END IF;
+
+    v_sum := 0;
+    FOR i IN 1..12 LOOP
+        v_sum := v_sum + substr(v_body, i, 1)::INTEGER * CASE WHEN i % 2 = 1 THEN 1 ELSE 3 END;
+    END LOOP;
+    v_check := ((10 - v_sum % 10) % 10)::TEXT;
+    IF length(v_isbn) = 13 AND v_check <> right(v_isbn, 1) THEN
+        RETURN NULL;
+    END IF;
+    RETURN v_body || v_check;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- When several rows spell the same ISBN, only the oldest is rewritten, and only
+-- if no row already holds the canonical value; the UNIQUE index would reject the
+-- rest. Those duplicates are listed by the query at the end and need a manual merge.
+UPDATE books b
+SET isbn = n.isbn13
+FROM (
+    SELECT book_id, normalize_isbn(isbn) AS isbn13,
+           row_number() OVER (PARTITION BY normalize_isbn(isbn) ORDER BY book_id) AS rn
+    FROM books
+    WHERE isbn IS NOT NULL
+) n
+WHERE b.book_id = n.book_id
+  AND n.isbn13 IS NOT NULL
+  AND n.rn = 1
+  AND b.isbn <> n.isbn13
+  AND NOT EXISTS (SELECT 1 FROM books o WHERE o.isbn = n.isbn13);
+
+COMMIT;
+
+SELECT book_id, isbn, normalize_isbn(isbn) AS canonical_isbn
+FROM books
+WHERE normalize_isbn(isbn) IS NOT NULL AND isbn <> normalize_isbn(isbn)
+ORDER BY canonical_isbn, book_id;
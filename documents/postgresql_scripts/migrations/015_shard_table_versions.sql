@@ -0,0 +1,31 @@
+-- Migration 015: shard the table change counters from migration 003
+
+-- Every statement writing books, including each checkout and return, bumped the
+-- same table_versions row, so all circulation queued on one row lock held until
+-- commit. The counter is split into 16 shards picked by backend pid, like the
+-- rollups of migration 011; readers sum the shards. Every write still raises
+-- the sum by one, so list ETags change exactly as before.
+
+BEGIN;
+
+ALTER TABLE table_versions ADD COLUMN IF NOT EXISTS shard SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE table_versions DROP CONSTRAINT IF EXISTS table_versions_pkey;
+ALTER TABLE table_versions ADD CONSTRAINT table_versions_pkey PRIMARY KEY (table_name, shard);
+
+-- Shard 0 keeps the current count; the other shards start from zero
+INSERT INTO table_versions (table_name, shard)
+SELECT t.table_name, s.shard
+FROM (SELECT DISTINCT table_name FROM table_versions) t,
+     generate_series(1, 15) AS s(shard)
+ON CONFLICT (table_name, shard) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1
+    WHERE table_name = TG_TABLE_NAME AND shard = pg_backend_pid() % 16;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
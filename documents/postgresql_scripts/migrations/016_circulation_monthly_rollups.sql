@@ -0,0 +1,119 @@
+-- Migration 016: monthly per-book / per-member circulation rollups
+
+-- The daily per-book and per-member rollups of migration 011 hold about one row
+-- per loan, so ranking the most borrowed book or most active member over a year
+-- still grouped millions of rows. These monthly tables carry the same counts at
+-- month grain: CirculationStatsRepository answers the whole months of a range
+-- from them and reads daily rows only for the partial months at its edges.
+--
+-- A monthly row is only contended by loans of the same book (or member) in the
+-- same month, and those already serialize on the books (members) row lock.
+
+BEGIN;
+
+LOCK TABLE book_transactions IN SHARE ROW EXCLUSIVE MODE;
+
+CREATE TABLE IF NOT EXISTS circulation_monthly_book_stats (
+    month DATE NOT NULL,
+    book_id INTEGER NOT NULL,
+    issued_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, book_id)
+);
+
+CREATE TABLE IF NOT EXISTS circulation_monthly_member_stats (
+    month DATE NOT NULL,
+    member_id INTEGER NOT NULL,
+    issued_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, member_id)
+);
+
+-- Same as migration 011, plus the two monthly upserts
+CREATE OR REPLACE FUNCTION rollup_circulation()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_new TEXT := 'SELECT issue_date AS day, book_id, member_id, 1 AS issued, 0 AS returned FROM new_rows
+                   UNION ALL
+                   SELECT return_date, NULL, NULL, 0, 1 FROM new_rows WHERE return_date IS NOT NULL';
+    v_old TEXT := 'SELECT issue_date AS day, book_id, member_id, -1 AS issued, 0 AS returned FROM old_rows
+                   UNION ALL
+                   SELECT return_date, NULL, NULL, 0, -1 FROM old_rows WHERE return_date IS NOT NULL';
+    v_delta TEXT;
+BEGIN
+    v_delta := CASE TG_OP
+        WHEN 'INSERT' THEN v_new
+        WHEN 'DELETE' THEN v_old
+        ELSE v_new || ' UNION ALL ' || v_old
+    END;
+
+    -- Transition tables are visible to EXECUTE, so one statement serves all three events
+    EXECUTE format($sql$
+        WITH delta AS (%s),
+        daily AS (
+            INSERT INTO circulation_daily_stats AS s (day, shard, issued_count, returned_count)
+            SELECT day, $1, sum(issued), sum(returned)
+            FROM delta
+            GROUP BY day
+            HAVING sum(issued) <> 0 OR sum(returned) <> 0
+            ON CONFLICT (day, shard) DO UPDATE
+            SET issued_count = s.issued_count + EXCLUDED.issued_count,
+                returned_count = s.returned_count + EXCLUDED.returned_count
+        ),
+        books AS (
+            INSERT INTO circulation_daily_book_stats AS s (day, book_id, issued_count)
+            SELECT day, book_id, sum(issued)
+            FROM delta
+            WHERE issued <> 0 AND book_id IS NOT NULL
+            GROUP BY day, book_id
+            HAVING sum(issued) <> 0
+            ON CONFLICT (day, book_id) DO UPDATE
+            SET issued_count = s.issued_count + EXCLUDED.issued_count
+        ),
+        monthly_books AS (
+            INSERT INTO circulation_monthly_book_stats AS s (month, book_id, issued_count)
+            SELECT date_trunc('month', day)::DATE, book_id, sum(issued)
+            FROM delta
+            WHERE issued <> 0 AND book_id IS NOT NULL
+            GROUP BY 1, book_id
+            HAVING sum(issued) <> 0
+            ON CONFLICT (month, book_id) DO UPDATE
+            SET issued_count = s.issued_count + EXCLUDED.issued_count
+        ),
+        members AS (
+            INSERT INTO circulation_daily_member_stats AS s (day, member_id, issued_count)
+            SELECT day, member_id, sum(issued)
+            FROM delta
+            WHERE issued <> 0 AND member_id IS NOT NULL
+            GROUP BY day, member_id
+            HAVING sum(issued) <> 0
+            ON CONFLICT (day, member_id) DO UPDATE
+            SET issued_count = s.issued_count + EXCLUDED.issued_count
+        )
+        INSERT INTO circulation_monthly_member_stats AS s (month, member_id, issued_count)
+        SELECT date_trunc('month', day)::DATE, member_id, sum(issued)
+        FROM delta
+        WHERE issued <> 0 AND member_id IS NOT NULL
+        GROUP BY 1, member_id
+        HAVING sum(issued) <> 0
+        ON CONFLICT (month, member_id) DO UPDATE
+        SET issued_count = s.issued_count + EXCLUDED.issued_count
+    $sql$, v_delta)
+    USING (pg_backend_pid() % 16)::SMALLINT;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-off backfill from the daily rollups
+TRUNCATE circulation_monthly_book_stats, circulation_monthly_member_stats;
+
+INSERT INTO circulation_monthly_book_stats (month, book_id, issued_count)
+SELECT date_trunc('month', day)::DATE, book_id, sum(issued_count)
+FROM circulation_daily_book_stats
+GROUP BY 1, book_id;
+
+INSERT INTO circulation_monthly_member_stats (month, member_id, issued_count)
+SELECT date_trunc('month', day)::DATE, member_id, sum(issued_count)
+FROM circulation_daily_member_stats
+GROUP BY 1, member_id;
+
+COMMIT;
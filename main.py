@@ -10,13 +10,38 @@ logger = logging.getLogger(__name__)
 # Call the logging methods
 logger.info("Configuration loaded successfully and application started.")
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.routes.book_routes import router as book_router
 from src.routes.member_routes import router as member_router
 from src.routes.book_transaction_routes import router as book_transaction_router
-
-app = FastAPI()
+from src.routes.fine_routes import router as fine_router
+from src.db import close_db
+from src.tasks.overdue_sweeper import run_overdue_sweeper
+from src.tasks.partition_maintenance import run_partition_maintenance
+from src.tasks.idempotency_cleanup import run_idempotency_cleanup
+from src.tasks.change_feed import run_change_feed
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = [
+        asyncio.create_task(run_overdue_sweeper()),
+        asyncio.create_task(run_partition_maintenance()),
+        asyncio.create_task(run_idempotency_cleanup()),
+        asyncio.create_task(run_change_feed()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await close_db()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # ✅ Add CORS middleware
 app.add_middleware(
@@ -30,6 +55,7 @@ app.add_middleware(
 app.include_router(book_router)
 app.include_router(member_router)
 app.include_router(book_transaction_router)
+app.include_router(fine_router)
 
 
 @app.get("/")
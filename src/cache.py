@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from src.config.book_library_config import BookLibraryConfig
+from src.utils.isbn import normalize_isbn
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Only ever touched from the event loop, so no locking is needed. Readers
+    that fill the cache after an ``await`` should pass the ``generation`` they
+    saw before the database call to :meth:`set`; if anything was invalidated in
+    the meantime the fill is dropped instead of caching a row that is already stale.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self.generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Book rows keyed by book_id, read through by BookService.get_book
+book_cache = TTLCache(BookLibraryConfig.BOOK_CACHE_MAX_SIZE, BookLibraryConfig.BOOK_CACHE_TTL_SECONDS)
+
+# Canonical ISBN-13s known not to exist, so repeated unknown-barcode scans stay off the database
+isbn_miss_cache = TTLCache(BookLibraryConfig.ISBN_MISS_CACHE_MAX_SIZE, BookLibraryConfig.ISBN_MISS_CACHE_TTL_SECONDS)
+
+
+def invalidate_books(event: dict) -> None:
+    """Change feed callback for the books table.
+
+    ``event["ids"]`` is None when the whole table may have changed.
+    """
+    if event["ids"] is None:
+        book_cache.clear()
+        isbn_miss_cache.clear()
+        return
+
+    book_cache.invalidate(*event["ids"])
+    if event["op"] in ("INSERT", "UPDATE"):
+        # A book written with one of these ISBNs exists now
+        isbns = {normalize_isbn(isbn) for isbn in event.get("isbn") or []}
+        isbns.discard(None)
+        if isbns:
+            isbn_miss_cache.invalidate(*isbns)
@@ -17,4 +17,38 @@ class BookLibraryConfig:
 
     # Book settings
     MAX_BORROW_DURATION = 30  # Maximum total days a book can be borrowed
-    RESERVATION_HOLD_DAYS = 3  # Days to hold a reserved book
\ No newline at end of file
+    RESERVATION_HOLD_DAYS = 3  # Days to hold a reserved book
+
+    # API settings
+    DEFAULT_PAGE_SIZE = 50  # Rows per page when the client does not send a limit
+    MAX_PAGE_SIZE = 200  # Upper bound for any client supplied limit
+    SEARCH_PAGE_SIZE = 20  # Default page size for /books/search
+    BATCH_GET_MAX_IDS = 500  # Most ids accepted by one :batchGet call
+    BATCH_RETURN_MAX_IDS = 1000  # Most transactions accepted by one POST /transactions/return/batch
+    FACET_VALUES_LIMIT = 20  # Values returned per facet by /books/facets
+    STATISTICS_DEFAULT_DAYS = 30  # Range of /transactions/statistics when no from_date is given
+    EXPORT_FETCH_SIZE = 1000  # Rows fetched per server-side cursor round trip during exports
+    IMPORT_MAX_ROWS = 250000  # Largest upload accepted by POST /books/import
+
+    # Background task settings
+    OVERDUE_SWEEP_INTERVAL_SECONDS = 3600  # Overdue sweep period; a sweep also runs right after midnight
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS = 86400  # How often transaction partitions are created / archived
+    PARTITION_MONTHS_AHEAD = 3  # Monthly book_transactions partitions kept ready ahead of today
+    PARTITION_ARCHIVE_AFTER_MONTHS = 24  # Fully returned partitions older than this are detached to the archive schema; None keeps them
+
+    # Idempotency settings
+    IDEMPOTENCY_KEY_TTL_SECONDS = 86400  # How long a stored result answers retries with the same key
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS = 3600  # How often expired keys are purged
+    IDEMPOTENCY_CLEANUP_BATCH_SIZE = 5000  # Rows deleted per cleanup statement
+
+    # Change feed settings
+    CHANGE_FEED_CHANNEL = "library_changes"  # NOTIFY channel written by the triggers of migration 013
+    CHANGE_FEED_KEEPALIVE_SECONDS = 30  # Idle time after which the listener connection is probed
+    CHANGE_FEED_PROBE_TIMEOUT_SECONDS = 10  # A probe without an answer by then counts as a lost connection
+    CHANGE_FEED_RECONNECT_MAX_SECONDS = 30  # Longest wait between reconnect attempts
+
+    # Cache settings
+    BOOK_CACHE_MAX_SIZE = 10000  # Book rows kept in each worker's in-process cache
+    BOOK_CACHE_TTL_SECONDS = 300  # Safety net only; other workers' writes arrive through the change feed
+    ISBN_MISS_CACHE_MAX_SIZE = 50000  # Unknown ISBNs remembered per worker
+    ISBN_MISS_CACHE_TTL_SECONDS = 600  # How long an unknown ISBN is answered without the database
@@ -1,5 +1,8 @@
+from typing import List, Optional
+
 from src.services.book_service import BookService
-from src.models.book_model import Book
+from src.models.book_model import Book, BookFacet
+from src.utils.serialization import DataFormat
 
 class BookController:
 
@@ -8,12 +11,46 @@ class BookController:
         return await BookService.add_book(book)
 
     @staticmethod
-    async def get_book(book_id: int):
-        return await BookService.get_book(book_id)
+    async def import_books(payload: bytes, fmt: DataFormat):
+        return await BookService.import_books(payload, fmt)
+
+    @staticmethod
+    async def batch_get_books(book_ids: List[int]):
+        return await BookService.batch_get_books(book_ids)
+
+    @staticmethod
+    async def get_book(book_id: int, if_none_match: Optional[str] = None):
+        return await BookService.get_book_conditional(book_id, if_none_match)
+
+    @staticmethod
+    async def list_books(limit: Optional[int] = None, cursor: Optional[str] = None,
+                         fields: Optional[str] = None, if_none_match: Optional[str] = None):
+        return await BookService.list_books_conditional(limit, cursor, fields, if_none_match)
+
+    @staticmethod
+    async def search_books(query: Optional[str], genre: Optional[str], author: Optional[str],
+                           publication_year: Optional[int], page: int, page_size: int):
+        return await BookService.search_books(query, genre, author, publication_year, page, page_size)
+
+    @staticmethod
+    async def get_facets(facets: Optional[List[BookFacet]], limit: int):
+        return await BookService.get_facets(facets, limit)
+
+    @staticmethod
+    async def rebuild_facets():
+        return await BookService.rebuild_facets()
+
+    @staticmethod
+    async def export_books(fmt: DataFormat):
+        return await BookService.export_books(fmt)
+
+    @staticmethod
+    async def get_book_by_isbn(isbn: str):
+        return await BookService.get_book_by_isbn(isbn)
 
     @staticmethod
-    async def list_books():
-        return await BookService.list_books()
+    async def cache_stats():
+        return await BookService.cache_stats()
 
     @staticmethod
     async def update_book(book_id: int, book: Book):
@@ -1,25 +1,77 @@
 import logging
+from datetime import date
+from typing import List, Optional
+from src.models.book_transaction import TransactionStatus
 from src.services.book_transaction_service import BookTransactionService
+from src.services.idempotency_service import IdempotencyService
 
 logger = logging.getLogger(__name__)
 
 class BookTransactionController:
 
     @staticmethod
-    async def issue_book(book_id: int, member_id: int):
-        return await BookTransactionService.issue_book(book_id, member_id)
+    async def issue_book(book_id: int, member_id: int, idempotency_key: Optional[str] = None):
+        operation = lambda: BookTransactionService.issue_book(book_id, member_id)
+        if idempotency_key is None:
+            return await operation()
+        return await IdempotencyService.run("issue", idempotency_key, f"{book_id}:{member_id}", operation)
 
     @staticmethod
-    async def return_book(transaction_id: int):
-        return await BookTransactionService.return_book(transaction_id)
+    async def issue_books_batch(member_id: int, book_ids: List[int], idempotency_key: Optional[str] = None):
+        operation = lambda: BookTransactionService.issue_books_batch(member_id, book_ids)
+        if idempotency_key is None:
+            return await operation()
+        fingerprint = f"{member_id}:{','.join(map(str, book_ids))}"
+        return await IdempotencyService.run("issue_batch", idempotency_key, fingerprint, operation)
 
     @staticmethod
-    async def get_issued_books():
-        return await BookTransactionService.get_issued_books()
+    async def return_book(transaction_id: int, idempotency_key: Optional[str] = None):
+        operation = lambda: BookTransactionService.return_book(transaction_id)
+        if idempotency_key is None:
+            return await operation()
+        return await IdempotencyService.run("return", idempotency_key, str(transaction_id), operation)
 
     @staticmethod
-    async def get_overdue_books():
-        return await BookTransactionService.get_overdue_books()
+    async def return_books_batch(transaction_ids: List[int]):
+        return await BookTransactionService.return_books_batch(transaction_ids)
+
+    @staticmethod
+    async def renew_book(transaction_id: int, days: Optional[int] = None):
+        return await BookTransactionService.renew_book(transaction_id, days)
+
+    @staticmethod
+    async def renew_member_loans(member_id: int, days: Optional[int] = None):
+        return await BookTransactionService.renew_member_loans(member_id, days)
+
+    @staticmethod
+    async def list_transactions(limit: Optional[int], cursor: Optional[str], status: Optional[TransactionStatus],
+                                member_id: Optional[int], book_id: Optional[int], from_date: Optional[date],
+                                to_date: Optional[date], fields: Optional[str]):
+        return await BookTransactionService.list_transactions(
+            limit, cursor, status, member_id, book_id, from_date, to_date, fields
+        )
+
+    @staticmethod
+    async def get_member_history(member_id: int, from_date: Optional[date], to_date: Optional[date],
+                                 cursor: Optional[str], limit: Optional[int]):
+        return await BookTransactionService.get_member_history(member_id, from_date, to_date, cursor, limit)
+
+    @staticmethod
+    async def get_book_history(book_id: int, from_date: Optional[date], to_date: Optional[date],
+                               cursor: Optional[str], limit: Optional[int]):
+        return await BookTransactionService.get_book_history(book_id, from_date, to_date, cursor, limit)
+
+    @staticmethod
+    async def get_statistics(from_date: Optional[date], to_date: Optional[date]):
+        return await BookTransactionService.get_statistics(from_date, to_date)
+
+    @staticmethod
+    async def get_issued_books(fields: Optional[str] = None, include_details: bool = False):
+        return await BookTransactionService.get_issued_books(fields, include_details)
+
+    @staticmethod
+    async def get_overdue_books(fields: Optional[str] = None, include_details: bool = False):
+        return await BookTransactionService.get_overdue_books(fields, include_details)
 
     @staticmethod
     async def get_member_issued_books(member_id: int):
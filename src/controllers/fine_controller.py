@@ -0,0 +1,22 @@
+from typing import Optional
+
+from src.models.fine_model import FineStatus
+from src.services.fine_service import FineService
+
+class FineController:
+
+    @staticmethod
+    async def assess_fines():
+        return await FineService.assess_fines()
+
+    @staticmethod
+    async def get_member_fines(member_id: int, status: Optional[FineStatus] = None):
+        return await FineService.get_member_fines(member_id, status)
+
+    @staticmethod
+    async def pay_fine(fine_id: int):
+        return await FineService.pay_fine(fine_id)
+
+    @staticmethod
+    async def waive_fine(fine_id: int):
+        return await FineService.waive_fine(fine_id)
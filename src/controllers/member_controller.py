@@ -1,5 +1,8 @@
+from typing import List, Optional
+
 from src.services.member_service import MemberService
 from src.models.member_model import Member
+from src.utils.serialization import DataFormat
 
 class MemberController:
 
@@ -8,12 +11,20 @@ class MemberController:
         return await MemberService.create_member(member)
 
     @staticmethod
-    async def get_member(member_id: int):
-        return await MemberService.get_member(member_id)
+    async def batch_get_members(member_ids: List[int]):
+        return await MemberService.batch_get_members(member_ids)
+
+    @staticmethod
+    async def get_member(member_id: int, if_none_match: Optional[str] = None):
+        return await MemberService.get_member_conditional(member_id, if_none_match)
+
+    @staticmethod
+    async def list_members(fields: Optional[str] = None, if_none_match: Optional[str] = None):
+        return await MemberService.get_all_members_conditional(fields, if_none_match)
 
     @staticmethod
-    async def list_members():
-        return await MemberService.get_all_members()
+    async def export_members(fmt: DataFormat):
+        return await MemberService.export_members(fmt)
 
     @staticmethod
     async def update_member(member_id: int, member: Member):
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from src.config.book_library_config import BookLibraryConfig
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BookLibraryConfig.BATCH_GET_MAX_IDS)
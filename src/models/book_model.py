@@ -1,6 +1,14 @@
-from pydantic import BaseModel
+from enum import Enum
+from pydantic import BaseModel, validator
 from typing import Optional
 
+from src.utils.isbn import normalize_isbn
+
+class BookFacet(str, Enum):
+    GENRE = "genre"
+    AUTHOR = "author"
+    PUBLICATION_YEAR = "publication_year"
+
 class Book(BaseModel):
     title: str
     author: str
@@ -10,3 +18,8 @@ class Book(BaseModel):
     genre: Optional[str] = None
     total_copies: int = 1
     available_copies: int = 1
+
+    @validator('isbn')
+    def canonical_isbn(cls, v):
+        # Valid ISBNs are stored as their canonical ISBN-13, so any spelling finds them
+        return normalize_isbn(v) or v
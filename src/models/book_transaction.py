@@ -1,8 +1,10 @@
 from datetime import date, datetime
-from typing import Optional
-from pydantic import BaseModel, validator
+from typing import List, Optional
+from pydantic import BaseModel, Field, validator
 from enum import Enum
 
+from src.config.book_library_config import BookLibraryConfig
+
 class TransactionStatus(str, Enum):
     ISSUED = "Issued"
     RETURNED = "Returned"
@@ -39,6 +41,14 @@ class BookTransactionUpdate(BaseModel):
     return_date: Optional[date] = None
     status: Optional[TransactionStatus] = None
 
+class BatchIssueRequest(BaseModel):
+    member_id: int
+    # A member can never hold more than MAX_BOOKS_PER_MEMBER, so larger batches are rejected outright
+    book_ids: List[int] = Field(..., min_length=1, max_length=BookLibraryConfig.MAX_BOOKS_PER_MEMBER)
+
+class BatchReturnRequest(BaseModel):
+    transaction_ids: List[int] = Field(..., min_length=1, max_length=BookLibraryConfig.BATCH_RETURN_MAX_IDS)
+
 class BookTransactionInDB(BookTransactionBase):
     transaction_id: int
     created_at: datetime
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class FineStatus(str, Enum):
+    UNPAID = "Unpaid"
+    PAID = "Paid"
+    WAIVED = "Waived"
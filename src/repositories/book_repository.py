@@ -1,4 +1,53 @@
-from asyncpg import Pool
+from asyncpg import Pool, Record
+from datetime import datetime
+from typing import AsyncIterator, List, Mapping, Optional, Tuple
+
+# Explicit column list: books also carries the generated search_vector column,
+# which callers never need and which is expensive to ship and decode.
+BOOK_COLUMNS = (
+    "book_id", "title", "author", "isbn", "publication_year", "publisher",
+    "genre", "total_copies", "available_copies", "created_at", "row_version",
+)
+BOOK_SELECT = ", ".join(BOOK_COLUMNS)
+
+# Always selected by paginated reads: the row id and the keyset cursor
+BOOK_KEY_COLUMNS = ("book_id", "created_at")
+
+# Column order of the records handed to BookRepository.bulk_import_books
+IMPORT_COLUMNS = (
+    "line_no", "title", "author", "isbn", "publication_year", "publisher",
+    "genre", "total_copies", "available_copies",
+)
+
+# Columns whose value counts are maintained in book_facets
+FACET_COLUMNS = ("genre", "author", "publication_year")
+
+
+def _facet_deltas(old: Optional[Mapping], new: Optional[Mapping]) -> List[Tuple[str, str, int]]:
+    """(facet, value, delta) changes implied by a book going from ``old`` to ``new`` (either may be None)"""
+    deltas = {}
+    for row, sign in ((old, -1), (new, 1)):
+        if row is None:
+            continue
+        for facet in FACET_COLUMNS:
+            if row[facet] is not None:
+                key = (facet, str(row[facet]))
+                deltas[key] = deltas.get(key, 0) + sign
+    # Sorted so concurrent writers lock facet rows in the same order
+    return [(facet, value, delta) for (facet, value), delta in sorted(deltas.items()) if delta]
+
+
+async def _apply_facet_deltas(conn, deltas: List[Tuple[str, str, int]]):
+    if not deltas:
+        return
+    facets, values, counts = zip(*deltas)
+    await conn.execute("""
+        INSERT INTO book_facets (facet, value, book_count)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::int[])
+        ON CONFLICT (facet, value) DO UPDATE
+        SET book_count = book_facets.book_count + EXCLUDED.book_count
+    """, list(facets), list(values), list(counts))
+
 
 class BookRepository:
 
@@ -8,20 +57,216 @@ class BookRepository:
             INSERT INTO books
             (title, author, isbn, publication_year, publisher, genre, total_copies, available_copies)
             VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-            RETURNING book_id;
+            RETURNING book_id, genre, author, publication_year;
         """
         async with pool.acquire() as conn:
-            return await conn.fetchval(query, *book_data.values())
+            async with conn.transaction():
+                row = await conn.fetchrow(query, *book_data.values())
+                await _apply_facet_deltas(conn, _facet_deltas(None, row))
+                return row["book_id"]
+
+    @staticmethod
+    async def bulk_import_books(pool: Pool, records: List[tuple]) -> Tuple[int, List[Record]]:
+        """COPY ``records`` (ordered as IMPORT_COLUMNS) into a staging table and merge them into books.
+
+        Rows whose ISBN already exists, repeats an earlier row of the same
+        upload, or whose values do not fit the books columns are left out and
+        returned as ``(line_no, isbn, reason)`` rejects. Everything runs in one
+        transaction, so the staging table disappears on commit.
+        Returns ``(inserted_count, rejects)``.
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # Untyped-length staging columns so an oversized value is a reject, not a failed COPY
+                await conn.execute("""
+                    CREATE TEMP TABLE book_import_staging (
+                        line_no INTEGER PRIMARY KEY,
+                        title TEXT,
+                        author TEXT,
+                        isbn TEXT,
+                        publication_year INTEGER,
+                        publisher TEXT,
+                        genre TEXT,
+                        total_copies INTEGER,
+                        available_copies INTEGER,
+                        reject_reason TEXT
+                    ) ON COMMIT DROP
+                """)
+                await conn.copy_records_to_table("book_import_staging", records=records, columns=IMPORT_COLUMNS)
+
+                await conn.execute("""
+                    UPDATE book_import_staging s
+                    SET reject_reason = c.reason
+                    FROM (
+                        SELECT s.line_no,
+                            CASE
+                                WHEN length(s.title) > 255 OR length(s.author) > 255 OR length(s.isbn) > 20
+                                     OR length(s.publisher) > 100 OR length(s.genre) > 50
+                                    THEN 'Value too long'
+                                WHEN b.book_id IS NOT NULL
+                                    THEN 'ISBN already exists'
+                                WHEN s.isbn IS NOT NULL
+                                     AND row_number() OVER (PARTITION BY s.isbn ORDER BY s.line_no) > 1
+                                    THEN 'Duplicate ISBN in upload'
+                            END AS reason
+                        FROM book_import_staging s
+                        LEFT JOIN books b ON b.isbn = s.isbn
+                    ) c
+                    WHERE s.line_no = c.line_no AND c.reason IS NOT NULL
+                """)
+
+                # ON CONFLICT only matters for ISBNs inserted concurrently by another session
+                # after the checks above; rows it skips are diffed out of RETURNING and
+                # reported as rejects, so received always equals inserted + rejected.
+                # Facet counts for the whole batch are folded into one grouped upsert.
+                inserted = await conn.fetchval("""
+                    WITH inserted AS (
+                        INSERT INTO books
+                        (title, author, isbn, publication_year, publisher, genre, total_copies, available_copies)
+                        SELECT title, author, isbn, publication_year, publisher, genre,
+                               COALESCE(total_copies, 1), COALESCE(available_copies, 1)
+                        FROM book_import_staging
+                        WHERE reject_reason IS NULL
+                        ORDER BY line_no
+                        ON CONFLICT (isbn) DO NOTHING
+                        RETURNING isbn, genre, author, publication_year
+                    ), skipped AS (
+                        UPDATE book_import_staging s
+                        SET reject_reason = 'ISBN already exists'
+                        WHERE s.reject_reason IS NULL
+                        AND s.isbn IS NOT NULL
+                        AND NOT EXISTS (SELECT 1 FROM inserted i WHERE i.isbn = s.isbn)
+                    ), facet_counts AS (
+                        INSERT INTO book_facets (facet, value, book_count)
+                        SELECT facet, value, count(*)
+                        FROM inserted,
+                             LATERAL (VALUES ('genre', genre),
+                                             ('author', author),
+                                             ('publication_year', publication_year::text)) AS f(facet, value)
+                        WHERE value IS NOT NULL
+                        GROUP BY facet, value
+                        ORDER BY facet, value
+                        ON CONFLICT (facet, value) DO UPDATE
+                        SET book_count = book_facets.book_count + EXCLUDED.book_count
+                    )
+                    SELECT count(*) FROM inserted
+                """)
+
+                rejects = await conn.fetch("""
+                    SELECT line_no, isbn, reject_reason AS reason
+                    FROM book_import_staging
+                    WHERE reject_reason IS NOT NULL
+                    ORDER BY line_no
+                """)
+
+                return inserted, rejects
 
     @staticmethod
     async def get_book_by_id(pool: Pool, book_id: int):
         async with pool.acquire() as conn:
-            return await conn.fetchrow("SELECT * FROM books WHERE book_id = $1", book_id)
+            return await conn.fetchrow(f"SELECT {BOOK_SELECT} FROM books WHERE book_id = $1", book_id)
+
+    @staticmethod
+    async def get_books_by_ids(pool: Pool, book_ids: List[int]):
+        async with pool.acquire() as conn:
+            return await conn.fetch(
+                f"SELECT {BOOK_SELECT} FROM books WHERE book_id = ANY($1::int[])",
+                book_ids
+            )
+
+    @staticmethod
+    async def get_book_by_isbn(pool: Pool, isbns: List[str]):
+        """Look a book up by any of the given ISBN spellings through the UNIQUE index on books.isbn"""
+        async with pool.acquire() as conn:
+            return await conn.fetchrow(
+                f"SELECT {BOOK_SELECT} FROM books WHERE isbn = ANY($1::varchar[]) LIMIT 1",
+                isbns
+            )
+
+    @staticmethod
+    async def get_books_page(pool: Pool, limit: int, after: Optional[Tuple[datetime, int]] = None,
+                             columns: Optional[List[str]] = None):
+        """Fetch one page of books ordered by (created_at, book_id), newest first.
+
+        ``after`` is the sort key of the last row of the previous page. Seeking
+        past it keeps every page an index range scan, however deep the client goes.
+        ``columns`` must come from BOOK_COLUMNS (see utils.projection.parse_fields).
+        """
+        select = ", ".join(columns) if columns else BOOK_SELECT
+        async with pool.acquire() as conn:
+            if after is None:
+                return await conn.fetch(
+                    f"SELECT {select} FROM books ORDER BY created_at DESC, book_id DESC LIMIT $1",
+                    limit
+                )
+            return await conn.fetch(
+                f"""
+                SELECT {select} FROM books
+                WHERE (created_at, book_id) < ($1, $2)
+                ORDER BY created_at DESC, book_id DESC
+                LIMIT $3
+                """,
+                after[0], after[1], limit
+            )
 
     @staticmethod
-    async def get_all_books(pool: Pool):
+    async def stream_books(pool: Pool, prefetch: int) -> AsyncIterator[Record]:
+        """Yield every book through a server-side cursor, ``prefetch`` rows per round trip"""
+        query = f"SELECT {BOOK_SELECT} FROM books ORDER BY book_id"
         async with pool.acquire() as conn:
-            return await conn.fetch("SELECT * FROM books ORDER BY created_at DESC")
+            # asyncpg cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, prefetch=prefetch):
+                    yield row
+
+    @staticmethod
+    async def search_books(pool: Pool, query: Optional[str] = None, genre: Optional[str] = None,
+                           author: Optional[str] = None, publication_year: Optional[int] = None,
+                           limit: int = 20, offset: int = 0):
+        """Ranked catalog search mirroring SearchBooksRequest.
+
+        ``query`` matches the generated ``search_vector`` (title, author, isbn,
+        genre, publisher) through its GIN index, or fuzzily matches title/author
+        through the pg_trgm indexes, so typos still find the book. Matches are
+        ranked by full-text rank plus the best trigram similarity.
+        """
+        conditions = []
+        values = []
+
+        if query:
+            values.append(query)
+            q = f"${len(values)}"
+            conditions.append(f"(search_vector @@ tsq.q OR title % {q} OR author % {q})")
+            rank = f"ts_rank_cd(search_vector, tsq.q) + GREATEST(similarity(title, {q}), similarity(author, {q}))"
+            source = f"books, websearch_to_tsquery('simple', {q}) AS tsq(q)"
+            order_by = f"{rank} DESC, book_id DESC"
+        else:
+            source = "books"
+            order_by = "created_at DESC, book_id DESC"
+
+        if genre:
+            values.append(genre)
+            conditions.append(f"genre = ${len(values)}")
+        if author:
+            # Substring match; served by the trigram index on author
+            escaped = author.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            values.append(f"%{escaped}%")
+            conditions.append(f"author ILIKE ${len(values)}")
+        if publication_year:
+            values.append(publication_year)
+            conditions.append(f"publication_year = ${len(values)}")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        values.extend([limit, offset])
+
+        sql = f"""
+            SELECT {BOOK_SELECT} FROM {source}
+            {where}
+            ORDER BY {order_by}
+            LIMIT ${len(values) - 1} OFFSET ${len(values)}
+        """
+        async with pool.acquire() as conn:
+            return await conn.fetch(sql, *values)
 
     @staticmethod
     async def update_book(pool: Pool, book_id: int, book_data: dict):
@@ -29,12 +274,78 @@ class BookRepository:
         values = list(book_data.values())
         values.append(book_id)
 
-        query = f"UPDATE books SET {fields} WHERE book_id = ${len(values)} RETURNING book_id"
+        # The locked self-join exposes the pre-update facet values for the facet deltas
+        query = f"""
+            UPDATE books SET {fields}
+            FROM (
+                SELECT book_id, genre, author, publication_year
+                FROM books WHERE book_id = ${len(values)}
+                FOR UPDATE
+            ) old
+            WHERE books.book_id = old.book_id
+            RETURNING books.book_id, books.genre, books.author, books.publication_year,
+                      old.genre AS old_genre, old.author AS old_author,
+                      old.publication_year AS old_publication_year
+        """
 
         async with pool.acquire() as conn:
-            return await conn.fetchval(query, *values)
+            async with conn.transaction():
+                row = await conn.fetchrow(query, *values)
+                if not row:
+                    return None
+                old = {facet: row[f"old_{facet}"] for facet in FACET_COLUMNS}
+                await _apply_facet_deltas(conn, _facet_deltas(old, row))
+                return row["book_id"]
 
     @staticmethod
     async def delete_book(pool: Pool, book_id: int):
+        query = "DELETE FROM books WHERE book_id = $1 RETURNING genre, author, publication_year"
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(query, book_id)
+                for row in rows:
+                    await _apply_facet_deltas(conn, _facet_deltas(row, None))
+                return f"DELETE {len(rows)}"
+
+    @staticmethod
+    async def get_facets(pool: Pool, facets: List[str], limit: int):
+        """Top ``limit`` values per facet, read straight from the maintained book_facets aggregate.
+
+        Each facet is one bounded scan of idx_book_facets_facet_count, so the cost
+        does not grow with the number of distinct values (e.g. authors).
+        """
+        query = """
+            SELECT f.facet, t.value, t.book_count
+            FROM unnest($1::text[]) AS f(facet)
+            CROSS JOIN LATERAL (
+                SELECT value, book_count FROM book_facets
+                WHERE facet = f.facet AND book_count > 0
+                ORDER BY book_count DESC, value
+                LIMIT $2
+            ) t
+            ORDER BY f.facet, t.book_count DESC, t.value
+        """
+        async with pool.acquire() as conn:
+            return await conn.fetch(query, facets, limit)
+
+    @staticmethod
+    async def rebuild_facets(pool: Pool) -> int:
+        """Recompute book_facets from scratch; returns the number of facet rows written"""
         async with pool.acquire() as conn:
-            return await conn.execute("DELETE FROM books WHERE book_id = $1", book_id)
+            async with conn.transaction():
+                # SHARE blocks book writes (and their facet deltas) until the rebuild commits.
+                # books is locked first, the same order writers use.
+                await conn.execute("LOCK TABLE books IN SHARE MODE")
+                await conn.execute("LOCK TABLE book_facets IN EXCLUSIVE MODE")
+                await conn.execute("DELETE FROM book_facets")
+                result = await conn.execute("""
+                    INSERT INTO book_facets (facet, value, book_count)
+                    SELECT facet, value, count(*)
+                    FROM books,
+                         LATERAL (VALUES ('genre', genre),
+                                         ('author', author),
+                                         ('publication_year', publication_year::text)) AS f(facet, value)
+                    WHERE value IS NOT NULL
+                    GROUP BY facet, value
+                """)
+                return int(result.split()[-1])
@@ -1,12 +1,20 @@
 import logging
 
 from asyncpg import Pool
-from typing import List, Optional, Dict, Any
-from datetime import date
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 
-from src.models.book_transaction import TransactionStatus
+from src.cache import book_cache
+
+# Columns a client may request through a fields= projection
+TRANSACTION_COLUMNS = (
+    "transaction_id", "book_id", "member_id", "issue_date", "due_date",
+    "return_date", "status", "created_at",
+)
+# Sort key of GET /transactions; always selected so the next cursor can be built
+TRANSACTION_KEY_COLUMNS = ("transaction_id", "created_at")
 
 class BookTransactionRepository:
 
@@ -26,7 +34,8 @@ class BookTransactionRepository:
                 query,
                 transaction_data['book_id'],
                 transaction_data['member_id'],
-                transaction_data.get('issue_date', date.today()),
+                # issue_date is the partition key and must never be NULL
+                transaction_data.get('issue_date') or date.today(),
                 transaction_data['due_date'],
                 transaction_data.get('return_date'),
                 transaction_data.get('status', 'Issued')
@@ -37,9 +46,102 @@ class BookTransactionRepository:
                 "UPDATE books SET available_copies = available_copies - 1 WHERE book_id = $1",
                 transaction_data['book_id']
             )
+            book_cache.invalidate(transaction_data['book_id'])
 
             return dict(row) if row else None
 
+    @staticmethod
+    async def issue_book(pool: Pool, book_id: int, member_id: int, issue_date: date, due_date: date,
+                         max_books: int) -> Dict[str, Any]:
+        """Issue a book in one round trip through the issue_book_atomic() function.
+
+        The function locks the member, enforces ``max_books``, decrements
+        available_copies only while it is above zero and inserts the loan, all
+        in one statement. The returned ``outcome`` is 'issued' or the reason it was refused.
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT * FROM issue_book_atomic($1, $2, $3, $4, $5)",
+                book_id, member_id, issue_date, due_date, max_books
+            )
+            if row["outcome"] == "issued":
+                book_cache.invalidate(book_id)
+            return dict(row)
+
+    @staticmethod
+    async def issue_books_batch(pool: Pool, member_id: int, book_ids: List[int], issue_date: date,
+                                due_date: date, max_books: int) -> Optional[List[Dict[str, Any]]]:
+        """Issue several distinct books to one member inside a single DB transaction.
+
+        The member's quota is checked once under a member row lock. The requested
+        books are locked in id order (so concurrent batches cannot deadlock), and all
+        loans are written with one UPDATE and one unnest() INSERT. Returns one
+        ``{"book_id", "outcome", "transaction_id"}`` per requested book, in request
+        order, or None when the member does not exist.
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                member = await conn.fetchval(
+                    "SELECT member_id FROM members WHERE member_id = $1 FOR UPDATE",
+                    member_id
+                )
+                if member is None:
+                    return None
+
+                active = await conn.fetchval(
+                    """
+                    SELECT COUNT(*) FROM book_transactions
+                    WHERE member_id = $1 AND status IN ('Issued', 'Overdue')
+                    """,
+                    member_id
+                )
+                rows = await conn.fetch(
+                    """
+                    SELECT book_id, available_copies FROM books
+                    WHERE book_id = ANY($1::int[])
+                    ORDER BY book_id
+                    FOR UPDATE
+                    """,
+                    book_ids
+                )
+                copies = {row["book_id"]: row["available_copies"] for row in rows}
+
+                results = []
+                to_issue = []
+                for book_id in book_ids:
+                    if book_id not in copies:
+                        outcome = "book_not_found"
+                    elif copies[book_id] <= 0:
+                        outcome = "unavailable"
+                    elif active + len(to_issue) >= max_books:
+                        outcome = "limit_reached"
+                    else:
+                        outcome = "issued"
+                        to_issue.append(book_id)
+                    results.append({"book_id": book_id, "outcome": outcome, "transaction_id": None})
+
+                if to_issue:
+                    await conn.execute(
+                        "UPDATE books SET available_copies = available_copies - 1 WHERE book_id = ANY($1::int[])",
+                        to_issue
+                    )
+                    inserted = await conn.fetch(
+                        """
+                        INSERT INTO book_transactions (book_id, member_id, issue_date, due_date, status)
+                        SELECT book_id, $2, $3, $4, 'Issued' FROM unnest($1::int[]) AS t(book_id)
+                        RETURNING transaction_id, book_id
+                        """,
+                        to_issue, member_id, issue_date, due_date
+                    )
+                    transaction_ids = {row["book_id"]: row["transaction_id"] for row in inserted}
+                    for result in results:
+                        if result["outcome"] == "issued":
+                            result["transaction_id"] = transaction_ids[result["book_id"]]
+
+            if to_issue:
+                book_cache.invalidate(*to_issue)
+            return results
+
     @staticmethod
     async def get_transaction_by_id(pool: Pool, transaction_id: int) -> Optional[Dict[str, Any]]:
         async with pool.acquire() as conn:
@@ -50,14 +152,46 @@ class BookTransactionRepository:
             return dict(row) if row else None
 
     @staticmethod
-    async def get_all_transactions(pool: Pool, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-        query = """
-            SELECT * FROM book_transactions 
-            ORDER BY created_at DESC 
-            LIMIT $1 OFFSET $2
+    async def get_transactions_page(pool: Pool, limit: int, after: Optional[Tuple[datetime, int]] = None,
+                                    status: Optional[str] = None, member_id: Optional[int] = None,
+                                    book_id: Optional[int] = None, from_date: Optional[date] = None,
+                                    to_date: Optional[date] = None,
+                                    columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Fetch one page of transactions ordered by (created_at, transaction_id), newest first.
+
+        ``after`` is the sort key of the last row of the previous page, so every
+        page is an index range scan. The date range applies to issue_date, the
+        partition key, so it also prunes partitions. ``columns`` must come from
+        TRANSACTION_COLUMNS (see utils.projection.parse_fields).
+        """
+        select = ", ".join(columns) if columns else "*"
+        conditions = []
+        args = []
+        filters = (
+            ("status = ${}", status),
+            ("member_id = ${}", member_id),
+            ("book_id = ${}", book_id),
+            ("issue_date >= ${}", from_date),
+            ("issue_date <= ${}", to_date),
+        )
+        for condition, value in filters:
+            if value is not None:
+                args.append(value)
+                conditions.append(condition.format(len(args)))
+        if after is not None:
+            args.extend(after)
+            conditions.append(f"(created_at, transaction_id) < (${len(args) - 1}, ${len(args)})")
+        args.append(limit)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT {select} FROM book_transactions
+            {where}
+            ORDER BY created_at DESC, transaction_id DESC
+            LIMIT ${len(args)}
         """
         async with pool.acquire() as conn:
-            rows = await conn.fetch(query, limit, skip)
+            rows = await conn.fetch(query, *args)
             return [dict(row) for row in rows]
 
     @staticmethod
@@ -108,9 +242,85 @@ class BookTransactionRepository:
             return [dict(row) for row in rows]
 
     @staticmethod
-    async def get_active_transactions(pool: Pool) -> List[Dict[str, Any]]:
-        query = """
-            SELECT * FROM book_transactions 
+    async def get_active_transactions_by_member(pool: Pool, member_id: int) -> List[Dict[str, Any]]:
+        # Served by the partial index idx_book_transactions_member_active (migration 006)
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT * FROM book_transactions
+                WHERE member_id = $1 AND status IN ('Issued', 'Overdue')
+                ORDER BY created_at DESC
+                """,
+                member_id
+            )
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def get_loan_history(pool: Pool, limit: int, member_id: Optional[int] = None,
+                               book_id: Optional[int] = None, from_date: Optional[date] = None,
+                               to_date: Optional[date] = None,
+                               after: Optional[Tuple[datetime, int]] = None) -> List[Dict[str, Any]]:
+        """One page of a member's or a book's loans, newest first, with book and member details.
+
+        Exactly one of ``member_id`` / ``book_id`` selects the history. The range
+        applies to issue_date, the partition key. Every row also carries the
+        aggregates of the whole range, computed by window functions in the same
+        query before the cursor is applied: ``total_count``, ``distinct_books``,
+        ``distinct_members`` and ``currently_borrowed``.
+        """
+        args = [member_id if member_id is not None else book_id]
+        conditions = ["bt.member_id = $1" if member_id is not None else "bt.book_id = $1"]
+        if from_date is not None:
+            args.append(from_date)
+            conditions.append(f"bt.issue_date >= ${len(args)}")
+        if to_date is not None:
+            args.append(to_date)
+            conditions.append(f"bt.issue_date <= ${len(args)}")
+        seek = ""
+        if after is not None:
+            args.extend(after)
+            seek = f"WHERE (h.created_at, h.transaction_id) < (${len(args) - 1}, ${len(args)})"
+        args.append(limit)
+
+        query = f"""
+            WITH ranked AS (
+                SELECT bt.*,
+                       row_number() OVER (PARTITION BY bt.book_id ORDER BY bt.transaction_id) AS book_rank,
+                       row_number() OVER (PARTITION BY bt.member_id ORDER BY bt.transaction_id) AS member_rank
+                FROM book_transactions bt
+                WHERE {" AND ".join(conditions)}
+            ), history AS (
+                SELECT r.*,
+                       count(*) OVER () AS total_count,
+                       count(*) FILTER (WHERE r.book_rank = 1) OVER () AS distinct_books,
+                       count(*) FILTER (WHERE r.member_rank = 1) OVER () AS distinct_members,
+                       count(*) FILTER (WHERE r.return_date IS NULL) OVER () AS currently_borrowed
+                FROM ranked r
+            )
+            SELECT h.transaction_id, h.book_id, h.member_id, h.issue_date, h.due_date,
+                   h.return_date, h.status, h.created_at,
+                   b.title AS book_title, b.author AS book_author, b.isbn AS book_isbn,
+                   m.first_name AS member_first_name, m.last_name AS member_last_name,
+                   m.email AS member_email,
+                   GREATEST(COALESCE(h.return_date, CURRENT_DATE) - h.due_date, 0) AS days_overdue,
+                   h.total_count, h.distinct_books, h.distinct_members, h.currently_borrowed
+            FROM history h
+            JOIN books b ON b.book_id = h.book_id
+            JOIN members m ON m.member_id = h.member_id
+            {seek}
+            ORDER BY h.created_at DESC, h.transaction_id DESC
+            LIMIT ${len(args)}
+        """
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def get_active_transactions(pool: Pool, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # columns must come from TRANSACTION_COLUMNS (see utils.projection.parse_fields)
+        select = ", ".join(columns) if columns else "*"
+        query = f"""
+            SELECT {select} FROM book_transactions 
             WHERE status IN ('Issued', 'Overdue')
             ORDER BY due_date ASC
         """
@@ -119,9 +329,39 @@ class BookTransactionRepository:
             return [dict(row) for row in rows]
 
     @staticmethod
-    async def get_overdue_transactions(pool: Pool) -> List[Dict[str, Any]]:
-        query = """
-            SELECT * FROM book_transactions 
+    async def get_active_transactions_with_details(pool: Pool, overdue_only: bool = False,
+                                                   columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Open loans joined with their book and member, plus days overdue, in one query.
+
+        Book and member columns come back prefixed (``book_title``, ``member_email``...)
+        so they never collide with the loan's own columns. ``columns`` must come
+        from TRANSACTION_COLUMNS (see utils.projection.parse_fields).
+        """
+        select = ", ".join(f"bt.{column}" for column in columns) if columns else "bt.*"
+        overdue = "AND bt.due_date < CURRENT_DATE" if overdue_only else ""
+        query = f"""
+            SELECT {select},
+                   b.title AS book_title, b.author AS book_author, b.isbn AS book_isbn,
+                   m.first_name AS member_first_name, m.last_name AS member_last_name,
+                   m.email AS member_email,
+                   GREATEST(CURRENT_DATE - bt.due_date, 0) AS days_overdue
+            FROM book_transactions bt
+            JOIN books b ON b.book_id = bt.book_id
+            JOIN members m ON m.member_id = bt.member_id
+            WHERE bt.status IN ('Issued', 'Overdue')
+            {overdue}
+            ORDER BY bt.due_date ASC
+        """
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def get_overdue_transactions(pool: Pool, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # columns must come from TRANSACTION_COLUMNS (see utils.projection.parse_fields)
+        select = ", ".join(columns) if columns else "*"
+        query = f"""
+            SELECT {select} FROM book_transactions 
             WHERE status IN ('Issued', 'Overdue') 
             AND due_date < CURRENT_DATE
             ORDER BY due_date ASC
@@ -131,15 +371,21 @@ class BookTransactionRepository:
             return [dict(row) for row in rows]
 
     @staticmethod
-    async def mark_as_returned(pool: Pool, transaction_id: int, return_date: date = None) -> Optional[Dict[str, Any]]:
+    async def mark_as_returned(pool: Pool, transaction_id: int, return_date: date = None,
+                               issue_date: date = None) -> Optional[Dict[str, Any]]:
+        # Passing the known issue_date lets the planner prune to a single partition
         query = """
             UPDATE book_transactions 
             SET return_date = $1, status = 'Returned'
             WHERE transaction_id = $2
-            RETURNING *
         """
+        args = [return_date or date.today(), transaction_id]
+        if issue_date is not None:
+            query += " AND issue_date = $3"
+            args.append(issue_date)
+        query += " RETURNING *"
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query, return_date or date.today(), transaction_id)
+            row = await conn.fetchrow(query, *args)
             if not row:
                 return None
 
@@ -148,9 +394,112 @@ class BookTransactionRepository:
                 "UPDATE books SET available_copies = available_copies + 1 WHERE book_id = $1",
                 row['book_id']
             )
+            book_cache.invalidate(row['book_id'])
 
             return dict(row)
 
+    @staticmethod
+    async def return_books_batch(pool: Pool, transaction_ids: List[int],
+                                 return_date: date = None) -> List[Dict[str, Any]]:
+        """Mark many transactions returned and restock their books in one statement.
+
+        Copies are restocked with a single aggregated ``UPDATE ... FROM`` so a book
+        returned several times in the batch is updated once. The books are locked
+        in book_id order first, like issue_books_batch, so concurrent batches with
+        overlapping books wait on each other instead of deadlocking. Returns one
+        ``{"transaction_id", "book_id", "outcome"}`` per requested id, where outcome
+        is ``returned``, ``already_returned`` or ``not_found``.
+        """
+        query = """
+            WITH returned AS (
+                UPDATE book_transactions
+                SET return_date = $2, status = 'Returned'
+                WHERE transaction_id = ANY($1::int[]) AND return_date IS NULL
+                RETURNING transaction_id, book_id
+            ), restocked AS (
+                UPDATE books b
+                SET available_copies = b.available_copies + r.copies
+                FROM (SELECT book_id, COUNT(*) AS copies FROM returned GROUP BY book_id) r
+                WHERE b.book_id = r.book_id
+            )
+            SELECT t.transaction_id,
+                   COALESCE(r.book_id, bt.book_id) AS book_id,
+                   CASE
+                       WHEN r.transaction_id IS NOT NULL THEN 'returned'
+                       WHEN bt.transaction_id IS NOT NULL THEN 'already_returned'
+                       ELSE 'not_found'
+                   END AS outcome
+            FROM unnest($1::int[]) WITH ORDINALITY AS t(transaction_id, ord)
+            LEFT JOIN returned r ON r.transaction_id = t.transaction_id
+            LEFT JOIN book_transactions bt ON bt.transaction_id = t.transaction_id
+            ORDER BY t.ord
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    SELECT 1 FROM books
+                    WHERE book_id IN (
+                        SELECT book_id FROM book_transactions
+                        WHERE transaction_id = ANY($1::int[]) AND return_date IS NULL
+                    )
+                    ORDER BY book_id
+                    FOR UPDATE
+                    """,
+                    transaction_ids
+                )
+                rows = await conn.fetch(query, transaction_ids, return_date or date.today())
+
+        restocked = {row["book_id"] for row in rows if row["outcome"] == "returned"}
+        if restocked:
+            book_cache.invalidate(*restocked)
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def renew_loans(pool: Pool, days: int, max_duration: int, today: date,
+                          transaction_id: Optional[int] = None,
+                          member_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Extend open loans by ``days``, capped at ``issue_date + max_duration``.
+
+        Targets one loan (``transaction_id``) or every open loan of ``member_id``,
+        in one statement. The cap and the status recomputation happen inside the
+        UPDATE itself; loans already at the cap are left untouched. Returns one
+        ``{"transaction_id", "old_due_date", "new_due_date"}`` per open loan
+        targeted, with ``new_due_date`` None when it could not be extended.
+        """
+        if transaction_id is not None:
+            target = "transaction_id = $4"
+            key = transaction_id
+        else:
+            target = "member_id = $4"
+            key = member_id
+
+        query = f"""
+            WITH old AS (
+                SELECT transaction_id, issue_date, due_date FROM book_transactions
+                WHERE {target} AND return_date IS NULL AND status IN ('Issued', 'Overdue')
+                FOR UPDATE
+            ), renewed AS (
+                UPDATE book_transactions bt
+                SET due_date = LEAST(old.due_date + $1::int, old.issue_date + $2::int),
+                    status = CASE
+                        WHEN LEAST(old.due_date + $1::int, old.issue_date + $2::int) < $3::date THEN 'Overdue'
+                        ELSE 'Issued'
+                    END
+                FROM old
+                WHERE bt.transaction_id = old.transaction_id AND bt.issue_date = old.issue_date
+                AND old.due_date < old.issue_date + $2::int
+                RETURNING bt.transaction_id, bt.due_date
+            )
+            SELECT old.transaction_id, old.due_date AS old_due_date, renewed.due_date AS new_due_date
+            FROM old
+            LEFT JOIN renewed ON renewed.transaction_id = old.transaction_id
+            ORDER BY old.due_date, old.transaction_id
+        """
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, days, max_duration, today, key)
+            return [dict(row) for row in rows]
+
     @staticmethod
     async def update_overdue_status(pool: Pool) -> int:
         query = """
@@ -165,6 +514,22 @@ class BookTransactionRepository:
                 return int(result.split()[1])
             return 0
 
+    @staticmethod
+    async def maintain_partitions(
+        pool: Pool, months_ahead: int, archive_after_months: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Create upcoming monthly partitions and archive old fully returned ones (migration 008).
+
+        archive_after_months=None only creates partitions. Returns no actions when
+        another worker is running maintenance at the same time.
+        """
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT * FROM maintain_book_transaction_partitions($1, $2)",
+                months_ahead, archive_after_months
+            )
+            return [dict(row) for row in rows]
+
     @staticmethod
     async def is_book_available(pool: Pool, book_id: int) -> bool:
         """Check if a book is available (not currently issued)"""
@@ -206,17 +571,13 @@ class BookTransactionRepository:
                         FROM book_transactions bt
                         JOIN members m ON bt.member_id = m.member_id
                         WHERE bt.book_id = $1 
-                        AND bt.status IN ($2, $3)
+                        AND bt.status IN ('Issued', 'Overdue')
                         AND bt.return_date IS NULL
                         ORDER BY bt.issue_date DESC
                     """
 
-                rows = await connection.fetch(
-                    query,
-                    book_id,
-                    TransactionStatus.ISSUED.value,
-                    TransactionStatus.OVERDUE.value
-                )
+                # Statuses are literals so the planner can match idx_book_transactions_book_active
+                rows = await connection.fetch(query, book_id)
 
                 members = []
                 for row in rows:
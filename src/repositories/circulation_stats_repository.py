@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from asyncpg import Pool
+
+
+def _whole_months(from_date: date, to_date: date) -> Tuple[date, date]:
+    """The calendar months lying entirely inside [from_date, to_date], as [start, end).
+
+    Those are read from the monthly rollups (migration 016) and only the partial
+    months at the edges from the daily ones. Without a whole month the span is
+    empty and starts after to_date, so the daily rows cover the whole range.
+    """
+    start = from_date.replace(day=1)
+    if start < from_date:
+        start = (start + timedelta(days=32)).replace(day=1)
+    end = (to_date + timedelta(days=1)).replace(day=1)
+    if start >= end:
+        return to_date + timedelta(days=1), to_date + timedelta(days=1)
+    return start, end
+
+
+class CirculationStatsRepository:
+    """Reads the daily (migration 011) and monthly (migration 016) circulation rollups maintained by triggers"""
+
+    @staticmethod
+    async def get_daily_totals(pool: Pool, from_date: date, to_date: date) -> List[Dict[str, Any]]:
+        query = """
+            SELECT day, sum(issued_count)::bigint AS issued, sum(returned_count)::bigint AS returned
+            FROM circulation_daily_stats
+            WHERE day BETWEEN $1 AND $2
+            GROUP BY day
+            ORDER BY day
+        """
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, from_date, to_date)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def get_open_loan_counts(pool: Pool, today: date) -> Dict[str, int]:
+        """Current and overdue loan counts, answered from the active-loan partial indexes"""
+        query = """
+            SELECT count(*) AS current_borrowings,
+                   count(*) FILTER (WHERE due_date < $1) AS overdue_borrowings
+            FROM book_transactions
+            WHERE status IN ('Issued', 'Overdue')
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, today)
+            return dict(row)
+
+    @staticmethod
+    async def get_most_borrowed_book(pool: Pool, from_date: date, to_date: date) -> Optional[Dict[str, Any]]:
+        month_start, month_end = _whole_months(from_date, to_date)
+        query = """
+            SELECT s.book_id, b.title, sum(s.issued_count)::bigint AS times_borrowed
+            FROM (
+                SELECT book_id, issued_count FROM circulation_monthly_book_stats
+                WHERE month >= $3 AND month < $4
+                UNION ALL
+                SELECT book_id, issued_count FROM circulation_daily_book_stats
+                WHERE day >= $1 AND day < $3
+                UNION ALL
+                SELECT book_id, issued_count FROM circulation_daily_book_stats
+                WHERE day >= $4 AND day <= $2
+            ) s
+            JOIN books b ON b.book_id = s.book_id
+            GROUP BY s.book_id, b.title
+            HAVING sum(s.issued_count) > 0
+            ORDER BY times_borrowed DESC, s.book_id
+            LIMIT 1
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, from_date, to_date, month_start, month_end)
+            return dict(row) if row else None
+
+    @staticmethod
+    async def get_most_active_member(pool: Pool, from_date: date, to_date: date) -> Optional[Dict[str, Any]]:
+        month_start, month_end = _whole_months(from_date, to_date)
+        query = """
+            SELECT s.member_id, m.first_name, m.last_name, sum(s.issued_count)::bigint AS times_borrowed
+            FROM (
+                SELECT member_id, issued_count FROM circulation_monthly_member_stats
+                WHERE month >= $3 AND month < $4
+                UNION ALL
+                SELECT member_id, issued_count FROM circulation_daily_member_stats
+                WHERE day >= $1 AND day < $3
+                UNION ALL
+                SELECT member_id, issued_count FROM circulation_daily_member_stats
+                WHERE day >= $4 AND day <= $2
+            ) s
+            JOIN members m ON m.member_id = s.member_id
+            GROUP BY s.member_id, m.first_name, m.last_name
+            HAVING sum(s.issued_count) > 0
+            ORDER BY times_borrowed DESC, s.member_id
+            LIMIT 1
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, from_date, to_date, month_start, month_end)
+            return dict(row) if row else None
@@ -0,0 +1,85 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from asyncpg import Pool
+
+
+class FineRepository:
+
+    @staticmethod
+    async def assess_overdue_fines(pool: Pool, as_of: date, fine_per_day: int) -> Dict[str, int]:
+        """Assess every overdue loan in one set-based upsert into the fines ledger.
+
+        Sources are the open loans past their due date, found through the partial
+        due-date index, and loans returned since their last assessment that still
+        have an unpaid fine. Those are settled at the real number of late days.
+        A loan with a return date only comes from the second source, whatever its
+        status says, so no loan reaches the upsert twice.
+        Re-running with the same ``as_of`` changes nothing: rows are only rewritten
+        while the fine is unpaid and its day count actually moved.
+        Returns ``{"created": n, "updated": n}``.
+        """
+        query = """
+            WITH overdue AS (
+                SELECT transaction_id, member_id, $1::date - due_date AS days_overdue
+                FROM book_transactions
+                WHERE status IN ('Issued', 'Overdue') AND due_date < $1::date
+                AND return_date IS NULL
+                UNION ALL
+                SELECT bt.transaction_id, bt.member_id, bt.return_date - bt.due_date
+                FROM fines f
+                JOIN book_transactions bt ON bt.transaction_id = f.transaction_id
+                WHERE f.status = 'Unpaid' AND f.reason = 'Overdue'
+                AND bt.return_date IS NOT NULL
+            ), upserted AS (
+                INSERT INTO fines (transaction_id, member_id, days_overdue, amount, fine_date, reason)
+                SELECT transaction_id, member_id, days_overdue, days_overdue * $2::numeric, $1, 'Overdue'
+                FROM overdue
+                WHERE days_overdue > 0
+                ON CONFLICT (transaction_id, reason) DO UPDATE
+                SET days_overdue = EXCLUDED.days_overdue,
+                    amount = EXCLUDED.amount,
+                    fine_date = EXCLUDED.fine_date,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE fines.status = 'Unpaid'
+                AND fines.days_overdue IS DISTINCT FROM EXCLUDED.days_overdue
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted) AS created,
+                   count(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, as_of, fine_per_day)
+            return {"created": row["created"], "updated": row["updated"]}
+
+    @staticmethod
+    async def get_fines_by_member(pool: Pool, member_id: int, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM fines WHERE member_id = $1"
+        args = [member_id]
+        if status is not None:
+            query += " AND status = $2"
+            args.append(status)
+        query += " ORDER BY fine_date DESC, fine_id DESC"
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def get_fine(pool: Pool, fine_id: int) -> Optional[Dict[str, Any]]:
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM fines WHERE fine_id = $1", fine_id)
+            return dict(row) if row else None
+
+    @staticmethod
+    async def settle_fine(pool: Pool, fine_id: int, status: str, paid_date: Optional[date]) -> Optional[Dict[str, Any]]:
+        """Mark an unpaid fine as Paid or Waived; returns None if it was not unpaid."""
+        query = """
+            UPDATE fines
+            SET status = $2, paid_date = $3, updated_at = CURRENT_TIMESTAMP
+            WHERE fine_id = $1 AND status = 'Unpaid'
+            RETURNING *
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, fine_id, status, paid_date)
+            return dict(row) if row else None
@@ -0,0 +1,68 @@
+import json
+from typing import Any, Dict, Optional
+
+from asyncpg import Pool
+
+class IdempotencyRepository:
+
+    @staticmethod
+    async def get_entry(pool: Pool, scope: str, key: str) -> Optional[Dict[str, Any]]:
+        """Live (unexpired) entry for ``key``"""
+        query = """
+            SELECT fingerprint, response
+            FROM idempotency_keys
+            WHERE scope = $1 AND idempotency_key = $2 AND expires_at > now()
+        """
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, scope, key)
+            if not row:
+                return None
+            entry = dict(row)
+            if entry["response"] is not None:
+                entry["response"] = json.loads(entry["response"])
+            return entry
+
+    @staticmethod
+    async def claim(pool: Pool, scope: str, key: str, fingerprint: str, ttl_seconds: float) -> bool:
+        """Take ownership of a new or expired ``key``.
+
+        Meant to run inside the transaction that does the keyed work: a concurrent
+        claim of the same key blocks on the uncommitted row until that transaction
+        ends, then fails if it committed and succeeds if it rolled back.
+        """
+        query = """
+            INSERT INTO idempotency_keys (scope, idempotency_key, fingerprint, locked_at, expires_at)
+            VALUES ($1, $2, $3, now(), now() + make_interval(secs => $4))
+            ON CONFLICT (scope, idempotency_key) DO UPDATE
+            SET fingerprint = EXCLUDED.fingerprint,
+                response = NULL,
+                locked_at = EXCLUDED.locked_at,
+                expires_at = EXCLUDED.expires_at
+            WHERE idempotency_keys.expires_at <= now()
+            RETURNING 1
+        """
+        async with pool.acquire() as conn:
+            return await conn.fetchval(query, scope, key, fingerprint, ttl_seconds) is not None
+
+    @staticmethod
+    async def complete(pool: Pool, scope: str, key: str, response: Any):
+        async with pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE idempotency_keys SET response = $3::jsonb WHERE scope = $1 AND idempotency_key = $2",
+                scope, key, json.dumps(response)
+            )
+
+    @staticmethod
+    async def delete_expired(pool: Pool, batch_size: int) -> int:
+        """Delete up to ``batch_size`` expired keys; small batches keep each delete short"""
+        query = """
+            DELETE FROM idempotency_keys
+            WHERE ctid = ANY(ARRAY(
+                SELECT ctid FROM idempotency_keys
+                WHERE expires_at <= now()
+                LIMIT $1
+            ))
+        """
+        async with pool.acquire() as conn:
+            result = await conn.execute(query, batch_size)
+            return int(result.split()[1])
@@ -1,4 +1,12 @@
-from asyncpg import Pool
+from typing import AsyncIterator, List, Optional
+
+from asyncpg import Pool, Record
+
+# Columns a client may request through a fields= projection
+MEMBER_COLUMNS = (
+    "member_id", "first_name", "last_name", "email", "phone", "address",
+    "membership_date", "status", "row_version",
+)
 
 class MemberRepository:
 
@@ -22,11 +30,29 @@ class MemberRepository:
             return await conn.fetchrow(query, member_id)
 
     @staticmethod
-    async def get_all_members(pool: Pool):
-        query = "SELECT * FROM members ORDER BY membership_date DESC"
+    async def get_members_by_ids(pool: Pool, member_ids: List[int]):
+        query = "SELECT * FROM members WHERE member_id = ANY($1::int[])"
+        async with pool.acquire() as conn:
+            return await conn.fetch(query, member_ids)
+
+    @staticmethod
+    async def get_all_members(pool: Pool, columns: Optional[List[str]] = None):
+        # columns must come from MEMBER_COLUMNS (see utils.projection.parse_fields)
+        select = ", ".join(columns) if columns else "*"
+        query = f"SELECT {select} FROM members ORDER BY membership_date DESC"
         async with pool.acquire() as conn:
             return await conn.fetch(query)
 
+    @staticmethod
+    async def stream_members(pool: Pool, prefetch: int) -> AsyncIterator[Record]:
+        """Yield every member through a server-side cursor, ``prefetch`` rows per round trip"""
+        query = "SELECT * FROM members ORDER BY member_id"
+        async with pool.acquire() as conn:
+            # asyncpg cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, prefetch=prefetch):
+                    yield row
+
     @staticmethod
     async def update_member(pool: Pool, member_id: int, data: dict):
         fields = ", ".join([f"{k} = ${i+1}" for i, k in enumerate(data.keys())])
@@ -0,0 +1,17 @@
+from asyncpg import Pool
+
+class TableVersionRepository:
+
+    @staticmethod
+    async def get_version(pool: Pool, table_name: str) -> int:
+        """Change counter of ``table_name``, bumped by a statement trigger on every write.
+
+        The counter is sharded to spread write contention (migration 015), so the
+        version is the sum of the shards.
+        """
+        async with pool.acquire() as conn:
+            version = await conn.fetchval(
+                "SELECT sum(version) FROM table_versions WHERE table_name = $1",
+                table_name
+            )
+            return int(version or 0)
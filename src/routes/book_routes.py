@@ -1,6 +1,11 @@
-from fastapi import APIRouter
-from src.models.book_model import Book
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from src.config.book_library_config import BookLibraryConfig
+from src.models.book_model import Book, BookFacet
+from src.models.batch_model import BatchGetRequest
 from src.controllers.book_controller import BookController
+from src.utils.serialization import DataFormat
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
@@ -8,13 +13,63 @@ router = APIRouter(prefix="/books", tags=["Books"])
 async def create_book(book: Book):
     return await BookController.create_book(book)
 
+@router.post(":batchGet")
+async def batch_get_books(request: BatchGetRequest):
+    return await BookController.batch_get_books(request.ids)
+
+@router.post("/import")
+async def import_books(request: Request, format: Optional[DataFormat] = None):
+    # The upload is the raw request body; the format falls back to its Content-Type
+    fmt = format or DataFormat.from_content_type(request.headers.get("content-type"))
+    return await BookController.import_books(await request.body(), fmt)
+
+# Declared before /{book_id} so "search", "facets" and "export" are not parsed as book ids
+@router.get("/search")
+async def search_books(
+    q: Optional[str] = Query(None, max_length=200),
+    genre: Optional[str] = None,
+    author: Optional[str] = None,
+    publication_year: Optional[int] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(BookLibraryConfig.SEARCH_PAGE_SIZE, ge=1, le=BookLibraryConfig.MAX_PAGE_SIZE),
+):
+    return await BookController.search_books(q, genre, author, publication_year, page, page_size)
+
+@router.get("/facets")
+async def get_facets(
+    facet: Optional[List[BookFacet]] = Query(None),
+    limit: int = Query(BookLibraryConfig.FACET_VALUES_LIMIT, ge=1, le=BookLibraryConfig.MAX_PAGE_SIZE),
+):
+    return await BookController.get_facets(facet, limit)
+
+@router.post("/facets/rebuild")
+async def rebuild_facets():
+    return await BookController.rebuild_facets()
+
+@router.get("/export")
+async def export_books(format: DataFormat = DataFormat.NDJSON):
+    return await BookController.export_books(format)
+
+@router.get("/isbn/{isbn}")
+async def get_book_by_isbn(isbn: str):
+    return await BookController.get_book_by_isbn(isbn)
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return await BookController.cache_stats()
+
 @router.get("/{book_id}")
-async def get_book(book_id: int):
-    return await BookController.get_book(book_id)
+async def get_book(book_id: int, if_none_match: Optional[str] = Header(None)):
+    return await BookController.get_book(book_id, if_none_match)
 
 @router.get("")
-async def list_books():
-    return await BookController.list_books()
+async def list_books(
+    limit: int = Query(BookLibraryConfig.DEFAULT_PAGE_SIZE, ge=1, le=BookLibraryConfig.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    if_none_match: Optional[str] = Header(None),
+):
+    return await BookController.list_books(limit, cursor, fields, if_none_match)
 
 @router.put("/{book_id}")
 async def update_book(book_id: int, book: Book):
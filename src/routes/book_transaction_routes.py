@@ -2,38 +2,109 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-from fastapi import APIRouter
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query
+from src.config.book_library_config import BookLibraryConfig
 from src.controllers.book_transaction_controller import BookTransactionController
-from src.models.book_transaction import BookTransactionCreate, BookTransactionUpdate
+from src.models.book_transaction import (
+    BatchIssueRequest, BatchReturnRequest, BookTransactionCreate, BookTransactionUpdate, TransactionStatus
+)
 
 # Create the router instance
 router = APIRouter(prefix="/transactions", tags=["Book Transactions"])
 
 @router.post("/issue")
-async def issue_book(book_id: int, member_id: int):
-    return await BookTransactionController.issue_book(book_id, member_id)
+async def issue_book(book_id: int, member_id: int, idempotency_key: Optional[str] = Header(None, max_length=255)):
+    return await BookTransactionController.issue_book(book_id, member_id, idempotency_key)
+
+@router.post("/issue/batch")
+async def issue_books_batch(request: BatchIssueRequest, idempotency_key: Optional[str] = Header(None, max_length=255)):
+    return await BookTransactionController.issue_books_batch(request.member_id, request.book_ids, idempotency_key)
+
+# Must be declared before /return/{transaction_id}
+@router.post("/return/batch")
+async def return_books_batch(request: BatchReturnRequest):
+    return await BookTransactionController.return_books_batch(request.transaction_ids)
 
 @router.post("/return/{transaction_id}")
-async def return_book(transaction_id: int):
-    return await BookTransactionController.return_book(transaction_id)
+async def return_book(transaction_id: int, idempotency_key: Optional[str] = Header(None, max_length=255)):
+    return await BookTransactionController.return_book(transaction_id, idempotency_key)
+
+@router.get("/statistics")
+async def get_statistics(
+    from_date: Optional[date] = Query(None, description="First day, defaults to STATISTICS_DEFAULT_DAYS before to_date"),
+    to_date: Optional[date] = Query(None, description="Last day, inclusive, defaults to today"),
+):
+    return await BookTransactionController.get_statistics(from_date, to_date)
 
 @router.get("/issued")
-async def get_issued_books():
-    return await BookTransactionController.get_issued_books()
+async def get_issued_books(
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    include_details: bool = Query(False, description="Embed book and member info and days overdue"),
+):
+    return await BookTransactionController.get_issued_books(fields, include_details)
 
 @router.get("/overdue")
-async def get_overdue_books():
-    return await BookTransactionController.get_overdue_books()
+async def get_overdue_books(
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    include_details: bool = Query(False, description="Embed book and member info and days overdue"),
+):
+    return await BookTransactionController.get_overdue_books(fields, include_details)
+
+@router.post("/member/{member_id}/renew")
+async def renew_member_loans(
+    member_id: int,
+    days: Optional[int] = Query(None, ge=1, le=BookLibraryConfig.MAX_BORROW_DURATION,
+                                description="Days to extend by, defaults to RENEWAL_DAYS"),
+):
+    return await BookTransactionController.renew_member_loans(member_id, days)
+
+@router.get("/member/{member_id}/history")
+async def get_member_history(
+    member_id: int,
+    from_date: Optional[date] = Query(None, description="Earliest issue_date, inclusive"),
+    to_date: Optional[date] = Query(None, description="Latest issue_date, inclusive"),
+    cursor: Optional[str] = None,
+    limit: int = Query(BookLibraryConfig.SEARCH_PAGE_SIZE, ge=1, le=BookLibraryConfig.MAX_PAGE_SIZE),
+):
+    return await BookTransactionController.get_member_history(member_id, from_date, to_date, cursor, limit)
 
 @router.get("/member/{member_id}")
 async def get_member_issued_books(member_id: int):
     return await BookTransactionController.get_member_issued_books(member_id)
 
+@router.get("/book/{book_id}/history")
+async def get_book_history(
+    book_id: int,
+    from_date: Optional[date] = Query(None, description="Earliest issue_date, inclusive"),
+    to_date: Optional[date] = Query(None, description="Latest issue_date, inclusive"),
+    cursor: Optional[str] = None,
+    limit: int = Query(BookLibraryConfig.SEARCH_PAGE_SIZE, ge=1, le=BookLibraryConfig.MAX_PAGE_SIZE),
+):
+    return await BookTransactionController.get_book_history(book_id, from_date, to_date, cursor, limit)
+
 @router.get("/book/{book_id}/issued-members")
 async def get_book_issued_members(book_id: int):
     return await BookTransactionController.get_book_issued_members(book_id)
 
 
+@router.get("")
+async def list_transactions(
+    limit: int = Query(BookLibraryConfig.DEFAULT_PAGE_SIZE, ge=1, le=BookLibraryConfig.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[TransactionStatus] = None,
+    member_id: Optional[int] = None,
+    book_id: Optional[int] = None,
+    from_date: Optional[date] = Query(None, description="Earliest issue_date, inclusive"),
+    to_date: Optional[date] = Query(None, description="Latest issue_date, inclusive"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
+    return await BookTransactionController.list_transactions(
+        limit, cursor, status, member_id, book_id, from_date, to_date, fields
+    )
+
 @router.post("")
 async def create_transaction(transaction: BookTransactionCreate):
     logger.info("create_transaction of routes is called..<>..")
@@ -46,4 +117,12 @@ async def get_transaction(transaction_id: int):
 
 @router.put("/{transaction_id}")
 async def update_transaction(transaction_id: int, transaction: BookTransactionUpdate):
-    return await BookTransactionController.update_transaction(transaction_id, transaction)
\ No newline at end of file
+    return await BookTransactionController.update_transaction(transaction_id, transaction)
+
+@router.post("/{transaction_id}/renew")
+async def renew_book(
+    transaction_id: int,
+    days: Optional[int] = Query(None, ge=1, le=BookLibraryConfig.MAX_BORROW_DURATION,
+                                description="Days to extend by, defaults to RENEWAL_DAYS"),
+):
+    return await BookTransactionController.renew_book(transaction_id, days)
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from fastapi import APIRouter
+from src.models.fine_model import FineStatus
+from src.controllers.fine_controller import FineController
+
+router = APIRouter(prefix="/fines", tags=["Fines"])
+
+@router.post("/assess")
+async def assess_fines():
+    return await FineController.assess_fines()
+
+@router.get("/member/{member_id}")
+async def get_member_fines(member_id: int, status: Optional[FineStatus] = None):
+    return await FineController.get_member_fines(member_id, status)
+
+@router.post("/{fine_id}/pay")
+async def pay_fine(fine_id: int):
+    return await FineController.pay_fine(fine_id)
+
+@router.post("/{fine_id}/waive")
+async def waive_fine(fine_id: int):
+    return await FineController.waive_fine(fine_id)
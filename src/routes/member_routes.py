@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query
 from src.models.member_model import Member
+from src.models.batch_model import BatchGetRequest
 from src.controllers.member_controller import MemberController
+from src.utils.serialization import DataFormat
 
 router = APIRouter(prefix="/members", tags=["Members"])
 
@@ -8,13 +12,25 @@ router = APIRouter(prefix="/members", tags=["Members"])
 async def create_member(member: Member):
     return await MemberController.create_member(member)
 
+@router.post(":batchGet")
+async def batch_get_members(request: BatchGetRequest):
+    return await MemberController.batch_get_members(request.ids)
+
+# Declared before /{member_id} so "export" is not parsed as a member id
+@router.get("/export")
+async def export_members(format: DataFormat = DataFormat.NDJSON):
+    return await MemberController.export_members(format)
+
 @router.get("/{member_id}")
-async def get_member(member_id: int):
-    return await MemberController.get_member(member_id)
+async def get_member(member_id: int, if_none_match: Optional[str] = Header(None)):
+    return await MemberController.get_member(member_id, if_none_match)
 
 @router.get("")
-async def list_members():
-    return await MemberController.list_members()
+async def list_members(
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    if_none_match: Optional[str] = Header(None),
+):
+    return await MemberController.list_members(fields, if_none_match)
 
 @router.put("/{member_id}")
 async def update_member(member_id: int, member: Member):
@@ -1,37 +1,266 @@
+from typing import List, Optional
+
 from fastapi import HTTPException
-from src.repositories.book_repository import BookRepository
+from pydantic import ValidationError
+from fastapi.responses import StreamingResponse
+from src.repositories.book_repository import BOOK_COLUMNS, BOOK_KEY_COLUMNS, BookRepository
+from src.repositories.table_version_repository import TableVersionRepository
 from src.db import connect_db
+from src.cache import book_cache, isbn_miss_cache
+from src.config.book_library_config import BookLibraryConfig
+from src.models.book_model import Book, BookFacet
+from src.utils.serialization import DataFormat, decode_records, encode_records
+from src.utils.etag import conditional_response, etag_matches, make_etag, not_modified
+from src.utils.isbn import isbn_variants, normalize_isbn
+from src.utils.projection import InvalidFieldsError, parse_fields
+from src.utils.pagination import InvalidCursorError, clamp_limit, decode_cursor, encode_cursor
 from asyncpg import UniqueViolationError
 
 class BookService:
 
+    @staticmethod
+    def _forget_isbn_miss(isbn: Optional[str]):
+        """Drop a cached "unknown ISBN" answer once a book with that ISBN is written"""
+        normalized = normalize_isbn(isbn)
+        if normalized:
+            isbn_miss_cache.invalidate(normalized)
+
     @staticmethod
     async def add_book(book):
         pool = await connect_db()
+        book_data = book.dict()
         try:
-            book_id = await BookRepository.create_book(pool, book.dict())
+            book_id = await BookRepository.create_book(pool, book_data)
+            BookService._forget_isbn_miss(book_data.get("isbn"))
             return {"message": "Book added successfully", "book_id": book_id}
         except UniqueViolationError:
             raise HTTPException(status_code=400, detail="ISBN already exists")
 
+    @staticmethod
+    async def import_books(payload: bytes, fmt: DataFormat):
+        try:
+            text = payload.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+
+        records = []
+        rejects = []
+        received = 0
+        for line_no, raw, error in decode_records(text, fmt):
+            received += 1
+            if received > BookLibraryConfig.IMPORT_MAX_ROWS:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload exceeds {BookLibraryConfig.IMPORT_MAX_ROWS} rows"
+                )
+            if error:
+                rejects.append({"line": line_no, "isbn": None, "reason": error})
+                continue
+            try:
+                book = Book(**raw)
+            except ValidationError as e:
+                reason = "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                rejects.append({"line": line_no, "isbn": raw.get("isbn"), "reason": reason})
+                continue
+            records.append((
+                line_no, book.title, book.author, book.isbn, book.publication_year, book.publisher,
+                book.genre, book.total_copies, book.available_copies,
+            ))
+
+        inserted = 0
+        if records:
+            pool = await connect_db()
+            inserted, conflicts = await BookRepository.bulk_import_books(pool, records)
+            if inserted:
+                isbn_miss_cache.clear()
+            rejects.extend(
+                {"line": r["line_no"], "isbn": r["isbn"], "reason": r["reason"]} for r in conflicts
+            )
+            rejects.sort(key=lambda r: r["line"])
+
+        return {
+            "message": "Books imported successfully",
+            "received": received,
+            "inserted": inserted,
+            "rejected": rejects,
+        }
+
     @staticmethod
     async def get_book(book_id: int):
+        cached = book_cache.get(book_id)
+        if cached is not None:
+            return dict(cached)
+
+        generation = book_cache.generation
         pool = await connect_db()
         row = await BookRepository.get_book_by_id(pool, book_id)
         if not row:
             raise HTTPException(status_code=404, detail="Book not found")
-        return dict(row)
+
+        book = dict(row)
+        book_cache.set(book_id, book, generation)
+        return dict(book)
+
+    @staticmethod
+    async def batch_get_books(book_ids: List[int]):
+        books = {}
+        missing = []
+        for book_id in dict.fromkeys(book_ids):
+            cached = book_cache.get(book_id)
+            if cached is not None:
+                books[book_id] = cached
+            else:
+                missing.append(book_id)
+
+        if missing:
+            generation = book_cache.generation
+            pool = await connect_db()
+            for row in await BookRepository.get_books_by_ids(pool, missing):
+                book = dict(row)
+                books[book["book_id"]] = book
+                book_cache.set(book["book_id"], book, generation)
+
+        # Request order, one entry per requested id, with explicit not-found markers
+        return {
+            "results": [
+                {"book_id": book_id, "found": True, "book": dict(books[book_id])}
+                if book_id in books else {"book_id": book_id, "found": False}
+                for book_id in book_ids
+            ]
+        }
+
+    @staticmethod
+    async def get_book_by_isbn(isbn: str):
+        normalized = normalize_isbn(isbn)
+        if not normalized:
+            raise HTTPException(status_code=400, detail="Invalid ISBN")
+
+        if isbn_miss_cache.get(normalized):
+            raise HTTPException(status_code=404, detail="Book not found")
+
+        miss_generation = isbn_miss_cache.generation
+        book_generation = book_cache.generation
+        pool = await connect_db()
+        row = await BookRepository.get_book_by_isbn(pool, isbn_variants(normalized))
+        if not row:
+            isbn_miss_cache.set(normalized, True, miss_generation)
+            raise HTTPException(status_code=404, detail="Book not found")
+
+        book = dict(row)
+        book_cache.set(book["book_id"], book, book_generation)
+        return dict(book)
+
+    @staticmethod
+    def book_etag(book: dict) -> str:
+        return make_etag("book", book["book_id"], book["row_version"])
+
+    @staticmethod
+    async def get_book_conditional(book_id: int, if_none_match: Optional[str] = None):
+        # A cached row carries its row_version, so a revalidation hit costs no query at all
+        book = await BookService.get_book(book_id)
+        return conditional_response(book, BookService.book_etag(book), if_none_match)
+
+    @staticmethod
+    async def list_books_conditional(limit: Optional[int] = None, cursor: Optional[str] = None,
+                                     fields: Optional[str] = None, if_none_match: Optional[str] = None):
+        limit = clamp_limit(limit, BookLibraryConfig.DEFAULT_PAGE_SIZE, BookLibraryConfig.MAX_PAGE_SIZE)
+        pool = await connect_db()
+        version = await TableVersionRepository.get_version(pool, "books")
+        etag = make_etag("books", version, limit, cursor, fields)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        page = await BookService.list_books(limit, cursor, fields)
+        return conditional_response(page, etag)
+
+    @staticmethod
+    async def cache_stats():
+        return {"books": book_cache.stats(), "isbn_misses": isbn_miss_cache.stats()}
+
+    @staticmethod
+    async def list_books(limit: Optional[int] = None, cursor: Optional[str] = None,
+                         fields: Optional[str] = None):
+        limit = clamp_limit(limit, BookLibraryConfig.DEFAULT_PAGE_SIZE, BookLibraryConfig.MAX_PAGE_SIZE)
+        try:
+            after = decode_cursor(cursor)
+            columns = parse_fields(fields, BOOK_COLUMNS, BOOK_KEY_COLUMNS)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        except InvalidFieldsError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        pool = await connect_db()
+        # Fetch one extra row to learn whether another page exists
+        rows = await BookRepository.get_books_page(pool, limit + 1, after, columns)
+        books = [dict(r) for r in rows[:limit]]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = books[-1]
+            next_cursor = encode_cursor(last["created_at"], last["book_id"])
+
+        return {"books": books, "next_cursor": next_cursor, "limit": limit}
+
+    @staticmethod
+    async def search_books(query: Optional[str] = None, genre: Optional[str] = None,
+                           author: Optional[str] = None, publication_year: Optional[int] = None,
+                           page: int = 1, page_size: Optional[int] = None):
+        page = max(page, 1)
+        page_size = clamp_limit(page_size, BookLibraryConfig.SEARCH_PAGE_SIZE, BookLibraryConfig.MAX_PAGE_SIZE)
+        query = (query or "").strip() or None
+
+        pool = await connect_db()
+        # Fetch one extra row to learn whether another page exists
+        rows = await BookRepository.search_books(
+            pool, query, genre, author, publication_year,
+            limit=page_size + 1, offset=(page - 1) * page_size
+        )
+
+        return {
+            "books": [dict(r) for r in rows[:page_size]],
+            "page": page,
+            "page_size": page_size,
+            "has_more": len(rows) > page_size,
+        }
+
+    @staticmethod
+    async def get_facets(facets: Optional[List[BookFacet]] = None, limit: Optional[int] = None):
+        facets = facets or list(BookFacet)
+        limit = clamp_limit(limit, BookLibraryConfig.FACET_VALUES_LIMIT, BookLibraryConfig.MAX_PAGE_SIZE)
+
+        pool = await connect_db()
+        rows = await BookRepository.get_facets(pool, [f.value for f in facets], limit)
+
+        result = {f.value: [] for f in facets}
+        for row in rows:
+            result[row["facet"]].append({"value": row["value"], "count": row["book_count"]})
+        return {"facets": result}
+
+    @staticmethod
+    async def rebuild_facets():
+        pool = await connect_db()
+        written = await BookRepository.rebuild_facets(pool)
+        return {"message": "Facets rebuilt successfully", "facet_values": written}
 
     @staticmethod
-    async def list_books():
+    async def export_books(fmt: DataFormat):
         pool = await connect_db()
-        rows = await BookRepository.get_all_books(pool)
-        return [dict(r) for r in rows]
+        rows = BookRepository.stream_books(pool, BookLibraryConfig.EXPORT_FETCH_SIZE)
+        return StreamingResponse(
+            encode_records(rows, fmt),
+            media_type=fmt.media_type,
+            headers={"Content-Disposition": f'attachment; filename="books.{fmt.value}"'},
+        )
 
     @staticmethod
     async def update_book(book_id: int, book):
         pool = await connect_db()
-        updated_id = await BookRepository.update_book(pool, book_id, book.dict(exclude_unset=True))
+        book_data = book.dict(exclude_unset=True)
+        updated_id = await BookRepository.update_book(pool, book_id, book_data)
+        book_cache.invalidate(book_id)
+        BookService._forget_isbn_miss(book_data.get("isbn"))
         if not updated_id:
             raise HTTPException(status_code=404, detail="Book not found")
         return {"message": "Book updated successfully"}
@@ -40,6 +269,7 @@ class BookService:
     async def delete_book(book_id: int):
         pool = await connect_db()
         result = await BookRepository.delete_book(pool, book_id)
+        book_cache.invalidate(book_id)
         if result == "DELETE 0":
             raise HTTPException(status_code=404, detail="Book not found")
         return {"message": "Book deleted successfully"}
@@ -1,9 +1,15 @@
 import logging
+from typing import List, Optional
 from datetime import datetime, timedelta, date
 from src.db import connect_db
 from src.config.book_library_config import BookLibraryConfig
 from src.models.book_transaction import BookTransactionCreate, BookTransactionUpdate, TransactionStatus
-from src.repositories.book_transaction_repository import BookTransactionRepository
+from src.repositories.circulation_stats_repository import CirculationStatsRepository
+from src.repositories.book_transaction_repository import (
+    TRANSACTION_COLUMNS, TRANSACTION_KEY_COLUMNS, BookTransactionRepository
+)
+from src.utils.pagination import InvalidCursorError, clamp_limit, decode_cursor, encode_cursor
+from src.utils.projection import InvalidFieldsError, parse_fields
 
 logger = logging.getLogger(__name__)
 
@@ -44,25 +50,14 @@ class BookTransactionService:
         pool = await connect_db()
 
         try:
-            is_available = await BookTransactionRepository.is_book_available(pool, book_id)
-            if not is_available:
-                return {"error": "Book is already issued"}
-
             issue_date = date.today()
             due_date = issue_date + timedelta(days=BookLibraryConfig.DEFAULT_DUE_DAYS)
 
-            transaction_data = {
-                "book_id": book_id,
-                "member_id": member_id,
-                "issue_date": issue_date,
-                "due_date": due_date,
-                "return_date": None,
-                "status": TransactionStatus.ISSUED
-            }
-
-            result = await BookTransactionRepository.create_transaction(pool, transaction_data)
+            result = await BookTransactionRepository.issue_book(
+                pool, book_id, member_id, issue_date, due_date, BookLibraryConfig.MAX_BOOKS_PER_MEMBER
+            )
 
-            if result:
+            if result["outcome"] == "issued":
                 return {
                     "message": "Book issued successfully",
                     "transaction_id": result["transaction_id"],
@@ -70,13 +65,73 @@ class BookTransactionService:
                     "due_date": result["due_date"],
                     "due_days": BookLibraryConfig.DEFAULT_DUE_DAYS
                 }
-            else:
-                return {"error": "Failed to issue book"}
+            return {"error": BookTransactionService._issue_error(result["outcome"])}
 
         except Exception as e:
             logger.error(f"Error issuing book: {str(e)}")
             return {"error": f"Database error: {str(e)}"}
 
+    @staticmethod
+    async def issue_books_batch(member_id: int, book_ids: List[int]):
+        pool = await connect_db()
+
+        try:
+            issue_date = date.today()
+            due_date = issue_date + timedelta(days=BookLibraryConfig.DEFAULT_DUE_DAYS)
+
+            distinct_ids = list(dict.fromkeys(book_ids))
+            outcomes = await BookTransactionRepository.issue_books_batch(
+                pool, member_id, distinct_ids, issue_date, due_date, BookLibraryConfig.MAX_BOOKS_PER_MEMBER
+            )
+            if outcomes is None:
+                return {"error": "Member not found"}
+
+            by_book = {o["book_id"]: o for o in outcomes}
+            seen = set()
+            results = []
+            for book_id in book_ids:
+                outcome = by_book[book_id]
+                if book_id in seen:
+                    results.append({"book_id": book_id, "success": False, "error": "Duplicate book in request"})
+                elif outcome["outcome"] == "issued":
+                    results.append({
+                        "book_id": book_id,
+                        "success": True,
+                        "transaction_id": outcome["transaction_id"]
+                    })
+                else:
+                    results.append({
+                        "book_id": book_id,
+                        "success": False,
+                        "error": BookTransactionService._issue_error(outcome["outcome"])
+                    })
+                seen.add(book_id)
+
+            return {
+                "message": "Batch issue processed",
+                "member_id": member_id,
+                "issued_count": sum(1 for r in results if r["success"]),
+                "issue_date": issue_date,
+                "due_date": due_date,
+                "results": results
+            }
+
+        except Exception as e:
+            logger.error(f"Error issuing books in batch: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+    @staticmethod
+    def _issue_error(outcome: str) -> str:
+        if outcome == "member_not_found":
+            return "Member not found"
+        if outcome == "book_not_found":
+            return "Book not found"
+        if outcome == "unavailable":
+            return "No copies of this book are available"
+        if outcome == "limit_reached":
+            return f"Member has reached the limit of {BookLibraryConfig.MAX_BOOKS_PER_MEMBER} books"
+        return "Failed to issue book"
+
     @staticmethod
     async def return_book(transaction_id: int):
         pool = await connect_db()
@@ -89,7 +144,9 @@ class BookTransactionService:
             if transaction.get('return_date') is not None:
                 return {"error": "Book already returned"}
 
-            result = await BookTransactionRepository.mark_as_returned(pool, transaction_id)
+            result = await BookTransactionRepository.mark_as_returned(
+                pool, transaction_id, issue_date=transaction.get('issue_date')
+            )
 
             if result:
                 return {"message": "Book returned successfully"}
@@ -101,41 +158,312 @@ class BookTransactionService:
             return {"error": f"Database error: {str(e)}"}
 
     @staticmethod
-    async def get_issued_books():
+    async def return_books_batch(transaction_ids: List[int]):
+        pool = await connect_db()
+
+        try:
+            distinct_ids = list(dict.fromkeys(transaction_ids))
+            outcomes = await BookTransactionRepository.return_books_batch(pool, distinct_ids)
+
+            results = {"returned": [], "already_returned": [], "not_found": []}
+            for outcome in outcomes:
+                results[outcome["outcome"]].append(outcome["transaction_id"])
+
+            return {
+                "message": "Batch return processed",
+                "returned_count": len(results["returned"]),
+                **results
+            }
+
+        except Exception as e:
+            logger.error(f"Error returning books in batch: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+    @staticmethod
+    async def renew_book(transaction_id: int, days: Optional[int] = None):
+        pool = await connect_db()
+
+        try:
+            renewals = await BookTransactionRepository.renew_loans(
+                pool, days or BookLibraryConfig.RENEWAL_DAYS, BookLibraryConfig.MAX_BORROW_DURATION,
+                date.today(), transaction_id=transaction_id
+            )
+            if not renewals:
+                transaction = await BookTransactionRepository.get_transaction_by_id(pool, transaction_id)
+                if not transaction:
+                    return {"error": "Transaction not found"}
+                return {"error": "Book already returned"}
+
+            renewal = renewals[0]
+            if renewal["new_due_date"] is None:
+                return {"error": BookTransactionService._renewal_error()}
+
+            return {"message": "Loan renewed successfully", **renewal}
+
+        except Exception as e:
+            logger.error(f"Error renewing transaction: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+    @staticmethod
+    async def renew_member_loans(member_id: int, days: Optional[int] = None):
+        pool = await connect_db()
+
+        try:
+            renewals = await BookTransactionRepository.renew_loans(
+                pool, days or BookLibraryConfig.RENEWAL_DAYS, BookLibraryConfig.MAX_BORROW_DURATION,
+                date.today(), member_id=member_id
+            )
+            renewed = [r for r in renewals if r["new_due_date"] is not None]
+            not_renewed = [
+                {"transaction_id": r["transaction_id"], "error": BookTransactionService._renewal_error()}
+                for r in renewals if r["new_due_date"] is None
+            ]
+
+            return {
+                "message": "Renewal processed",
+                "member_id": member_id,
+                "renewed_count": len(renewed),
+                "renewed": renewed,
+                "not_renewed": not_renewed
+            }
+
+        except Exception as e:
+            logger.error(f"Error renewing member loans: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+    @staticmethod
+    def _renewal_error() -> str:
+        return f"Loan has reached the maximum borrow duration of {BookLibraryConfig.MAX_BORROW_DURATION} days"
+
+    @staticmethod
+    async def list_transactions(limit: Optional[int] = None, cursor: Optional[str] = None,
+                                status: Optional[TransactionStatus] = None, member_id: Optional[int] = None,
+                                book_id: Optional[int] = None, from_date: Optional[date] = None,
+                                to_date: Optional[date] = None, fields: Optional[str] = None):
+        limit = clamp_limit(limit, BookLibraryConfig.DEFAULT_PAGE_SIZE, BookLibraryConfig.MAX_PAGE_SIZE)
+        try:
+            after = decode_cursor(cursor)
+            columns = parse_fields(fields, TRANSACTION_COLUMNS, TRANSACTION_KEY_COLUMNS)
+        except (InvalidCursorError, InvalidFieldsError) as e:
+            return {"error": str(e)}
+        if from_date and to_date and from_date > to_date:
+            return {"error": "from_date must not be after to_date"}
+
+        pool = await connect_db()
+
+        try:
+            # Fetch one extra row to learn whether another page exists
+            rows = await BookTransactionRepository.get_transactions_page(
+                pool, limit + 1, after,
+                status=status.value if status else None,
+                member_id=member_id, book_id=book_id,
+                from_date=from_date, to_date=to_date,
+                columns=columns
+            )
+            transactions = rows[:limit]
+
+            next_cursor = None
+            if len(rows) > limit:
+                last = transactions[-1]
+                next_cursor = encode_cursor(last["created_at"], last["transaction_id"])
+
+            return {"transactions": transactions, "next_cursor": next_cursor, "limit": limit}
+        except Exception as e:
+            logger.error(f"Error listing transactions: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+    @staticmethod
+    async def get_member_history(member_id: int, from_date: Optional[date] = None, to_date: Optional[date] = None,
+                                 cursor: Optional[str] = None, limit: Optional[int] = None):
+        page = await BookTransactionService._loan_history(
+            from_date, to_date, cursor, limit, member_id=member_id
+        )
+        if "error" in page:
+            return page
+
+        totals = page.pop("totals")
+        return {
+            "member_id": member_id,
+            **page,
+            "total_count": totals["total_count"],
+            "total_books_borrowed": totals["distinct_books"],
+            "currently_borrowed": totals["currently_borrowed"]
+        }
+
+    @staticmethod
+    async def get_book_history(book_id: int, from_date: Optional[date] = None, to_date: Optional[date] = None,
+                               cursor: Optional[str] = None, limit: Optional[int] = None):
+        page = await BookTransactionService._loan_history(
+            from_date, to_date, cursor, limit, book_id=book_id
+        )
+        if "error" in page:
+            return page
+
+        totals = page.pop("totals")
+        return {
+            "book_id": book_id,
+            **page,
+            "total_count": totals["total_count"],
+            "times_borrowed": totals["total_count"],
+            "unique_borrowers": totals["distinct_members"],
+            "currently_borrowed": totals["currently_borrowed"]
+        }
+
+    @staticmethod
+    async def _loan_history(from_date: Optional[date], to_date: Optional[date], cursor: Optional[str],
+                            limit: Optional[int], member_id: Optional[int] = None, book_id: Optional[int] = None):
+        limit = clamp_limit(limit, BookLibraryConfig.SEARCH_PAGE_SIZE, BookLibraryConfig.MAX_PAGE_SIZE)
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError as e:
+            return {"error": str(e)}
+        if from_date and to_date and from_date > to_date:
+            return {"error": "from_date must not be after to_date"}
+
+        pool = await connect_db()
+
+        try:
+            # Fetch one extra row to learn whether another page exists
+            rows = await BookTransactionRepository.get_loan_history(
+                pool, limit + 1, member_id=member_id, book_id=book_id,
+                from_date=from_date, to_date=to_date, after=after
+            )
+        except Exception as e:
+            logger.error(f"Error getting loan history: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+        # Range aggregates are repeated on every row by the window functions
+        totals = {"total_count": 0, "distinct_books": 0, "distinct_members": 0, "currently_borrowed": 0}
+        for row in rows:
+            for name in totals:
+                totals[name] = row.pop(name)
+
+        records = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = records[-1]
+            next_cursor = encode_cursor(last["created_at"], last["transaction_id"])
+
+        return {
+            "records": [BookTransactionService._with_details(row) for row in records],
+            "next_cursor": next_cursor,
+            "limit": limit,
+            "totals": totals
+        }
+
+    @staticmethod
+    async def get_statistics(from_date: Optional[date] = None, to_date: Optional[date] = None):
+        today = date.today()
+        to_date = to_date or today
+        from_date = from_date or to_date - timedelta(days=BookLibraryConfig.STATISTICS_DEFAULT_DAYS - 1)
+        if from_date > to_date:
+            return {"error": "from_date must not be after to_date"}
+
+        pool = await connect_db()
+
+        try:
+            # Range figures come from the daily rollups: one row per day, not per loan
+            daily = await CirculationStatsRepository.get_daily_totals(pool, from_date, to_date)
+            today_totals = await CirculationStatsRepository.get_daily_totals(pool, today, today)
+            open_loans = await CirculationStatsRepository.get_open_loan_counts(pool, today)
+            most_borrowed_book = await CirculationStatsRepository.get_most_borrowed_book(pool, from_date, to_date)
+            most_active_member = await CirculationStatsRepository.get_most_active_member(pool, from_date, to_date)
+
+            today_row = today_totals[0] if today_totals else {"issued": 0, "returned": 0}
+            return {
+                "from_date": from_date,
+                "to_date": to_date,
+                "statistics": {
+                    "total_borrowings": sum(d["issued"] for d in daily),
+                    "total_returns": sum(d["returned"] for d in daily),
+                    "current_borrowings": open_loans["current_borrowings"],
+                    "overdue_borrowings": open_loans["overdue_borrowings"],
+                    "borrowings_today": today_row["issued"],
+                    "returns_today": today_row["returned"],
+                    "most_borrowed_book": most_borrowed_book,
+                    "most_active_member": most_active_member
+                },
+                "daily": daily
+            }
+        except Exception as e:
+            logger.error(f"Error getting borrowing statistics: {str(e)}")
+            return {"error": f"Database error: {str(e)}"}
+
+    @staticmethod
+    async def get_issued_books(fields: Optional[str] = None, include_details: bool = False):
+        try:
+            columns = BookTransactionService._loan_columns(fields, include_details)
+        except InvalidFieldsError as e:
+            return {"error": str(e)}
+
         pool = await connect_db()
 
         try:
-            active_transactions = await BookTransactionRepository.get_active_transactions(pool)
+            if include_details:
+                rows = await BookTransactionRepository.get_active_transactions_with_details(pool, False, columns)
+                return {"issued_books": [BookTransactionService._with_details(row) for row in rows]}
+            active_transactions = await BookTransactionRepository.get_active_transactions(pool, columns)
             return {"issued_books": active_transactions}
         except Exception as e:
             logger.error(f"Error getting issued books: {str(e)}")
             return {"error": f"Database error: {str(e)}"}
 
     @staticmethod
-    async def get_overdue_books():
+    async def get_overdue_books(fields: Optional[str] = None, include_details: bool = False):
+        try:
+            columns = BookTransactionService._loan_columns(fields, include_details)
+        except InvalidFieldsError as e:
+            return {"error": str(e)}
+
         pool = await connect_db()
 
         try:
-            await BookTransactionRepository.update_overdue_status(pool)
-            overdue_transactions = await BookTransactionRepository.get_overdue_transactions(pool)
+            # Statuses are flipped by the background overdue sweeper; this stays a pure read
+            if include_details:
+                rows = await BookTransactionRepository.get_active_transactions_with_details(pool, True, columns)
+                return {"overdue_books": [BookTransactionService._with_details(row) for row in rows]}
+            overdue_transactions = await BookTransactionRepository.get_overdue_transactions(pool, columns)
             return {"overdue_books": overdue_transactions}
         except Exception as e:
             logger.error(f"Error getting overdue books: {str(e)}")
             return {"error": f"Database error: {str(e)}"}
 
+    @staticmethod
+    def _loan_columns(fields: Optional[str], include_details: bool) -> Optional[List[str]]:
+        # Detailed rows always need the ids the book_info / member_info blocks are keyed on
+        required = ("transaction_id", "book_id", "member_id") if include_details else ("transaction_id",)
+        return parse_fields(fields, TRANSACTION_COLUMNS, required)
+
+    @staticmethod
+    def _with_details(row: dict) -> dict:
+        """Shape a joined row like BorrowingRecordWithDetails in borrowing_records.proto"""
+        days_overdue = row.pop("days_overdue")
+        book_info = {
+            "book_id": row["book_id"],
+            "title": row.pop("book_title"),
+            "author": row.pop("book_author"),
+            "isbn": row.pop("book_isbn")
+        }
+        member_info = {
+            "member_id": row["member_id"],
+            "first_name": row.pop("member_first_name"),
+            "last_name": row.pop("member_last_name"),
+            "email": row.pop("member_email")
+        }
+        return {
+            "record": row,
+            "book_info": book_info,
+            "member_info": member_info,
+            "days_overdue": days_overdue,
+            "is_overdue": days_overdue > 0
+        }
+
     @staticmethod
     async def get_member_issued_books(member_id: int):
         pool = await connect_db()
 
         try:
-            member_transactions = await BookTransactionRepository.get_transactions_by_member(pool, member_id)
-
-            active_books = [
-                t for t in member_transactions
-                if t["status"] in [TransactionStatus.ISSUED, TransactionStatus.OVERDUE]
-            ]
-
-            return active_books
+            return await BookTransactionRepository.get_active_transactions_by_member(pool, member_id)
         except Exception as e:
             logger.error(f"Error getting member issued books: {str(e)}")
             return {"error": f"Database error: {str(e)}"}
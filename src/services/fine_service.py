@@ -0,0 +1,54 @@
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import HTTPException
+
+from src.db import connect_db
+from src.config.book_library_config import BookLibraryConfig
+from src.models.fine_model import FineStatus
+from src.repositories.fine_repository import FineRepository
+
+logger = logging.getLogger(__name__)
+
+class FineService:
+
+    @staticmethod
+    async def assess_fines():
+        # Always today: a future date would fine loans that are not overdue yet and
+        # a past one would roll unpaid fines back, neither of which later sweeps undo
+        as_of = date.today()
+        pool = await connect_db()
+        counts = await FineRepository.assess_overdue_fines(pool, as_of, BookLibraryConfig.FINE_PER_DAY)
+        logger.info(f"Fine assessment as of {as_of}: {counts['created']} created, {counts['updated']} updated")
+        return {"message": "Fines assessed", "as_of": as_of, **counts}
+
+    @staticmethod
+    async def get_member_fines(member_id: int, status: Optional[FineStatus] = None):
+        pool = await connect_db()
+        fines = await FineRepository.get_fines_by_member(pool, member_id, status.value if status else None)
+        outstanding = sum(
+            (fine["amount"] for fine in fines if fine["status"] == FineStatus.UNPAID.value), Decimal("0")
+        )
+        return {"member_id": member_id, "outstanding_amount": outstanding, "fines": fines}
+
+    @staticmethod
+    async def pay_fine(fine_id: int):
+        return await FineService._settle_fine(fine_id, FineStatus.PAID, date.today())
+
+    @staticmethod
+    async def waive_fine(fine_id: int):
+        return await FineService._settle_fine(fine_id, FineStatus.WAIVED, None)
+
+    @staticmethod
+    async def _settle_fine(fine_id: int, status: FineStatus, paid_date: Optional[date]):
+        pool = await connect_db()
+        fine = await FineRepository.settle_fine(pool, fine_id, status.value, paid_date)
+        if fine:
+            return {"message": f"Fine {status.value.lower()}", "fine": fine}
+
+        existing = await FineRepository.get_fine(pool, fine_id)
+        if not existing:
+            raise HTTPException(status_code=404, detail="Fine not found")
+        raise HTTPException(status_code=409, detail=f"Fine is already {existing['status']}")
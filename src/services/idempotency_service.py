@@ -0,0 +1,90 @@
+import logging
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.db import bind_connection, connect_db
+from src.config.book_library_config import BookLibraryConfig
+from src.repositories.idempotency_repository import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+
+class _TransientResult(Exception):
+    """Carries a result that must not be stored out of the transaction, rolling it back"""
+
+    def __init__(self, result: Any):
+        super().__init__()
+        self.result = result
+
+
+class IdempotencyService:
+
+    @staticmethod
+    async def run(scope: str, key: str, fingerprint: str, operation: Callable[[], Awaitable[Any]]):
+        """Run ``operation`` at most once per (scope, key) and replay its stored result to retries.
+
+        The claim, the operation's own writes and the stored response commit in
+        one database transaction: the operation runs with that transaction's
+        connection bound to ``connect_db()``. A crash, cancellation or error
+        before commit leaves neither the work nor the key behind, so the retry
+        simply runs again. ``fingerprint`` identifies the request parameters;
+        reusing a key for a different request is refused. Database errors are not
+        stored either.
+        """
+        pool = await connect_db()
+
+        # A retry is normally answered right here, by one primary-key lookup
+        entry = await IdempotencyRepository.get_entry(pool, scope, key)
+        if entry is not None:
+            return IdempotencyService._replay(entry, fingerprint)
+
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    with bind_connection(conn) as bound:
+                        # A concurrent request with the same key waits here until this transaction ends
+                        claimed = await IdempotencyRepository.claim(
+                            bound, scope, key, fingerprint, BookLibraryConfig.IDEMPOTENCY_KEY_TTL_SECONDS
+                        )
+                        if not claimed:
+                            entry = await IdempotencyRepository.get_entry(bound, scope, key)
+                            if entry is None:
+                                raise HTTPException(
+                                    status_code=409, detail="Idempotency-Key could not be claimed, retry"
+                                )
+                            return IdempotencyService._replay(entry, fingerprint)
+
+                        result = await operation()
+                        if IdempotencyService._is_transient(result):
+                            raise _TransientResult(result)
+                        await IdempotencyRepository.complete(bound, scope, key, jsonable_encoder(result))
+        except _TransientResult as e:
+            # Rolled back, claim included
+            return e.result
+        return result
+
+    @staticmethod
+    def _replay(entry: dict, fingerprint: str):
+        if entry["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if entry["response"] is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        return JSONResponse(content=entry["response"], headers={"Idempotent-Replayed": "true"})
+
+    @staticmethod
+    def _is_transient(result: Any) -> bool:
+        error = result.get("error") if isinstance(result, dict) else None
+        return isinstance(error, str) and error.startswith("Database error")
+
+    @staticmethod
+    async def delete_expired() -> int:
+        pool = await connect_db()
+        deleted = 0
+        while True:
+            batch = await IdempotencyRepository.delete_expired(pool, BookLibraryConfig.IDEMPOTENCY_CLEANUP_BATCH_SIZE)
+            deleted += batch
+            if batch < BookLibraryConfig.IDEMPOTENCY_CLEANUP_BATCH_SIZE:
+                return deleted
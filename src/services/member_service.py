@@ -1,8 +1,16 @@
+from typing import List, Optional
+
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from asyncpg import UniqueViolationError
 
 from src.db import connect_db
-from src.repositories.member_repository import MemberRepository
+from src.config.book_library_config import BookLibraryConfig
+from src.utils.serialization import DataFormat, encode_records
+from src.repositories.member_repository import MEMBER_COLUMNS, MemberRepository
+from src.repositories.table_version_repository import TableVersionRepository
+from src.utils.projection import InvalidFieldsError, parse_fields
+from src.utils.etag import conditional_response, etag_matches, make_etag, not_modified
 
 class MemberService:
 
@@ -28,11 +36,61 @@ class MemberService:
         return dict(result)
 
     @staticmethod
-    async def get_all_members():
+    def member_etag(member: dict) -> str:
+        return make_etag("member", member["member_id"], member["row_version"])
+
+    @staticmethod
+    async def get_member_conditional(member_id: int, if_none_match: Optional[str] = None):
+        member = await MemberService.get_member(member_id)
+        return conditional_response(member, MemberService.member_etag(member), if_none_match)
+
+    @staticmethod
+    async def get_all_members_conditional(fields: Optional[str] = None, if_none_match: Optional[str] = None):
+        pool = await connect_db()
+        version = await TableVersionRepository.get_version(pool, "members")
+        etag = make_etag("members", version, fields)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        members = await MemberService.get_all_members(fields)
+        return conditional_response(members, etag)
+
+    @staticmethod
+    async def batch_get_members(member_ids: List[int]):
         pool = await connect_db()
-        rows = await MemberRepository.get_all_members(pool)
+        rows = await MemberRepository.get_members_by_ids(pool, list(dict.fromkeys(member_ids)))
+        members = {row["member_id"]: dict(row) for row in rows}
+
+        # Request order, one entry per requested id, with explicit not-found markers
+        return {
+            "results": [
+                {"member_id": member_id, "found": True, "member": members[member_id]}
+                if member_id in members else {"member_id": member_id, "found": False}
+                for member_id in member_ids
+            ]
+        }
+
+    @staticmethod
+    async def get_all_members(fields: Optional[str] = None):
+        try:
+            columns = parse_fields(fields, MEMBER_COLUMNS, ("member_id",))
+        except InvalidFieldsError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        pool = await connect_db()
+        rows = await MemberRepository.get_all_members(pool, columns)
         return [dict(r) for r in rows]
 
+    @staticmethod
+    async def export_members(fmt: DataFormat):
+        pool = await connect_db()
+        rows = MemberRepository.stream_members(pool, BookLibraryConfig.EXPORT_FETCH_SIZE)
+        return StreamingResponse(
+            encode_records(rows, fmt),
+            media_type=fmt.media_type,
+            headers={"Content-Disposition": f'attachment; filename="members.{fmt.value}"'},
+        )
+
     @staticmethod
     async def update_member(member_id: int, member):
         pool = await connect_db()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from src.cache import invalidate_books
+from src.config.book_library_config import BookLibraryConfig
+from src.db import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Table name -> callbacks taking an event dict with "table", "op" and "ids".
+# "ids" is None when the whole table may have changed.
+_subscribers: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+
+
+def subscribe(table: str, callback: Callable[[dict], None]) -> None:
+    """Call ``callback`` for every change to ``table`` committed by any worker, this one included."""
+    _subscribers[table].append(callback)
+
+
+def dispatch(event: dict) -> None:
+    for callback in _subscribers.get(event["table"], []):
+        try:
+            callback(event)
+        except Exception as e:
+            logger.error(f"Error handling {event['table']} change: {str(e)}")
+
+
+def parse_payload(payload: str) -> Optional[dict]:
+    """Turn a NOTIFY payload from migration 013 into an event dict, or None if it is malformed"""
+    try:
+        data = json.loads(payload)
+        event = {key: value for key, value in data.items() if key not in ("t", "all")}
+        event["table"] = data["t"]
+        event["op"] = data["op"]
+        event["ids"] = None if data.get("all") else data["ids"]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+    return event
+
+
+def reset_all() -> None:
+    """Tell every subscriber its whole table may have changed, e.g. after notifications were missed"""
+    for table in list(_subscribers):
+        dispatch({"table": table, "op": "RESET", "ids": None})
+
+
+def _on_notification(connection, pid, channel, payload) -> None:
+    event = parse_payload(payload)
+    if event is None:
+        logger.warning(f"Ignoring malformed change feed payload: {payload[:200]}")
+        return
+    dispatch(event)
+
+
+async def run_change_feed(dsn: Optional[str] = None):
+    """Listen for table changes on a dedicated connection and fan them out to the subscribers.
+
+    Notifications sent while no connection is listening are lost, so caches are
+    reset every time the listener (re)connects.
+    """
+    dsn = dsn or DATABASE_URL
+    channel = BookLibraryConfig.CHANGE_FEED_CHANNEL
+    delay = 1
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            await connection.add_listener(channel, _on_notification)
+            reset_all()
+            delay = 1
+            logger.info(f"Change feed listening on {channel}")
+
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), BookLibraryConfig.CHANGE_FEED_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Catches half-open connections that would otherwise wait forever
+                    try:
+                        await connection.execute(
+                            "SELECT 1", timeout=BookLibraryConfig.CHANGE_FEED_PROBE_TIMEOUT_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        break
+            logger.warning("Change feed connection lost, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in change feed listener: {str(e)}")
+        finally:
+            if connection is not None and not connection.is_closed():
+                connection.terminate()
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, BookLibraryConfig.CHANGE_FEED_RECONNECT_MAX_SECONDS)
+
+
+subscribe("books", invalidate_books)
@@ -0,0 +1,23 @@
+import asyncio
+import logging
+from typing import Optional
+
+from src.config.book_library_config import BookLibraryConfig
+from src.services.idempotency_service import IdempotencyService
+
+logger = logging.getLogger(__name__)
+
+
+async def run_idempotency_cleanup(interval: Optional[float] = None):
+    """Purge expired Idempotency-Key entries every ``interval`` seconds."""
+    interval = interval or BookLibraryConfig.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS
+    while True:
+        try:
+            deleted = await IdempotencyService.delete_expired()
+            if deleted:
+                logger.info(f"Idempotency cleanup deleted {deleted} expired key(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error cleaning up idempotency keys: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from src.db import connect_db
+from src.config.book_library_config import BookLibraryConfig
+from src.repositories.book_transaction_repository import BookTransactionRepository
+from src.services.fine_service import FineService
+
+logger = logging.getLogger(__name__)
+
+# Wait a little past midnight so CURRENT_DATE on the database has rolled over too
+ROLLOVER_GRACE_SECONDS = 5
+
+
+def seconds_until_next_sweep(now: datetime, interval: float) -> float:
+    """Sleep for ``interval`` seconds, but never past the next date rollover."""
+    next_rollover = datetime.combine(now.date() + timedelta(days=1), time.min)
+    until_rollover = (next_rollover - now).total_seconds() + ROLLOVER_GRACE_SECONDS
+    return max(0.0, min(interval, until_rollover))
+
+
+async def sweep_overdue() -> int:
+    """Flip Issued loans past their due date to Overdue; returns the rows updated."""
+    pool = await connect_db()
+    updated = await BookTransactionRepository.update_overdue_status(pool)
+    if updated:
+        logger.info(f"Overdue sweep marked {updated} transaction(s) as overdue")
+    return updated
+
+
+async def run_overdue_sweeper(interval: Optional[float] = None):
+    """Sweep and assess fines once at startup, then after every date rollover and every ``interval`` seconds."""
+    interval = interval or BookLibraryConfig.OVERDUE_SWEEP_INTERVAL_SECONDS
+    while True:
+        try:
+            await sweep_overdue()
+            # Day counts move on date rollover and late returns settle within one interval
+            await FineService.assess_fines()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sweeping overdue transactions: {str(e)}")
+        await asyncio.sleep(seconds_until_next_sweep(datetime.now(), interval))
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import Optional
+
+from src.db import connect_db
+from src.config.book_library_config import BookLibraryConfig
+from src.repositories.book_transaction_repository import BookTransactionRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def maintain_partitions():
+    """Create upcoming book_transactions partitions and archive old fully returned ones."""
+    pool = await connect_db()
+    actions = await BookTransactionRepository.maintain_partitions(
+        pool,
+        BookLibraryConfig.PARTITION_MONTHS_AHEAD,
+        BookLibraryConfig.PARTITION_ARCHIVE_AFTER_MONTHS
+    )
+    for action in actions:
+        logger.info(f"Partition maintenance {action['action']} {action['partition_name']}")
+    return actions
+
+
+async def run_partition_maintenance(interval: Optional[float] = None):
+    """Run partition maintenance at startup and then every ``interval`` seconds."""
+    interval = interval or BookLibraryConfig.PARTITION_MAINTENANCE_INTERVAL_SECONDS
+    while True:
+        try:
+            await maintain_partitions()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error maintaining transaction partitions: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,33 @@
+"""
+Strong ETag helpers for conditional GET (If-None-Match / 304 Not Modified).
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2s(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def conditional_response(payload: Any, etag: str, if_none_match: Optional[str] = None) -> Response:
+    """304 if the client already holds ``etag``, otherwise ``payload`` as JSON tagged with it"""
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return JSONResponse(content=jsonable_encoder(payload), headers={"ETag": etag})
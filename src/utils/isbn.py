@@ -0,0 +1,47 @@
+"""
+ISBN-10 / ISBN-13 normalization for barcode lookups.
+"""
+import re
+from typing import List, Optional
+
+_SEPARATORS = re.compile(r"[\s\-]")
+
+
+def _isbn10_check_digit(body: str) -> str:
+    total = sum((10 - i) * int(d) for i, d in enumerate(body))
+    check = (11 - total % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def _isbn13_check_digit(body: str) -> str:
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(body))
+    return str((10 - total % 10) % 10)
+
+
+def normalize_isbn(raw: Optional[str]) -> Optional[str]:
+    """Return the canonical ISBN-13 for ``raw`` (hyphens/spaces allowed), or None if it is not a valid ISBN"""
+    if not raw:
+        return None
+    isbn = _SEPARATORS.sub("", raw).upper()
+
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        if _isbn10_check_digit(isbn[:9]) != isbn[9]:
+            return None
+        body = "978" + isbn[:9]
+        return body + _isbn13_check_digit(body)
+
+    if len(isbn) == 13 and isbn.isdigit() and isbn[:3] in ("978", "979"):
+        if _isbn13_check_digit(isbn[:12]) != isbn[12]:
+            return None
+        return isbn
+
+    return None
+
+
+def isbn_variants(isbn13: str) -> List[str]:
+    """Both stored spellings of a canonical ISBN-13: itself and, for the 978 prefix, its ISBN-10"""
+    variants = [isbn13]
+    if isbn13.startswith("978"):
+        body = isbn13[3:12]
+        variants.append(body + _isbn10_check_digit(body))
+    return variants
@@ -0,0 +1,38 @@
+"""
+Opaque cursor tokens for keyset (seek) pagination.
+
+A cursor holds the sort key of the last row on a page, so the next page can
+start with a ``WHERE (sort_key) < (cursor)`` predicate. That stays index-only
+however deep the client pages, unlike LIMIT/OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def clamp_limit(limit: Optional[int], default: int, maximum: int) -> int:
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
@@ -0,0 +1,27 @@
+"""
+Sparse fieldsets: turn a ``fields=a,b,c`` query parameter into a whitelisted
+column list that is safe to interpolate into SQL.
+"""
+from typing import List, Optional, Sequence
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when ``fields`` names a column outside the whitelist"""
+    pass
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], required: Sequence[str] = ()) -> Optional[List[str]]:
+    """Validate ``fields`` against ``allowed`` and return the columns to select.
+
+    ``required`` columns (ids, pagination keys) are always included first.
+    Returns None when no projection was requested, meaning "all columns".
+    """
+    if not fields:
+        return None
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown field(s): {', '.join(unknown)}")
+
+    return list(dict.fromkeys([*required, *requested]))
@@ -0,0 +1,101 @@
+"""
+Row encoders shared by the catalog export endpoints.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, Mapping, Optional, Tuple
+
+
+class DataFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is DataFormat.NDJSON else "text/csv"
+
+    @classmethod
+    def from_content_type(cls, content_type: Optional[str]) -> "DataFormat":
+        if content_type and content_type.split(";")[0].strip().lower() in ("text/csv", "application/csv"):
+            return cls.CSV
+        return cls.NDJSON
+
+
+def _json_default(value: Any):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def encode_records(records: AsyncIterator[Mapping[str, Any]], fmt: DataFormat,
+                         chunk_rows: int = 500) -> AsyncIterator[str]:
+    """Encode an async stream of records, yielding text chunks of up to ``chunk_rows`` rows.
+
+    Chunking keeps the per-row overhead of the ASGI send path low while still
+    flushing the first rows as soon as the database hands them over.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt is DataFormat.CSV else None
+    header_written = False
+    pending = 0
+
+    async for record in records:
+        if writer is not None:
+            if not header_written:
+                writer.writerow(record.keys())
+                header_written = True
+            writer.writerow([_csv_value(v) for v in record.values()])
+        else:
+            buffer.write(json.dumps(dict(record), default=_json_default, separators=(",", ":")))
+            buffer.write("\n")
+
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def decode_records(text: str, fmt: DataFormat) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Parse an uploaded document into ``(line_no, record, error)`` tuples.
+
+    A line that cannot be parsed yields ``record=None`` and an error message
+    instead of aborting the whole upload, so callers can report it per row.
+    """
+    if fmt is DataFormat.CSV:
+        reader = csv.DictReader(io.StringIO(text))
+        for row in reader:
+            # Treat empty and absent cells as missing values, so model defaults apply
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}, None
+        return
+
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, record, None
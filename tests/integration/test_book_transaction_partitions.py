@@ -0,0 +1,150 @@
+"""Checks for maintain_book_transaction_partitions() (migration 008).
+
+Runs only when LIBRARY_TEST_DATABASE_URL points at a database with the schema
+and migrations applied. Every test runs inside a transaction that is rolled back.
+"""
+import os
+from datetime import date, timedelta
+
+import asyncpg
+import pytest
+
+DATABASE_URL = os.getenv("LIBRARY_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="LIBRARY_TEST_DATABASE_URL is not set")
+
+LOCK_KEY = "hashtext('maintain_book_transaction_partitions')"
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.year * 12 + day.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"book_transactions_p{month:%Y_%m}"
+
+
+@pytest.fixture
+async def conn():
+    conn = await asyncpg.connect(DATABASE_URL)
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        yield conn
+    finally:
+        await tr.rollback()
+        await conn.close()
+
+
+async def _maintain(conn, months_ahead, archive_after_months):
+    rows = await conn.fetch(
+        "SELECT * FROM maintain_book_transaction_partitions($1, $2)", months_ahead, archive_after_months
+    )
+    return [(row["action"], row["partition_name"]) for row in rows]
+
+
+async def _insert_loan(conn, issue_date, return_date=None):
+    return await conn.fetchval(
+        """
+        INSERT INTO book_transactions (issue_date, due_date, return_date, status)
+        VALUES ($1, $2, $3, $4)
+        RETURNING transaction_id
+        """,
+        issue_date, issue_date + timedelta(days=15), return_date,
+        'Returned' if return_date else 'Issued'
+    )
+
+
+async def _partition_of(conn, transaction_id):
+    return await conn.fetchval(
+        "SELECT tableoid::regclass::text FROM book_transactions WHERE transaction_id = $1", transaction_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_creates_upcoming_partitions_once(conn):
+    """Test that the months ahead are created and a second run has nothing to do"""
+    # Act
+    await _maintain(conn, 12, None)
+    second = await _maintain(conn, 12, None)
+
+    # Assert
+    this_month = date.today().replace(day=1)
+    for i in range(13):
+        name = _partition_name(_add_months(this_month, i))
+        assert await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name), f"{name} missing"
+    assert second == []
+
+
+@pytest.mark.asyncio
+async def test_moves_default_partition_rows_into_new_partition(conn):
+    """Test that loans parked in the default partition move into their month once it is created"""
+    # Arrange
+    month = _add_months(date.today().replace(day=1), 24)
+    transaction_id = await _insert_loan(conn, month + timedelta(days=4))
+    assert await _partition_of(conn, transaction_id) == "book_transactions_default"
+
+    # Act
+    actions = await _maintain(conn, 24, None)
+
+    # Assert
+    assert ("created", _partition_name(month)) in actions
+    assert await _partition_of(conn, transaction_id) == _partition_name(month)
+
+
+@pytest.mark.asyncio
+async def test_archives_only_fully_returned_partitions(conn):
+    """Test that old partitions move to the archive schema unless a loan is still open"""
+    # Arrange
+    returned_month = date(2000, 1, 1)
+    open_month = date(2000, 2, 1)
+    for month in (returned_month, open_month):
+        assert await conn.fetchval("SELECT create_book_transaction_partition($1)", month) is not None
+    await _insert_loan(conn, returned_month + timedelta(days=2), returned_month + timedelta(days=10))
+    await _insert_loan(conn, open_month + timedelta(days=2))
+
+    # Act
+    actions = await _maintain(conn, 0, 24)
+
+    # Assert
+    assert ("archived", _partition_name(returned_month)) in actions
+    assert ("archived", _partition_name(open_month)) not in actions
+    assert await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"archive.{_partition_name(returned_month)}")
+    assert await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"public.{_partition_name(open_month)}")
+
+
+@pytest.mark.asyncio
+async def test_null_retention_archives_nothing(conn):
+    """Test that archive_after_months=NULL only creates partitions"""
+    # Arrange
+    month = date(2000, 3, 1)
+    await conn.fetchval("SELECT create_book_transaction_partition($1)", month)
+    await _insert_loan(conn, month + timedelta(days=2), month + timedelta(days=10))
+
+    # Act
+    actions = await _maintain(conn, 0, None)
+
+    # Assert
+    assert all(action == "created" for action, _ in actions)
+    assert await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"public.{_partition_name(month)}")
+
+
+@pytest.mark.asyncio
+async def test_skips_while_another_run_holds_the_lock(conn):
+    """Test that a concurrent run returns without touching any partition"""
+    # Arrange
+    other = await asyncpg.connect(DATABASE_URL)
+    try:
+        async with other.transaction():
+            await other.execute(f"SELECT pg_advisory_xact_lock({LOCK_KEY})")
+
+            # Act
+            actions = await _maintain(conn, 36, None)
+
+        # Assert
+        assert actions == []
+        name = _partition_name(_add_months(date.today().replace(day=1), 36))
+        assert not await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+    finally:
+        await other.close()
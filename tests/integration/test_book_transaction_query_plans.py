@@ -0,0 +1,139 @@
+"""EXPLAIN checks for the book_transactions repository queries.
+
+Runs only when LIBRARY_TEST_DATABASE_URL points at a database with the schema
+and migrations applied. Each repository method is called against a connection
+that EXPLAINs its SQL instead of running it; sequential scans are disabled so
+the planner picks an index whenever a usable one exists, whatever the table size.
+"""
+import json
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import date
+
+import asyncpg
+import pytest
+
+from src.repositories.book_transaction_repository import BookTransactionRepository
+
+DATABASE_URL = os.getenv("LIBRARY_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="LIBRARY_TEST_DATABASE_URL is not set")
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+class ExplainingConnection:
+    """Stands in for an asyncpg connection and records the plan of every statement."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.plans = []
+
+    async def _explain(self, query, *args):
+        plan = await self.conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+        self.plans.append(json.loads(plan)[0]["Plan"])
+
+    async def fetch(self, query, *args):
+        await self._explain(query, *args)
+        return []
+
+    async def fetchrow(self, query, *args):
+        await self._explain(query, *args)
+        return defaultdict(lambda: None)
+
+    async def fetchval(self, query, *args):
+        await self._explain(query, *args)
+        return 0
+
+    def transaction(self):
+        # Nested in the fixture's transaction, i.e. a savepoint
+        return self.conn.transaction()
+
+    async def execute(self, query, *args):
+        await self._explain(query, *args)
+        return "UPDATE 0"
+
+
+class ExplainingPool:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _scans_on(plan, relation):
+    """Yield ``(node type, relation name)`` for every scan of ``relation`` or one of its partitions.
+
+    ModifyTable nodes name the table they write but read nothing themselves, so
+    only scan nodes are reported.
+    """
+    name = plan.get("Relation Name") or ""
+    if "Scan" in plan["Node Type"] and (name == relation or name.startswith(relation + "_")):
+        yield plan["Node Type"], name
+    for child in plan.get("Plans", []):
+        yield from _scans_on(child, relation)
+
+
+@pytest.fixture
+async def explaining_pool():
+    conn = await asyncpg.connect(DATABASE_URL)
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        yield ExplainingPool(ExplainingConnection(conn))
+    finally:
+        await tr.rollback()
+        await conn.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, args", [
+    ("get_transactions_page", (50,)),
+    ("get_loan_history", (20, 1)),
+    ("get_transactions_by_book", (1,)),
+    ("get_transactions_by_member", (1,)),
+    ("get_active_transactions_by_member", (1,)),
+    ("get_active_transactions", ()),
+    ("get_overdue_transactions", ()),
+    ("get_active_transactions_with_details", (True,)),
+    ("update_overdue_status", ()),
+    ("is_book_available", (1,)),
+    ("get_member_active_books_count", (1,)),
+    ("get_book_issued_members", (1,)),
+    ("get_transaction_by_id", (1,)),
+    ("mark_as_returned", (1, date(2024, 1, 20), date(2024, 1, 10))),
+    ("mark_as_returned", (1, date(2024, 1, 20))),
+    ("issue_books_batch", (1, [1, 2], date(2024, 1, 10), date(2024, 1, 25), 5)),
+    ("return_books_batch", ([1, 2],)),
+    ("renew_loans", (7, 30, date(2024, 1, 10), 1)),
+    ("renew_loans", (7, 30, date(2024, 1, 10), None, 1)),
+])
+async def test_book_transactions_query_uses_index(explaining_pool, method, args):
+    """Test that the repository query reads book_transactions through an index"""
+    # Act
+    await getattr(BookTransactionRepository, method)(explaining_pool, *args)
+
+    # Assert
+    plans = explaining_pool.conn.plans
+    assert plans, f"{method} issued no statement"
+    scans = [node for plan in plans for node, _ in _scans_on(plan, "book_transactions")]
+    # Statements that only touch books / members, or only INSERT, read no book_transactions rows
+    assert scans, f"{method} never reads book_transactions"
+    assert set(scans) <= INDEX_SCANS, f"{method} plan scans book_transactions with {scans}"
+
+
+@pytest.mark.asyncio
+async def test_mark_as_returned_with_issue_date_prunes_partitions(explaining_pool):
+    """Test that passing the issue_date confines the return to a single partition"""
+    # Act
+    await BookTransactionRepository.mark_as_returned(explaining_pool, 1, date(2024, 1, 20), date(2024, 1, 10))
+
+    # Assert
+    plan = explaining_pool.conn.plans[0]
+    partitions = {name for _, name in _scans_on(plan, "book_transactions")}
+    assert len(partitions) == 1, f"mark_as_returned scans {sorted(partitions)}"
@@ -0,0 +1,43 @@
+"""Checks that the normalize_isbn() SQL function (migration 014) agrees with src/utils/isbn.py.
+
+Runs only when LIBRARY_TEST_DATABASE_URL points at a database with the schema
+and migrations applied.
+"""
+import os
+
+import asyncpg
+import pytest
+
+from src.utils.isbn import normalize_isbn
+
+DATABASE_URL = os.getenv("LIBRARY_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="LIBRARY_TEST_DATABASE_URL is not set")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("raw", [
+    "0-7432-7356-7",
+    "0743273567",
+    "978-0-7432-7356-5",
+    "9780743273565",
+    "080442957X",
+    "0 8044 2957 x",
+    "9791234567896",
+    "0743273568",
+    "9780743273566",
+    "9771234567898",
+    "12345",
+    "",
+])
+async def test_sql_normalize_isbn_matches_python(raw):
+    """Test that the backfill canonicalizes exactly like the write path"""
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        # Act
+        result = await conn.fetchval("SELECT normalize_isbn($1)", raw)
+
+        # Assert
+        assert result == normalize_isbn(raw)
+    finally:
+        await conn.close()
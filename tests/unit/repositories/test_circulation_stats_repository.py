@@ -0,0 +1,59 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+from src.repositories.circulation_stats_repository import CirculationStatsRepository, _whole_months
+
+
+@pytest.fixture
+def mock_conn():
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value=None)
+    return conn
+
+
+@pytest.fixture
+def mock_pool(mock_conn):
+    """Mock database connection pool handing out mock_conn"""
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=mock_conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool
+
+
+class TestCirculationStatsRepository:
+
+    # ===========================
+    # Test _whole_months
+    # ===========================
+
+    @pytest.mark.parametrize("from_date, to_date, expected", [
+        (date(2024, 1, 1), date(2024, 12, 31), (date(2024, 1, 1), date(2025, 1, 1))),
+        (date(2024, 1, 15), date(2024, 3, 10), (date(2024, 2, 1), date(2024, 3, 1))),
+        (date(2024, 1, 31), date(2024, 3, 31), (date(2024, 2, 1), date(2024, 4, 1))),
+        (date(2024, 2, 1), date(2024, 2, 29), (date(2024, 2, 1), date(2024, 3, 1))),
+        (date(2024, 12, 2), date(2025, 1, 30), (date(2025, 1, 31), date(2025, 1, 31))),
+        (date(2024, 1, 15), date(2024, 1, 20), (date(2024, 1, 21), date(2024, 1, 21))),
+    ])
+    def test_whole_months(self, from_date, to_date, expected):
+        """Test that only calendar months entirely inside the range go to the monthly rollups"""
+        assert _whole_months(from_date, to_date) == expected
+
+    # ===========================
+    # Test get_most_borrowed_book / get_most_active_member
+    # ===========================
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method", [
+        CirculationStatsRepository.get_most_borrowed_book,
+        CirculationStatsRepository.get_most_active_member,
+    ])
+    async def test_top_queries_split_range(self, mock_pool, mock_conn, method):
+        """Test that whole months and edge days are passed as separate bounds"""
+        # Act
+        result = await method(mock_pool, date(2024, 1, 15), date(2024, 3, 10))
+
+        # Assert
+        assert result is None
+        args = mock_conn.fetchrow.call_args.args[1:]
+        assert args == (date(2024, 1, 15), date(2024, 3, 10), date(2024, 2, 1), date(2024, 3, 1))
@@ -1,10 +1,18 @@
+import csv
+import io
+import json
 import pytest
 import asyncio
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch, Mock
 from fastapi import HTTPException
 from asyncpg.exceptions import UniqueViolationError
 
+from src.cache import book_cache, isbn_miss_cache
+from src.models.book_model import BookFacet
 from src.services.book_service import BookService
+from src.utils.serialization import DataFormat
+from src.utils.pagination import decode_cursor, encode_cursor
 
 # Sample test data
 SAMPLE_BOOK_DATA = {
@@ -21,7 +29,8 @@ SAMPLE_BOOK_DATA = {
 SAMPLE_BOOK_RESPONSE = {
     "book_id": 1,
     **SAMPLE_BOOK_DATA,
-    "created_at": "2024-01-01"
+    "created_at": "2024-01-01",
+    "row_version": 1
 }
 
 SAMPLE_BOOKS_LIST = [
@@ -43,6 +52,17 @@ def mock_connect_db(mock_pool):
         yield mock_pool
 
 
+@pytest.fixture(autouse=True)
+def clear_book_cache():
+    """Start every test with empty book caches"""
+    for cache in (book_cache, isbn_miss_cache):
+        cache.clear()
+        cache.hits = cache.misses = 0
+    yield
+    for cache in (book_cache, isbn_miss_cache):
+        cache.clear()
+
+
 class TestBookService:
 
     # ====================
@@ -103,6 +123,139 @@ class TestBookService:
             # Assert
             assert str(exc_info.value) == "Database error"
 
+    # ======================
+    # Test import_books method
+    # ======================
+
+    @pytest.mark.asyncio
+    async def test_import_books_csv(self, mock_connect_db):
+        """Test importing a CSV upload stages valid rows and merges repository rejects"""
+        # Arrange
+        payload = (
+            "title,author,isbn,publication_year,total_copies,available_copies\n"
+            "Book A,Author A,111,2001,2,2\n"
+            "Book B,Author B,222,,1,1\n"
+            "Book C,Author C,111,2003,1,1\n"
+        ).encode()
+
+        with patch('src.services.book_service.BookRepository.bulk_import_books',
+                   new_callable=AsyncMock) as mock_bulk_import:
+            mock_bulk_import.return_value = (2, [{"line_no": 4, "isbn": "111", "reason": "Duplicate ISBN in upload"}])
+
+            # Act
+            result = await BookService.import_books(payload, DataFormat.CSV)
+
+            # Assert
+            pool, records = mock_bulk_import.call_args.args
+            assert pool is mock_connect_db
+            assert records[0] == (2, "Book A", "Author A", "111", 2001, None, None, 2, 2)
+            assert records[1][4] is None
+            assert result == {
+                "message": "Books imported successfully",
+                "received": 3,
+                "inserted": 2,
+                "rejected": [{"line": 4, "isbn": "111", "reason": "Duplicate ISBN in upload"}],
+            }
+
+    @pytest.mark.asyncio
+    async def test_import_books_csv_empty_cells_use_defaults(self, mock_connect_db):
+        """Test that empty optional and defaulted CSV cells fall back to the model defaults"""
+        # Arrange
+        payload = (
+            "title,author,isbn,publication_year,publisher,genre,total_copies,available_copies\n"
+            "Book A,Author A,,,,,,\n"
+            "Book B,Author B\n"
+        ).encode()
+
+        with patch('src.services.book_service.BookRepository.bulk_import_books',
+                   new_callable=AsyncMock) as mock_bulk_import:
+            mock_bulk_import.return_value = (2, [])
+
+            # Act
+            result = await BookService.import_books(payload, DataFormat.CSV)
+
+            # Assert
+            _, records = mock_bulk_import.call_args.args
+            assert records == [
+                (2, "Book A", "Author A", None, None, None, None, 1, 1),
+                (3, "Book B", "Author B", None, None, None, None, 1, 1),
+            ]
+            assert result["rejected"] == []
+
+    @pytest.mark.asyncio
+    async def test_import_books_canonicalizes_isbns(self, mock_connect_db):
+        """Test that valid ISBNs are staged as canonical ISBN-13 and invalid ones as submitted"""
+        # Arrange
+        payload = (
+            "title,author,isbn\n"
+            "Book A,Author A,0-7432-7356-7\n"
+            "Book B,Author B,978-0-06-112008-4\n"
+            "Book C,Author C,12345\n"
+        ).encode()
+
+        with patch('src.services.book_service.BookRepository.bulk_import_books',
+                   new_callable=AsyncMock) as mock_bulk_import:
+            mock_bulk_import.return_value = (3, [])
+
+            # Act
+            await BookService.import_books(payload, DataFormat.CSV)
+
+            # Assert
+            _, records = mock_bulk_import.call_args.args
+            assert [record[3] for record in records] == ["9780743273565", "9780061120084", "12345"]
+
+    @pytest.mark.asyncio
+    async def test_import_books_ndjson_rejects_invalid_rows(self, mock_connect_db):
+        """Test that unparsable and invalid NDJSON lines are rejected without failing the upload"""
+        # Arrange
+        payload = (
+            '{"title": "Book A", "author": "Author A"}\n'
+            '{"title": "Book B"\n'
+            '{"title": "Book C"}\n'
+        ).encode()
+
+        with patch('src.services.book_service.BookRepository.bulk_import_books',
+                   new_callable=AsyncMock) as mock_bulk_import:
+            mock_bulk_import.return_value = (1, [])
+
+            # Act
+            result = await BookService.import_books(payload, DataFormat.NDJSON)
+
+            # Assert
+            assert len(mock_bulk_import.call_args.args[1]) == 1
+            assert result["inserted"] == 1
+            assert [r["line"] for r in result["rejected"]] == [2, 3]
+            assert result["rejected"][0]["reason"].startswith("Invalid JSON")
+            assert "author" in result["rejected"][1]["reason"]
+
+    @pytest.mark.asyncio
+    async def test_import_books_nothing_valid_skips_database(self, mock_connect_db):
+        """Test that an upload without a single valid row never touches the database"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.bulk_import_books',
+                   new_callable=AsyncMock) as mock_bulk_import:
+            # Act
+            result = await BookService.import_books(b'["not", "an", "object"]\n', DataFormat.NDJSON)
+
+            # Assert
+            mock_bulk_import.assert_not_called()
+            assert result["inserted"] == 0
+            assert result["rejected"] == [{"line": 1, "isbn": None, "reason": "Expected a JSON object"}]
+
+    @pytest.mark.asyncio
+    async def test_import_books_too_many_rows(self, mock_connect_db):
+        """Test that an oversized upload is refused"""
+        # Arrange
+        payload = b'{"title": "T", "author": "A"}\n' * 3
+
+        with patch('src.services.book_service.BookLibraryConfig.IMPORT_MAX_ROWS', 2):
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc_info:
+                await BookService.import_books(payload, DataFormat.NDJSON)
+
+            # Assert
+            assert exc_info.value.status_code == 413
+
     # ====================
     # Test get_book method
     # ====================
@@ -159,13 +312,289 @@ class TestBookService:
             # Assert
             assert str(exc_info.value) == "Database error"
 
+    @pytest.mark.asyncio
+    async def test_get_book_served_from_cache(self, mock_connect_db):
+        """Test that a second read of the same book does not reach the repository"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_book_by_id', new_callable=AsyncMock) as mock_get_book:
+            mock_get_book.return_value = SAMPLE_BOOK_RESPONSE
+
+            # Act
+            first = await BookService.get_book(1)
+            first["title"] = "mutated by caller"
+            second = await BookService.get_book(1)
+
+            # Assert
+            mock_get_book.assert_called_once_with(mock_connect_db, 1)
+            assert second == SAMPLE_BOOK_RESPONSE
+            assert (await BookService.cache_stats())["books"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_book_not_found_is_not_cached(self, mock_connect_db):
+        """Test that a missing book is looked up again on the next request"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_book_by_id', new_callable=AsyncMock) as mock_get_book:
+            mock_get_book.return_value = None
+
+            # Act
+            for _ in range(2):
+                with pytest.raises(HTTPException):
+                    await BookService.get_book(999)
+
+            # Assert
+            assert mock_get_book.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_update_book_invalidates_cache(self, mock_connect_db):
+        """Test that updating a book evicts its cached row"""
+        # Arrange
+        mock_book = MagicMock()
+        mock_book.dict.return_value = {"title": "Updated Title"}
+        book_cache.set(1, SAMPLE_BOOK_RESPONSE)
+
+        with patch('src.services.book_service.BookRepository.update_book', new_callable=AsyncMock) as mock_update_book:
+            mock_update_book.return_value = 1
+
+            # Act
+            await BookService.update_book(1, mock_book)
+
+            # Assert
+            assert book_cache.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_book_invalidates_cache(self, mock_connect_db):
+        """Test that deleting a book evicts its cached row"""
+        # Arrange
+        book_cache.set(1, SAMPLE_BOOK_RESPONSE)
+
+        with patch('src.services.book_service.BookRepository.delete_book', new_callable=AsyncMock) as mock_delete_book:
+            mock_delete_book.return_value = "DELETE 1"
+
+            # Act
+            await BookService.delete_book(1)
+
+            # Assert
+            assert book_cache.get(1) is None
+
+    # ==========================
+    # Test batch_get_books method
+    # ==========================
+
+    @pytest.mark.asyncio
+    async def test_batch_get_books_request_order(self, mock_connect_db):
+        """Test that results follow request order with not-found markers, in one query"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_books_by_ids',
+                   new_callable=AsyncMock) as mock_get_by_ids:
+            mock_get_by_ids.return_value = list(reversed(SAMPLE_BOOKS_LIST))
+
+            # Act
+            result = await BookService.batch_get_books([2, 99, 1, 2])
+
+            # Assert
+            mock_get_by_ids.assert_called_once_with(mock_connect_db, [2, 99, 1])
+            assert result == {"results": [
+                {"book_id": 2, "found": True, "book": SAMPLE_BOOKS_LIST[1]},
+                {"book_id": 99, "found": False},
+                {"book_id": 1, "found": True, "book": SAMPLE_BOOKS_LIST[0]},
+                {"book_id": 2, "found": True, "book": SAMPLE_BOOKS_LIST[1]},
+            ]}
+
+    @pytest.mark.asyncio
+    async def test_batch_get_books_uses_cache(self, mock_connect_db):
+        """Test that cached books are not fetched again and fetched ones are cached"""
+        # Arrange
+        book_cache.set(1, SAMPLE_BOOKS_LIST[0])
+
+        with patch('src.services.book_service.BookRepository.get_books_by_ids',
+                   new_callable=AsyncMock) as mock_get_by_ids:
+            mock_get_by_ids.return_value = [SAMPLE_BOOKS_LIST[1]]
+
+            # Act
+            await BookService.batch_get_books([1, 2])
+            result = await BookService.batch_get_books([1, 2])
+
+            # Assert
+            mock_get_by_ids.assert_called_once_with(mock_connect_db, [2])
+            assert [r["found"] for r in result["results"]] == [True, True]
+
+    # ============================
+    # Test get_book_by_isbn method
+    # ============================
+
+    @pytest.mark.asyncio
+    async def test_get_book_by_isbn_normalizes_isbn10(self, mock_connect_db):
+        """Test that a hyphenated ISBN-10 is looked up under both stored spellings"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_book_by_isbn',
+                   new_callable=AsyncMock) as mock_get_by_isbn:
+            mock_get_by_isbn.return_value = SAMPLE_BOOK_RESPONSE
+
+            # Act
+            result = await BookService.get_book_by_isbn("0-7432-7356-7")
+
+            # Assert
+            mock_get_by_isbn.assert_called_once_with(mock_connect_db, ["9780743273565", "0743273567"])
+            assert result == SAMPLE_BOOK_RESPONSE
+            assert book_cache.get(1) == SAMPLE_BOOK_RESPONSE
+
+    @pytest.mark.asyncio
+    async def test_get_book_by_isbn_skips_fill_invalidated_during_query(self, mock_connect_db):
+        """Test that a row read before a concurrent invalidation is not cached"""
+        # Arrange
+        async def lookup_then_invalidate(pool, isbns):
+            book_cache.invalidate(1)
+            return SAMPLE_BOOK_RESPONSE
+
+        with patch('src.services.book_service.BookRepository.get_book_by_isbn',
+                   new_callable=AsyncMock) as mock_get_by_isbn:
+            mock_get_by_isbn.side_effect = lookup_then_invalidate
+
+            # Act
+            result = await BookService.get_book_by_isbn("9780743273565")
+
+            # Assert
+            assert result == SAMPLE_BOOK_RESPONSE
+            assert book_cache.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_get_book_by_isbn_invalid(self, mock_connect_db):
+        """Test that a malformed ISBN is refused without a lookup"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_book_by_isbn',
+                   new_callable=AsyncMock) as mock_get_by_isbn:
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc_info:
+                await BookService.get_book_by_isbn("9780743273566")
+
+            # Assert
+            assert exc_info.value.status_code == 400
+            mock_get_by_isbn.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_book_by_isbn_miss_is_negatively_cached(self, mock_connect_db):
+        """Test that an unknown ISBN reaches the database only once"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_book_by_isbn',
+                   new_callable=AsyncMock) as mock_get_by_isbn:
+            mock_get_by_isbn.return_value = None
+
+            # Act
+            for isbn in ("9780061120084", "978-0-06-112008-4"):
+                with pytest.raises(HTTPException) as exc_info:
+                    await BookService.get_book_by_isbn(isbn)
+                assert exc_info.value.status_code == 404
+
+            # Assert
+            mock_get_by_isbn.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_add_book_clears_isbn_miss(self, mock_connect_db):
+        """Test that adding a book forgets a cached miss for its ISBN"""
+        # Arrange
+        isbn_miss_cache.set("9780061120084", True)
+        mock_book = MagicMock()
+        mock_book.dict.return_value = {**SAMPLE_BOOK_DATA, "isbn": "0061120081"}
+
+        with patch('src.services.book_service.BookRepository.create_book', new_callable=AsyncMock) as mock_create_book:
+            mock_create_book.return_value = 5
+
+            # Act
+            await BookService.add_book(mock_book)
+
+            # Assert
+            assert isbn_miss_cache.get("9780061120084") is None
+
+    # ================================
+    # Test conditional GET (ETag) support
+    # ================================
+
+    @pytest.mark.asyncio
+    async def test_get_book_conditional_returns_etag(self, mock_connect_db):
+        """Test that a book is returned with a strong ETag derived from its row version"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_book_by_id', new_callable=AsyncMock) as mock_get_book:
+            mock_get_book.return_value = SAMPLE_BOOK_RESPONSE
+
+            # Act
+            response = await BookService.get_book_conditional(1)
+
+            # Assert
+            assert response.status_code == 200
+            assert response.headers["etag"] == BookService.book_etag(SAMPLE_BOOK_RESPONSE)
+            assert json.loads(response.body) == SAMPLE_BOOK_RESPONSE
+
+    @pytest.mark.asyncio
+    async def test_get_book_conditional_not_modified(self, mock_connect_db):
+        """Test that a matching If-None-Match yields 304 with no body"""
+        # Arrange
+        etag = BookService.book_etag(SAMPLE_BOOK_RESPONSE)
+
+        with patch('src.services.book_service.BookRepository.get_book_by_id', new_callable=AsyncMock) as mock_get_book:
+            mock_get_book.return_value = SAMPLE_BOOK_RESPONSE
+
+            # Act
+            response = await BookService.get_book_conditional(1, f'"stale", W/{etag}')
+
+            # Assert
+            assert response.status_code == 304
+            assert response.body == b""
+
+    @pytest.mark.asyncio
+    async def test_get_book_conditional_changes_with_row_version(self, mock_connect_db):
+        """Test that an update (new row version) produces a different ETag"""
+        # Assert
+        assert BookService.book_etag(SAMPLE_BOOK_RESPONSE) != \
+            BookService.book_etag({**SAMPLE_BOOK_RESPONSE, "row_version": 2})
+
+    @pytest.mark.asyncio
+    async def test_list_books_conditional_not_modified_skips_query(self, mock_connect_db):
+        """Test that an unchanged list is answered from the table version alone"""
+        # Arrange
+        with patch('src.services.book_service.TableVersionRepository.get_version',
+                   new_callable=AsyncMock) as mock_get_version, \
+                patch('src.services.book_service.BookRepository.get_books_page',
+                      new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_version.return_value = 7
+            mock_get_books_page.return_value = []
+
+            first = await BookService.list_books_conditional()
+
+            # Act
+            second = await BookService.list_books_conditional(if_none_match=first.headers["etag"])
+
+            # Assert
+            mock_get_version.assert_called_with(mock_connect_db, "books")
+            mock_get_books_page.assert_called_once()
+            assert first.status_code == 200
+            assert second.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_list_books_conditional_modified_after_write(self, mock_connect_db):
+        """Test that a bumped table version invalidates the list ETag"""
+        # Arrange
+        with patch('src.services.book_service.TableVersionRepository.get_version',
+                   new_callable=AsyncMock) as mock_get_version, \
+                patch('src.services.book_service.BookRepository.get_books_page',
+                      new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_version.side_effect = [7, 8]
+            mock_get_books_page.return_value = []
+            first = await BookService.list_books_conditional()
+
+            # Act
+            second = await BookService.list_books_conditional(if_none_match=first.headers["etag"])
+
+            # Assert
+            assert second.status_code == 200
+            assert second.headers["etag"] != first.headers["etag"]
+
     # ======================
     # Test list_books method
     # ======================
 
     @pytest.mark.asyncio
     async def test_list_books_success(self, mock_connect_db):
-        """Test successful listing of books"""
+        """Test successful listing of the first page of books"""
         # Arrange
         # Create mock rows that can be converted to dict using dict()
         mock_rows = []
@@ -177,40 +606,130 @@ class TestBookService:
             mock_row.__getitem__.side_effect = lambda key, bd=book_data: bd[key]
             mock_rows.append(mock_row)
 
-        with patch('src.services.book_service.BookRepository.get_all_books',
-                   new_callable=AsyncMock) as mock_get_all_books:
-            mock_get_all_books.return_value = mock_rows
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.return_value = mock_rows
 
             # Act
             result = await BookService.list_books()
 
             # Assert
-            mock_get_all_books.assert_called_once_with(mock_connect_db)
-            assert result == SAMPLE_BOOKS_LIST
-            assert len(result) == 2
+            mock_get_books_page.assert_called_once_with(mock_connect_db, 51, None, None)
+            assert result == {"books": SAMPLE_BOOKS_LIST, "next_cursor": None, "limit": 50}
 
     @pytest.mark.asyncio
     async def test_list_books_empty(self, mock_connect_db):
         """Test listing books when no books exist"""
         # Arrange
-        with patch('src.services.book_service.BookRepository.get_all_books',
-                   new_callable=AsyncMock) as mock_get_all_books:
-            mock_get_all_books.return_value = []
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.return_value = []
 
             # Act
             result = await BookService.list_books()
 
             # Assert
-            mock_get_all_books.assert_called_once_with(mock_connect_db)
-            assert result == []
+            mock_get_books_page.assert_called_once_with(mock_connect_db, 51, None, None)
+            assert result == {"books": [], "next_cursor": None, "limit": 50}
+
+    @pytest.mark.asyncio
+    async def test_list_books_returns_next_cursor(self, mock_connect_db):
+        """Test that a full page returns a cursor that seeks past its last row"""
+        # Arrange
+        rows = [
+            {"book_id": 3, "title": "Third", "created_at": datetime(2024, 1, 3)},
+            {"book_id": 2, "title": "Second", "created_at": datetime(2024, 1, 2)},
+            {"book_id": 1, "title": "First", "created_at": datetime(2024, 1, 1)},
+        ]
+
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.return_value = rows
+
+            # Act
+            result = await BookService.list_books(limit=2)
+
+            # Assert
+            mock_get_books_page.assert_called_once_with(mock_connect_db, 3, None, None)
+            assert result["books"] == rows[:2]
+            assert decode_cursor(result["next_cursor"]) == (datetime(2024, 1, 2), 2)
+
+    @pytest.mark.asyncio
+    async def test_list_books_with_cursor(self, mock_connect_db):
+        """Test that a cursor is decoded into the keyset seek position"""
+        # Arrange
+        cursor = encode_cursor(datetime(2024, 1, 2), 2)
+
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.return_value = []
+
+            # Act
+            await BookService.list_books(limit=10, cursor=cursor)
+
+            # Assert
+            mock_get_books_page.assert_called_once_with(mock_connect_db, 11, (datetime(2024, 1, 2), 2), None)
+
+    @pytest.mark.asyncio
+    async def test_list_books_limit_is_bounded(self, mock_connect_db):
+        """Test that an oversized limit is clamped to the configured maximum"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.return_value = []
+
+            # Act
+            result = await BookService.list_books(limit=100000)
+
+            # Assert
+            mock_get_books_page.assert_called_once_with(mock_connect_db, 201, None, None)
+            assert result["limit"] == 200
+
+    @pytest.mark.asyncio
+    async def test_list_books_with_fields(self, mock_connect_db):
+        """Test that a fields projection keeps the id and cursor columns"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.return_value = []
+
+            # Act
+            await BookService.list_books(fields="title")
+
+            # Assert
+            mock_get_books_page.assert_called_once_with(
+                mock_connect_db, 51, None, ["book_id", "created_at", "title"]
+            )
+
+    @pytest.mark.asyncio
+    async def test_list_books_unknown_field(self, mock_connect_db):
+        """Test that a column outside the whitelist is refused"""
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await BookService.list_books(fields="title,search_vector")
+
+        # Assert
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == "Unknown field(s): search_vector"
+
+    @pytest.mark.asyncio
+    async def test_list_books_invalid_cursor(self, mock_connect_db):
+        """Test listing books with a cursor we did not issue"""
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await BookService.list_books(cursor="not-a-cursor")
+
+        # Assert
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == "Invalid cursor"
 
     @pytest.mark.asyncio
     async def test_list_books_database_error(self, mock_connect_db):
         """Test listing books with database error"""
         # Arrange
-        with patch('src.services.book_service.BookRepository.get_all_books',
-                   new_callable=AsyncMock) as mock_get_all_books:
-            mock_get_all_books.side_effect = Exception("Database error")
+        with patch('src.services.book_service.BookRepository.get_books_page',
+                   new_callable=AsyncMock) as mock_get_books_page:
+            mock_get_books_page.side_effect = Exception("Database error")
 
             # Act & Assert
             with pytest.raises(Exception) as exc_info:
@@ -219,6 +738,159 @@ class TestBookService:
             # Assert
             assert str(exc_info.value) == "Database error"
 
+    # ========================
+    # Test search_books method
+    # ========================
+
+    @pytest.mark.asyncio
+    async def test_search_books_success(self, mock_connect_db):
+        """Test searching books passes every SearchBooks criterion to the repository"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.search_books',
+                   new_callable=AsyncMock) as mock_search_books:
+            mock_search_books.return_value = SAMPLE_BOOKS_LIST
+
+            # Act
+            result = await BookService.search_books("  gatsby ", "Fiction", "Fitzgerald", 1925, page=2, page_size=10)
+
+            # Assert
+            mock_search_books.assert_called_once_with(
+                mock_connect_db, "gatsby", "Fiction", "Fitzgerald", 1925, limit=11, offset=10
+            )
+            assert result == {"books": SAMPLE_BOOKS_LIST, "page": 2, "page_size": 10, "has_more": False}
+
+    @pytest.mark.asyncio
+    async def test_search_books_has_more(self, mock_connect_db):
+        """Test that an extra row beyond the page size is trimmed and reported"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.search_books',
+                   new_callable=AsyncMock) as mock_search_books:
+            mock_search_books.return_value = SAMPLE_BOOKS_LIST
+
+            # Act
+            result = await BookService.search_books("book", page_size=1)
+
+            # Assert
+            assert result["books"] == SAMPLE_BOOKS_LIST[:1]
+            assert result["has_more"] is True
+
+    @pytest.mark.asyncio
+    async def test_search_books_blank_query(self, mock_connect_db):
+        """Test that a blank query falls back to filter-only search"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.search_books',
+                   new_callable=AsyncMock) as mock_search_books:
+            mock_search_books.return_value = []
+
+            # Act
+            result = await BookService.search_books("   ", genre="Fiction")
+
+            # Assert
+            mock_search_books.assert_called_once_with(
+                mock_connect_db, None, "Fiction", None, None, limit=21, offset=0
+            )
+            assert result["books"] == []
+
+    # ======================
+    # Test get_facets method
+    # ======================
+
+    @pytest.mark.asyncio
+    async def test_get_facets_groups_by_facet(self, mock_connect_db):
+        """Test that aggregate rows are grouped per facet, keeping empty facets"""
+        # Arrange
+        rows = [
+            {"facet": "author", "value": "Jane Austen", "book_count": 4},
+            {"facet": "genre", "value": "Fiction", "book_count": 10},
+            {"facet": "genre", "value": "Romance", "book_count": 2},
+        ]
+
+        with patch('src.services.book_service.BookRepository.get_facets', new_callable=AsyncMock) as mock_get_facets:
+            mock_get_facets.return_value = rows
+
+            # Act
+            result = await BookService.get_facets()
+
+            # Assert
+            mock_get_facets.assert_called_once_with(
+                mock_connect_db, ["genre", "author", "publication_year"], 20
+            )
+            assert result == {"facets": {
+                "genre": [{"value": "Fiction", "count": 10}, {"value": "Romance", "count": 2}],
+                "author": [{"value": "Jane Austen", "count": 4}],
+                "publication_year": [],
+            }}
+
+    @pytest.mark.asyncio
+    async def test_get_facets_single_facet(self, mock_connect_db):
+        """Test requesting only one facet with a custom limit"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.get_facets', new_callable=AsyncMock) as mock_get_facets:
+            mock_get_facets.return_value = []
+
+            # Act
+            result = await BookService.get_facets([BookFacet.PUBLICATION_YEAR], limit=5)
+
+            # Assert
+            mock_get_facets.assert_called_once_with(mock_connect_db, ["publication_year"], 5)
+            assert result == {"facets": {"publication_year": []}}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_facets(self, mock_connect_db):
+        """Test rebuilding the facet aggregate"""
+        # Arrange
+        with patch('src.services.book_service.BookRepository.rebuild_facets',
+                   new_callable=AsyncMock) as mock_rebuild_facets:
+            mock_rebuild_facets.return_value = 42
+
+            # Act
+            result = await BookService.rebuild_facets()
+
+            # Assert
+            mock_rebuild_facets.assert_called_once_with(mock_connect_db)
+            assert result == {"message": "Facets rebuilt successfully", "facet_values": 42}
+
+    # ========================
+    # Test export_books method
+    # ========================
+
+    @pytest.mark.asyncio
+    async def test_export_books_ndjson(self, mock_connect_db):
+        """Test exporting books streams one JSON document per line"""
+        # Arrange
+        async def fake_stream(pool, prefetch):
+            for book in SAMPLE_BOOKS_LIST:
+                yield book
+
+        with patch('src.services.book_service.BookRepository.stream_books', side_effect=fake_stream) as mock_stream:
+            # Act
+            response = await BookService.export_books(DataFormat.NDJSON)
+            body = "".join([chunk async for chunk in response.body_iterator])
+
+            # Assert
+            mock_stream.assert_called_once_with(mock_connect_db, 1000)
+            assert response.media_type == "application/x-ndjson"
+            assert [json.loads(line) for line in body.splitlines()] == SAMPLE_BOOKS_LIST
+
+    @pytest.mark.asyncio
+    async def test_export_books_csv(self, mock_connect_db):
+        """Test exporting books as CSV writes a header row followed by the rows"""
+        # Arrange
+        async def fake_stream(pool, prefetch):
+            for book in SAMPLE_BOOKS_LIST:
+                yield {**book, "publisher": None}
+
+        with patch('src.services.book_service.BookRepository.stream_books', side_effect=fake_stream):
+            # Act
+            response = await BookService.export_books(DataFormat.CSV)
+            body = "".join([chunk async for chunk in response.body_iterator])
+
+            # Assert
+            rows = list(csv.DictReader(io.StringIO(body)))
+            assert response.media_type == "text/csv"
+            assert [r["title"] for r in rows] == ["Test Book", "Another Book"]
+            assert rows[0]["publisher"] == ""
+
     # ========================
     # Test update_book method
     # ========================
@@ -409,11 +1081,11 @@ class TestBookService:
         with patch('src.services.book_service.BookRepository.create_book', new_callable=AsyncMock) as mock_create_book, \
                 patch('src.services.book_service.BookRepository.get_book_by_id',
                       new_callable=AsyncMock) as mock_get_book, \
-                patch('src.services.book_service.BookRepository.get_all_books',
-                      new_callable=AsyncMock) as mock_get_all_books:
+                patch('src.services.book_service.BookRepository.get_books_page',
+                      new_callable=AsyncMock) as mock_get_books_page:
             mock_create_book.return_value = 1
             mock_get_book.return_value = mock_row
-            mock_get_all_books.return_value = mock_rows
+            mock_get_books_page.return_value = mock_rows
 
             # Act - Run operations concurrently
             tasks = [
@@ -428,4 +1100,4 @@ class TestBookService:
             assert len(results) == 3
             assert results[0] == {"message": "Book added successfully", "book_id": 1}
             assert results[1] == SAMPLE_BOOK_RESPONSE
-            assert results[2] == SAMPLE_BOOKS_LIST
\ No newline at end of file
+            assert results[2]["books"] == SAMPLE_BOOKS_LIST
\ No newline at end of file
@@ -7,6 +7,7 @@ from asyncpg.exceptions import UniqueViolationError
 
 from src.services.book_transaction_service import BookTransactionService
 from src.models.book_transaction import TransactionStatus, BookTransactionCreate, BookTransactionUpdate
+from src.utils.pagination import encode_cursor
 
 # Sample test data
 SAMPLE_TRANSACTION_DATA = {
@@ -102,27 +103,28 @@ class TestBookTransactionService:
 
     @pytest.mark.asyncio
     async def test_issue_book_success(self, mock_connect_db, mock_today):
-        """Test successful book issuance"""
+        """Test successful book issuance in a single repository call"""
         # Arrange
         expected_result = {
+            "outcome": "issued",
             "transaction_id": 1,
             "issue_date": MOCK_TODAY,
             "due_date": MOCK_TODAY + timedelta(days=14)
         }
 
-        with patch('src.services.book_transaction_service.BookTransactionRepository.is_book_available',
-                   new_callable=AsyncMock) as mock_is_available, \
-                patch('src.services.book_transaction_service.BookTransactionRepository.create_transaction',
-                      new_callable=AsyncMock) as mock_create_transaction, \
-                patch('src.services.book_transaction_service.BookLibraryConfig.DEFAULT_DUE_DAYS', 14):
-            mock_is_available.return_value = True
-            mock_create_transaction.return_value = expected_result
+        with patch('src.services.book_transaction_service.BookTransactionRepository.issue_book',
+                   new_callable=AsyncMock) as mock_issue_book, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.DEFAULT_DUE_DAYS', 14), \
+                patch('src.services.book_transaction_service.BookLibraryConfig.MAX_BOOKS_PER_MEMBER', 5):
+            mock_issue_book.return_value = expected_result
 
             # Act
             result = await BookTransactionService.issue_book(1, 1)
 
             # Assert
-            mock_is_available.assert_called_once_with(mock_connect_db, 1)
+            mock_issue_book.assert_called_once_with(
+                mock_connect_db, 1, 1, MOCK_TODAY, MOCK_TODAY + timedelta(days=14), 5
+            )
             assert result == {
                 "message": "Book issued successfully",
                 "transaction_id": 1,
@@ -132,36 +134,95 @@ class TestBookTransactionService:
             }
 
     @pytest.mark.asyncio
-    async def test_issue_book_already_issued(self, mock_connect_db):
-        """Test book issuance when book is already issued"""
+    @pytest.mark.parametrize("outcome, error", [
+        ("unavailable", "No copies of this book are available"),
+        ("book_not_found", "Book not found"),
+        ("member_not_found", "Member not found"),
+        ("limit_reached", "Member has reached the limit of 5 books"),
+    ])
+    async def test_issue_book_refused(self, mock_connect_db, outcome, error):
+        """Test that each refusal outcome of the atomic issue maps to an error"""
         # Arrange
-        with patch('src.services.book_transaction_service.BookTransactionRepository.is_book_available',
-                   new_callable=AsyncMock) as mock_is_available:
-            mock_is_available.return_value = False
+        with patch('src.services.book_transaction_service.BookTransactionRepository.issue_book',
+                   new_callable=AsyncMock) as mock_issue_book, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.MAX_BOOKS_PER_MEMBER', 5):
+            mock_issue_book.return_value = {
+                "outcome": outcome, "transaction_id": None, "issue_date": None, "due_date": None
+            }
 
             # Act
             result = await BookTransactionService.issue_book(1, 1)
 
             # Assert
-            mock_is_available.assert_called_once_with(mock_connect_db, 1)
-            assert result == {"error": "Book is already issued"}
+            mock_issue_book.assert_called_once()
+            assert result == {"error": error}
 
     @pytest.mark.asyncio
     async def test_issue_book_failure(self, mock_connect_db, mock_today):
         """Test book issuance failure"""
         # Arrange
-        with patch('src.services.book_transaction_service.BookTransactionRepository.is_book_available',
-                   new_callable=AsyncMock) as mock_is_available, \
-                patch('src.services.book_transaction_service.BookTransactionRepository.create_transaction',
-                      new_callable=AsyncMock) as mock_create_transaction:
-            mock_is_available.return_value = True
-            mock_create_transaction.return_value = None
+        with patch('src.services.book_transaction_service.BookTransactionRepository.issue_book',
+                   new_callable=AsyncMock) as mock_issue_book:
+            mock_issue_book.side_effect = Exception("connection lost")
 
             # Act
             result = await BookTransactionService.issue_book(1, 1)
 
             # Assert
-            assert result == {"error": "Failed to issue book"}
+            assert result == {"error": "Database error: connection lost"}
+
+    # ================================
+    # Test issue_books_batch method
+    # ================================
+
+    @pytest.mark.asyncio
+    async def test_issue_books_batch_mixed_results(self, mock_connect_db, mock_today):
+        """Test that a batch reports per-book outcomes and collapses duplicates"""
+        # Arrange
+        due_date = MOCK_TODAY + timedelta(days=14)
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.issue_books_batch',
+                   new_callable=AsyncMock) as mock_issue_batch, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.DEFAULT_DUE_DAYS', 14), \
+                patch('src.services.book_transaction_service.BookLibraryConfig.MAX_BOOKS_PER_MEMBER', 5):
+            mock_issue_batch.return_value = [
+                {"book_id": 3, "outcome": "issued", "transaction_id": 10},
+                {"book_id": 4, "outcome": "unavailable", "transaction_id": None},
+                {"book_id": 5, "outcome": "limit_reached", "transaction_id": None},
+            ]
+
+            # Act
+            result = await BookTransactionService.issue_books_batch(1, [3, 4, 3, 5])
+
+            # Assert
+            mock_issue_batch.assert_called_once_with(mock_connect_db, 1, [3, 4, 5], MOCK_TODAY, due_date, 5)
+            assert result == {
+                "message": "Batch issue processed",
+                "member_id": 1,
+                "issued_count": 1,
+                "issue_date": MOCK_TODAY,
+                "due_date": due_date,
+                "results": [
+                    {"book_id": 3, "success": True, "transaction_id": 10},
+                    {"book_id": 4, "success": False, "error": "No copies of this book are available"},
+                    {"book_id": 3, "success": False, "error": "Duplicate book in request"},
+                    {"book_id": 5, "success": False, "error": "Member has reached the limit of 5 books"},
+                ]
+            }
+
+    @pytest.mark.asyncio
+    async def test_issue_books_batch_member_not_found(self, mock_connect_db):
+        """Test batch issuance for a member that does not exist"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.issue_books_batch',
+                   new_callable=AsyncMock) as mock_issue_batch:
+            mock_issue_batch.return_value = None
+
+            # Act
+            result = await BookTransactionService.issue_books_batch(999, [1, 2])
+
+            # Assert
+            assert result == {"error": "Member not found"}
 
     # ===========================
     # Test return_book method
@@ -169,9 +230,9 @@ class TestBookTransactionService:
 
     @pytest.mark.asyncio
     async def test_return_book_success(self, mock_connect_db):
-        """Test successful book return"""
+        """Test successful book return, pruned to the loan's partition"""
         # Arrange
-        mock_transaction = {"return_date": None}
+        mock_transaction = {"return_date": None, "issue_date": date(2024, 1, 1)}
 
         with patch('src.services.book_transaction_service.BookTransactionRepository.get_transaction_by_id',
                    new_callable=AsyncMock) as mock_get_transaction, \
@@ -185,7 +246,7 @@ class TestBookTransactionService:
 
             # Assert
             mock_get_transaction.assert_called_once_with(mock_connect_db, 1)
-            mock_mark_returned.assert_called_once_with(mock_connect_db, 1)
+            mock_mark_returned.assert_called_once_with(mock_connect_db, 1, issue_date=date(2024, 1, 1))
             assert result == {"message": "Book returned successfully"}
 
     @pytest.mark.asyncio
@@ -237,6 +298,382 @@ class TestBookTransactionService:
             # Assert
             assert result == {"error": "Failed to return book"}
 
+    # ================================
+    # Test return_books_batch method
+    # ================================
+
+    @pytest.mark.asyncio
+    async def test_return_books_batch_success(self, mock_connect_db):
+        """Test that a batch return groups ids by outcome without failing the batch"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.return_books_batch',
+                   new_callable=AsyncMock) as mock_return_batch:
+            mock_return_batch.return_value = [
+                {"transaction_id": 1, "book_id": 7, "outcome": "returned"},
+                {"transaction_id": 2, "book_id": 7, "outcome": "returned"},
+                {"transaction_id": 3, "book_id": 8, "outcome": "already_returned"},
+                {"transaction_id": 999, "book_id": None, "outcome": "not_found"},
+            ]
+
+            # Act
+            result = await BookTransactionService.return_books_batch([1, 2, 2, 3, 999])
+
+            # Assert
+            mock_return_batch.assert_called_once_with(mock_connect_db, [1, 2, 3, 999])
+            assert result == {
+                "message": "Batch return processed",
+                "returned_count": 2,
+                "returned": [1, 2],
+                "already_returned": [3],
+                "not_found": [999]
+            }
+
+    @pytest.mark.asyncio
+    async def test_return_books_batch_failure(self, mock_connect_db):
+        """Test batch return when the database call fails"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.return_books_batch',
+                   new_callable=AsyncMock) as mock_return_batch:
+            mock_return_batch.side_effect = Exception("connection lost")
+
+            # Act
+            result = await BookTransactionService.return_books_batch([1])
+
+            # Assert
+            assert result == {"error": "Database error: connection lost"}
+
+    # ===========================
+    # Test renew_book method
+    # ===========================
+
+    @pytest.mark.asyncio
+    async def test_renew_book_success(self, mock_connect_db, mock_today):
+        """Test that a single renewal is one capped repository update"""
+        # Arrange
+        renewal = {"transaction_id": 1, "old_due_date": date(2024, 1, 15), "new_due_date": date(2024, 1, 22)}
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.renew_loans',
+                   new_callable=AsyncMock) as mock_renew, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.RENEWAL_DAYS', 7), \
+                patch('src.services.book_transaction_service.BookLibraryConfig.MAX_BORROW_DURATION', 30):
+            mock_renew.return_value = [renewal]
+
+            # Act
+            result = await BookTransactionService.renew_book(1)
+
+            # Assert
+            mock_renew.assert_called_once_with(mock_connect_db, 7, 30, MOCK_TODAY, transaction_id=1)
+            assert result == {"message": "Loan renewed successfully", **renewal}
+
+    @pytest.mark.asyncio
+    async def test_renew_book_at_max_duration(self, mock_connect_db, mock_today):
+        """Test renewal of a loan that already reached the maximum duration"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.renew_loans',
+                   new_callable=AsyncMock) as mock_renew, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.MAX_BORROW_DURATION', 30):
+            mock_renew.return_value = [
+                {"transaction_id": 1, "old_due_date": date(2024, 1, 31), "new_due_date": None}
+            ]
+
+            # Act
+            result = await BookTransactionService.renew_book(1, 5)
+
+            # Assert
+            assert result == {"error": "Loan has reached the maximum borrow duration of 30 days"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("transaction, error", [
+        (None, "Transaction not found"),
+        ({"transaction_id": 1, "return_date": date(2024, 1, 5)}, "Book already returned"),
+    ])
+    async def test_renew_book_not_open(self, mock_connect_db, mock_today, transaction, error):
+        """Test renewal of a missing or already returned loan"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.renew_loans',
+                   new_callable=AsyncMock) as mock_renew, \
+                patch('src.services.book_transaction_service.BookTransactionRepository.get_transaction_by_id',
+                      new_callable=AsyncMock) as mock_get_transaction:
+            mock_renew.return_value = []
+            mock_get_transaction.return_value = transaction
+
+            # Act
+            result = await BookTransactionService.renew_book(1)
+
+            # Assert
+            assert result == {"error": error}
+
+    # =================================
+    # Test renew_member_loans method
+    # =================================
+
+    @pytest.mark.asyncio
+    async def test_renew_member_loans(self, mock_connect_db, mock_today):
+        """Test that renew-all splits renewed loans from those at the cap"""
+        # Arrange
+        renewed = {"transaction_id": 1, "old_due_date": date(2024, 1, 15), "new_due_date": date(2024, 1, 22)}
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.renew_loans',
+                   new_callable=AsyncMock) as mock_renew, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.RENEWAL_DAYS', 7), \
+                patch('src.services.book_transaction_service.BookLibraryConfig.MAX_BORROW_DURATION', 30):
+            mock_renew.return_value = [
+                renewed,
+                {"transaction_id": 2, "old_due_date": date(2024, 1, 31), "new_due_date": None},
+            ]
+
+            # Act
+            result = await BookTransactionService.renew_member_loans(5)
+
+            # Assert
+            mock_renew.assert_called_once_with(mock_connect_db, 7, 30, MOCK_TODAY, member_id=5)
+            assert result == {
+                "message": "Renewal processed",
+                "member_id": 5,
+                "renewed_count": 1,
+                "renewed": [renewed],
+                "not_renewed": [
+                    {"transaction_id": 2, "error": "Loan has reached the maximum borrow duration of 30 days"}
+                ]
+            }
+
+    # ================================
+    # Test list_transactions method
+    # ================================
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_first_page(self, mock_connect_db):
+        """Test that a full page returns a cursor built from the last row's sort key"""
+        # Arrange
+        rows = [
+            {"transaction_id": 3, "created_at": datetime(2024, 1, 3)},
+            {"transaction_id": 2, "created_at": datetime(2024, 1, 2)},
+            {"transaction_id": 1, "created_at": datetime(2024, 1, 1)},
+        ]
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_transactions_page',
+                   new_callable=AsyncMock) as mock_get_page:
+            mock_get_page.return_value = rows
+
+            # Act
+            result = await BookTransactionService.list_transactions(limit=2)
+
+            # Assert
+            mock_get_page.assert_called_once_with(
+                mock_connect_db, 3, None, status=None, member_id=None, book_id=None,
+                from_date=None, to_date=None, columns=None
+            )
+            assert result["transactions"] == rows[:2]
+            assert result["limit"] == 2
+            assert result["next_cursor"] is not None
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_next_page_with_filters(self, mock_connect_db):
+        """Test that the cursor and filters are decoded and passed to the seek query"""
+        # Arrange
+        first_page_last = datetime(2024, 1, 2)
+        cursor = encode_cursor(first_page_last, 2)
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_transactions_page',
+                   new_callable=AsyncMock) as mock_get_page:
+            mock_get_page.return_value = [{"transaction_id": 1, "created_at": datetime(2024, 1, 1)}]
+
+            # Act
+            result = await BookTransactionService.list_transactions(
+                limit=2, cursor=cursor, status=TransactionStatus.OVERDUE, member_id=7,
+                from_date=date(2024, 1, 1), to_date=date(2024, 1, 31)
+            )
+
+            # Assert
+            mock_get_page.assert_called_once_with(
+                mock_connect_db, 3, (first_page_last, 2), status="Overdue", member_id=7, book_id=None,
+                from_date=date(2024, 1, 1), to_date=date(2024, 1, 31), columns=None
+            )
+            assert result["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_invalid_cursor(self, mock_connect_db):
+        """Test that a cursor we did not issue is refused before any query"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_transactions_page',
+                   new_callable=AsyncMock) as mock_get_page:
+            # Act
+            result = await BookTransactionService.list_transactions(cursor="not-a-cursor")
+
+            # Assert
+            mock_get_page.assert_not_called()
+            assert result == {"error": "Invalid cursor"}
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_inverted_date_range(self, mock_connect_db):
+        """Test that from_date after to_date is refused"""
+        # Act
+        result = await BookTransactionService.list_transactions(
+            from_date=date(2024, 2, 1), to_date=date(2024, 1, 1)
+        )
+
+        # Assert
+        assert result == {"error": "from_date must not be after to_date"}
+
+    # ====================================
+    # Test get_member_history method
+    # ====================================
+
+    @staticmethod
+    def _history_row(transaction_id, created_at, **totals):
+        return {
+            "transaction_id": transaction_id, "book_id": 3, "member_id": 7,
+            "created_at": created_at, "return_date": None,
+            "book_title": "1984", "book_author": "George Orwell", "book_isbn": "9780451524935",
+            "member_first_name": "John", "member_last_name": "Doe", "member_email": "john@example.com",
+            "days_overdue": 0,
+            "total_count": 3, "distinct_books": 2, "distinct_members": 1, "currently_borrowed": 1,
+            **totals
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_member_history_first_page(self, mock_connect_db):
+        """Test that range aggregates come from the window columns of the page query"""
+        # Arrange
+        rows = [
+            self._history_row(3, datetime(2024, 1, 3)),
+            self._history_row(2, datetime(2024, 1, 2)),
+        ]
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_loan_history',
+                   new_callable=AsyncMock) as mock_history:
+            mock_history.return_value = rows
+
+            # Act
+            result = await BookTransactionService.get_member_history(
+                7, from_date=date(2024, 1, 1), to_date=date(2024, 1, 31), limit=1
+            )
+
+            # Assert
+            mock_history.assert_called_once_with(
+                mock_connect_db, 2, member_id=7, book_id=None,
+                from_date=date(2024, 1, 1), to_date=date(2024, 1, 31), after=None
+            )
+            assert result["member_id"] == 7
+            assert result["total_count"] == 3
+            assert result["total_books_borrowed"] == 2
+            assert result["currently_borrowed"] == 1
+            assert len(result["records"]) == 1
+            assert result["records"][0]["record"]["transaction_id"] == 3
+            assert result["records"][0]["book_info"]["title"] == "1984"
+            assert result["next_cursor"] == encode_cursor(datetime(2024, 1, 3), 3)
+
+    @pytest.mark.asyncio
+    async def test_get_member_history_invalid_cursor(self, mock_connect_db):
+        """Test that a cursor we did not issue is refused before any query"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_loan_history',
+                   new_callable=AsyncMock) as mock_history:
+            # Act
+            result = await BookTransactionService.get_member_history(7, cursor="bogus")
+
+            # Assert
+            mock_history.assert_not_called()
+            assert result == {"error": "Invalid cursor"}
+
+    # ====================================
+    # Test get_book_history method
+    # ====================================
+
+    @pytest.mark.asyncio
+    async def test_get_book_history(self, mock_connect_db):
+        """Test the book history aggregates and the empty-range defaults"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_loan_history',
+                   new_callable=AsyncMock) as mock_history:
+            mock_history.return_value = [self._history_row(5, datetime(2024, 1, 5), total_count=4)]
+
+            # Act
+            result = await BookTransactionService.get_book_history(3)
+
+            # Assert
+            assert mock_history.call_args.kwargs["book_id"] == 3
+            assert result["book_id"] == 3
+            assert result["times_borrowed"] == 4
+            assert result["unique_borrowers"] == 1
+            assert result["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_book_history_empty(self, mock_connect_db):
+        """Test that a range without loans reports zero aggregates"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_loan_history',
+                   new_callable=AsyncMock) as mock_history:
+            mock_history.return_value = []
+
+            # Act
+            result = await BookTransactionService.get_book_history(3)
+
+            # Assert
+            assert result["records"] == []
+            assert result["times_borrowed"] == 0
+            assert result["currently_borrowed"] == 0
+
+    # ===============================
+    # Test get_statistics method
+    # ===============================
+
+    @pytest.mark.asyncio
+    async def test_get_statistics_from_rollups(self, mock_connect_db, mock_today):
+        """Test that range statistics are summed from the daily rollup rows"""
+        # Arrange
+        daily = [
+            {"day": date(2024, 1, 9), "issued": 4, "returned": 1},
+            {"day": date(2024, 1, 10), "issued": 2, "returned": 3},
+        ]
+        top_book = {"book_id": 3, "title": "1984", "times_borrowed": 3}
+        top_member = {"member_id": 1, "first_name": "John", "last_name": "Doe", "times_borrowed": 2}
+
+        with patch('src.services.book_transaction_service.CirculationStatsRepository.get_daily_totals',
+                   new_callable=AsyncMock) as mock_daily, \
+                patch('src.services.book_transaction_service.CirculationStatsRepository.get_open_loan_counts',
+                      new_callable=AsyncMock) as mock_open, \
+                patch('src.services.book_transaction_service.CirculationStatsRepository.get_most_borrowed_book',
+                      new_callable=AsyncMock) as mock_top_book, \
+                patch('src.services.book_transaction_service.CirculationStatsRepository.get_most_active_member',
+                      new_callable=AsyncMock) as mock_top_member, \
+                patch('src.services.book_transaction_service.BookLibraryConfig.STATISTICS_DEFAULT_DAYS', 30):
+            mock_daily.side_effect = [daily, daily[1:]]
+            mock_open.return_value = {"current_borrowings": 12, "overdue_borrowings": 2}
+            mock_top_book.return_value = top_book
+            mock_top_member.return_value = top_member
+
+            # Act
+            result = await BookTransactionService.get_statistics()
+
+            # Assert
+            mock_daily.assert_any_call(mock_connect_db, date(2023, 12, 12), MOCK_TODAY)
+            mock_daily.assert_any_call(mock_connect_db, MOCK_TODAY, MOCK_TODAY)
+            assert result == {
+                "from_date": date(2023, 12, 12),
+                "to_date": MOCK_TODAY,
+                "statistics": {
+                    "total_borrowings": 6,
+                    "total_returns": 4,
+                    "current_borrowings": 12,
+                    "overdue_borrowings": 2,
+                    "borrowings_today": 2,
+                    "returns_today": 3,
+                    "most_borrowed_book": top_book,
+                    "most_active_member": top_member
+                },
+                "daily": daily
+            }
+
+    @pytest.mark.asyncio
+    async def test_get_statistics_inverted_range(self, mock_connect_db, mock_today):
+        """Test that from_date after to_date is refused"""
+        # Act
+        result = await BookTransactionService.get_statistics(date(2024, 2, 1), date(2024, 1, 1))
+
+        # Assert
+        assert result == {"error": "from_date must not be after to_date"}
+
     # ===============================
     # Test get_issued_books method
     # ===============================
@@ -258,7 +695,7 @@ class TestBookTransactionService:
             result = await BookTransactionService.get_issued_books()
 
             # Assert
-            mock_get_active.assert_called_once_with(mock_connect_db)
+            mock_get_active.assert_called_once_with(mock_connect_db, None)
             assert result == {"issued_books": sample_transactions}
 
     @pytest.mark.asyncio
@@ -275,6 +712,67 @@ class TestBookTransactionService:
             # Assert
             assert result == {"issued_books": []}
 
+    @pytest.mark.asyncio
+    async def test_get_issued_books_with_fields(self, mock_connect_db):
+        """Test that a fields projection is whitelisted and always keeps the id"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions',
+                   new_callable=AsyncMock) as mock_get_active:
+            mock_get_active.return_value = []
+
+            # Act
+            await BookTransactionService.get_issued_books("due_date, book_id")
+
+            # Assert
+            mock_get_active.assert_called_once_with(mock_connect_db, ["transaction_id", "due_date", "book_id"])
+
+    @pytest.mark.asyncio
+    async def test_get_issued_books_unknown_field(self, mock_connect_db):
+        """Test that a column outside the whitelist is refused before any query"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions',
+                   new_callable=AsyncMock) as mock_get_active:
+            # Act
+            result = await BookTransactionService.get_issued_books("book_id,1;drop table books")
+
+            # Assert
+            mock_get_active.assert_not_called()
+            assert result == {"error": "Unknown field(s): 1;drop table books"}
+
+    @pytest.mark.asyncio
+    async def test_get_issued_books_with_details(self, mock_connect_db):
+        """Test that details come from one joined query and are nested per loan"""
+        # Arrange
+        joined_row = {
+            "transaction_id": 1, "book_id": 3, "member_id": 7, "due_date": date(2024, 1, 15),
+            "book_title": "1984", "book_author": "George Orwell", "book_isbn": "9780451524935",
+            "member_first_name": "John", "member_last_name": "Doe", "member_email": "john@example.com",
+            "days_overdue": 0
+        }
+
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions_with_details',
+                   new_callable=AsyncMock) as mock_get_details, \
+                patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions',
+                      new_callable=AsyncMock) as mock_get_active:
+            mock_get_details.return_value = [joined_row]
+
+            # Act
+            result = await BookTransactionService.get_issued_books("due_date", include_details=True)
+
+            # Assert
+            mock_get_active.assert_not_called()
+            mock_get_details.assert_called_once_with(
+                mock_connect_db, False, ["transaction_id", "book_id", "member_id", "due_date"]
+            )
+            assert result == {"issued_books": [{
+                "record": {"transaction_id": 1, "book_id": 3, "member_id": 7, "due_date": date(2024, 1, 15)},
+                "book_info": {"book_id": 3, "title": "1984", "author": "George Orwell", "isbn": "9780451524935"},
+                "member_info": {"member_id": 7, "first_name": "John", "last_name": "Doe",
+                                "email": "john@example.com"},
+                "days_overdue": 0,
+                "is_overdue": False
+            }]}
+
     # ===============================
     # Test get_overdue_books method
     # ===============================
@@ -292,26 +790,22 @@ class TestBookTransactionService:
                    new_callable=AsyncMock) as mock_update_status, \
                 patch('src.services.book_transaction_service.BookTransactionRepository.get_overdue_transactions',
                       new_callable=AsyncMock) as mock_get_overdue:
-            mock_update_status.return_value = None
             mock_get_overdue.return_value = sample_transactions
 
             # Act
             result = await BookTransactionService.get_overdue_books()
 
             # Assert
-            mock_update_status.assert_called_once_with(mock_connect_db)
-            mock_get_overdue.assert_called_once_with(mock_connect_db)
+            mock_update_status.assert_not_called()  # the background sweeper owns the status flip
+            mock_get_overdue.assert_called_once_with(mock_connect_db, None)
             assert result == {"overdue_books": sample_transactions}
 
     @pytest.mark.asyncio
     async def test_get_overdue_books_empty(self, mock_connect_db):
         """Test retrieval of overdue books when none exist"""
         # Arrange
-        with patch('src.services.book_transaction_service.BookTransactionRepository.update_overdue_status',
-                   new_callable=AsyncMock) as mock_update_status, \
-                patch('src.services.book_transaction_service.BookTransactionRepository.get_overdue_transactions',
-                      new_callable=AsyncMock) as mock_get_overdue:
-            mock_update_status.return_value = None
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_overdue_transactions',
+                   new_callable=AsyncMock) as mock_get_overdue:
             mock_get_overdue.return_value = []
 
             # Act
@@ -320,6 +814,27 @@ class TestBookTransactionService:
             # Assert
             assert result == {"overdue_books": []}
 
+    @pytest.mark.asyncio
+    async def test_get_overdue_books_with_details(self, mock_connect_db):
+        """Test that overdue details are restricted to overdue loans in SQL"""
+        # Arrange
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions_with_details',
+                   new_callable=AsyncMock) as mock_get_details:
+            mock_get_details.return_value = [{
+                "transaction_id": 2, "book_id": 4, "member_id": 8,
+                "book_title": "Dune", "book_author": "Frank Herbert", "book_isbn": None,
+                "member_first_name": "Jane", "member_last_name": "Smith", "member_email": "jane@example.com",
+                "days_overdue": 5
+            }]
+
+            # Act
+            result = await BookTransactionService.get_overdue_books(include_details=True)
+
+            # Assert
+            mock_get_details.assert_called_once_with(mock_connect_db, True, None)
+            assert result["overdue_books"][0]["days_overdue"] == 5
+            assert result["overdue_books"][0]["is_overdue"] is True
+
     # ====================================
     # Test get_member_issued_books method
     # ====================================
@@ -333,7 +848,7 @@ class TestBookTransactionService:
             {"transaction_id": 2, "book_id": 2, "status": "Overdue"}
         ]
 
-        with patch('src.services.book_transaction_service.BookTransactionRepository.get_transactions_by_member',
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions_by_member',
                    new_callable=AsyncMock) as mock_get_member_transactions:
             mock_get_member_transactions.return_value = sample_transactions
 
@@ -342,13 +857,13 @@ class TestBookTransactionService:
 
             # Assert
             mock_get_member_transactions.assert_called_once_with(mock_connect_db, 1)
-            assert result == sample_transactions  # Returns as-is, service doesn't filter
+            assert result == sample_transactions  # Filtering happens in SQL
 
     @pytest.mark.asyncio
     async def test_get_member_issued_books_empty(self, mock_connect_db):
         """Test retrieval of member's issued books when none exist"""
         # Arrange
-        with patch('src.services.book_transaction_service.BookTransactionRepository.get_transactions_by_member',
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions_by_member',
                    new_callable=AsyncMock) as mock_get_member_transactions:
             mock_get_member_transactions.return_value = []
 
@@ -492,7 +1007,7 @@ class TestBookTransactionService:
     async def test_get_member_issued_books_with_invalid_id(self, mock_connect_db):
         """Test member issued books with invalid member ID"""
         # Arrange
-        with patch('src.services.book_transaction_service.BookTransactionRepository.get_transactions_by_member',
+        with patch('src.services.book_transaction_service.BookTransactionRepository.get_active_transactions_by_member',
                    new_callable=AsyncMock) as mock_get_member_transactions:
             mock_get_member_transactions.return_value = []
 
@@ -0,0 +1,161 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from datetime import date
+from decimal import Decimal
+from fastapi import HTTPException
+
+from src.services.fine_service import FineService
+from src.models.fine_model import FineStatus
+
+SAMPLE_FINE = {
+    "fine_id": 1,
+    "transaction_id": 10,
+    "member_id": 1,
+    "days_overdue": 3,
+    "amount": Decimal("30.00"),
+    "fine_date": date(2024, 1, 10),
+    "paid_date": None,
+    "reason": "Overdue",
+    "status": "Unpaid"
+}
+
+
+@pytest.fixture
+def mock_pool():
+    """Mock database connection pool"""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_connect_db(mock_pool):
+    """Mock connect_db function"""
+    with patch('src.services.fine_service.connect_db', return_value=mock_pool):
+        yield mock_pool
+
+
+class TestFineService:
+
+    # ===========================
+    # Test assess_fines method
+    # ===========================
+
+    @pytest.mark.asyncio
+    async def test_assess_fines(self, mock_connect_db):
+        """Test that the assessment runs once as a single set-based repository call"""
+        # Arrange
+        with patch('src.services.fine_service.FineRepository.assess_overdue_fines',
+                   new_callable=AsyncMock) as mock_assess, \
+                patch('src.services.fine_service.BookLibraryConfig.FINE_PER_DAY', 10), \
+                patch('src.services.fine_service.date') as mock_date:
+            mock_assess.return_value = {"created": 2, "updated": 5}
+            mock_date.today.return_value = date(2024, 1, 10)
+
+            # Act
+            result = await FineService.assess_fines()
+
+            # Assert
+            mock_assess.assert_called_once_with(mock_connect_db, date(2024, 1, 10), 10)
+            assert result == {
+                "message": "Fines assessed",
+                "as_of": date(2024, 1, 10),
+                "created": 2,
+                "updated": 5
+            }
+
+    # ===============================
+    # Test get_member_fines method
+    # ===============================
+
+    @pytest.mark.asyncio
+    async def test_get_member_fines_outstanding_total(self, mock_connect_db):
+        """Test that only unpaid fines count toward the outstanding amount"""
+        # Arrange
+        paid_fine = {**SAMPLE_FINE, "fine_id": 2, "amount": Decimal("50.00"), "status": "Paid"}
+
+        with patch('src.services.fine_service.FineRepository.get_fines_by_member',
+                   new_callable=AsyncMock) as mock_get_fines:
+            mock_get_fines.return_value = [SAMPLE_FINE, paid_fine]
+
+            # Act
+            result = await FineService.get_member_fines(1)
+
+            # Assert
+            mock_get_fines.assert_called_once_with(mock_connect_db, 1, None)
+            assert result == {
+                "member_id": 1,
+                "outstanding_amount": Decimal("30.00"),
+                "fines": [SAMPLE_FINE, paid_fine]
+            }
+
+    @pytest.mark.asyncio
+    async def test_get_member_fines_status_filter(self, mock_connect_db):
+        """Test that the status filter is passed down to SQL"""
+        # Arrange
+        with patch('src.services.fine_service.FineRepository.get_fines_by_member',
+                   new_callable=AsyncMock) as mock_get_fines:
+            mock_get_fines.return_value = []
+
+            # Act
+            result = await FineService.get_member_fines(1, FineStatus.UNPAID)
+
+            # Assert
+            mock_get_fines.assert_called_once_with(mock_connect_db, 1, "Unpaid")
+            assert result["outstanding_amount"] == Decimal("0")
+
+    # ===========================
+    # Test pay_fine method
+    # ===========================
+
+    @pytest.mark.asyncio
+    async def test_pay_fine_success(self, mock_connect_db):
+        """Test paying an unpaid fine"""
+        # Arrange
+        paid = {**SAMPLE_FINE, "status": "Paid", "paid_date": date.today()}
+
+        with patch('src.services.fine_service.FineRepository.settle_fine',
+                   new_callable=AsyncMock) as mock_settle:
+            mock_settle.return_value = paid
+
+            # Act
+            result = await FineService.pay_fine(1)
+
+            # Assert
+            mock_settle.assert_called_once_with(mock_connect_db, 1, "Paid", date.today())
+            assert result == {"message": "Fine paid", "fine": paid}
+
+    @pytest.mark.asyncio
+    async def test_pay_fine_not_found(self, mock_connect_db):
+        """Test paying a fine that does not exist"""
+        # Arrange
+        with patch('src.services.fine_service.FineRepository.settle_fine',
+                   new_callable=AsyncMock) as mock_settle, \
+                patch('src.services.fine_service.FineRepository.get_fine',
+                      new_callable=AsyncMock) as mock_get_fine:
+            mock_settle.return_value = None
+            mock_get_fine.return_value = None
+
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc_info:
+                await FineService.pay_fine(999)
+
+            assert exc_info.value.status_code == 404
+            assert exc_info.value.detail == "Fine not found"
+
+    @pytest.mark.asyncio
+    async def test_waive_fine_already_paid(self, mock_connect_db):
+        """Test that a settled fine cannot be settled again"""
+        # Arrange
+        with patch('src.services.fine_service.FineRepository.settle_fine',
+                   new_callable=AsyncMock) as mock_settle, \
+                patch('src.services.fine_service.FineRepository.get_fine',
+                      new_callable=AsyncMock) as mock_get_fine:
+            mock_settle.return_value = None
+            mock_get_fine.return_value = {**SAMPLE_FINE, "status": "Paid"}
+
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc_info:
+                await FineService.waive_fine(1)
+
+            mock_settle.assert_called_once_with(mock_connect_db, 1, "Waived", None)
+            assert exc_info.value.status_code == 409
+            assert exc_info.value.detail == "Fine is already Paid"
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from src.db import SingleConnectionPool, connect_db
+from src.services.idempotency_service import IdempotencyService
+
+
+class FakeConnection:
+    """Connection whose transaction() records whether it committed or rolled back"""
+
+    def __init__(self):
+        self.outcome = None
+
+    @asynccontextmanager
+    async def _transaction(self):
+        try:
+            yield
+        except BaseException:
+            self.outcome = "rolled back"
+            raise
+        self.outcome = "committed"
+
+    def transaction(self):
+        return self._transaction()
+
+
+@pytest.fixture
+def mock_conn():
+    return FakeConnection()
+
+
+@pytest.fixture
+def mock_pool(mock_conn):
+    """Mock database connection pool handing out mock_conn"""
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=mock_conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool
+
+
+@pytest.fixture
+def mock_connect_db(mock_pool):
+    """Mock connect_db function"""
+    with patch('src.services.idempotency_service.connect_db', return_value=mock_pool):
+        yield mock_pool
+
+
+@pytest.fixture
+def mock_repository():
+    """Patch every IdempotencyRepository method used by the service"""
+    base = 'src.services.idempotency_service.IdempotencyRepository'
+    with patch(f'{base}.get_entry', new_callable=AsyncMock) as get_entry, \
+            patch(f'{base}.claim', new_callable=AsyncMock) as claim, \
+            patch(f'{base}.complete', new_callable=AsyncMock) as complete:
+        yield {"get_entry": get_entry, "claim": claim, "complete": complete}
+
+
+class TestIdempotencyService:
+
+    # ===========================
+    # Test run method
+    # ===========================
+
+    @pytest.mark.asyncio
+    async def test_first_request_runs_and_stores_result(self, mock_connect_db, mock_conn, mock_repository):
+        """Test that a new key runs the operation once and stores its result in the same transaction"""
+        # Arrange
+        mock_repository["get_entry"].return_value = None
+        mock_repository["claim"].return_value = True
+        operation = AsyncMock(return_value={"message": "Book issued successfully", "transaction_id": 1})
+
+        # Act
+        result = await IdempotencyService.run("issue", "key-1", "1:2", operation)
+
+        # Assert
+        operation.assert_awaited_once()
+        mock_repository["complete"].assert_called_once_with(
+            ANY, "issue", "key-1", {"message": "Book issued successfully", "transaction_id": 1}
+        )
+        bound = mock_repository["complete"].call_args.args[0]
+        assert isinstance(bound, SingleConnectionPool) and bound.conn is mock_conn
+        assert mock_conn.outcome == "committed"
+        assert result == {"message": "Book issued successfully", "transaction_id": 1}
+
+    @pytest.mark.asyncio
+    async def test_operation_runs_on_the_claiming_connection(self, mock_connect_db, mock_conn, mock_repository):
+        """Test that repository calls made by the operation share the claim's transaction"""
+        # Arrange
+        mock_repository["get_entry"].return_value = None
+        mock_repository["claim"].return_value = True
+        seen = {}
+
+        async def operation():
+            seen["pool"] = await connect_db()
+            return {"message": "Book returned successfully"}
+
+        # Act
+        await IdempotencyService.run("return", "key-2", "5", operation)
+
+        # Assert
+        assert seen["pool"].conn is mock_conn
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_stored_result(self, mock_connect_db, mock_repository):
+        """Test that a retry is answered from the stored entry without running the operation"""
+        # Arrange
+        stored = {"message": "Book issued successfully", "transaction_id": 1}
+        mock_repository["get_entry"].return_value = {"fingerprint": "1:2", "response": stored}
+        operation = AsyncMock()
+
+        # Act
+        result = await IdempotencyService.run("issue", "key-1", "1:2", operation)
+
+        # Assert
+        operation.assert_not_awaited()
+        mock_repository["claim"].assert_not_called()
+        assert isinstance(result, JSONResponse)
+        assert result.headers["Idempotent-Replayed"] == "true"
+        assert json.loads(result.body) == stored
+
+    @pytest.mark.asyncio
+    async def test_concurrent_request_replays_after_losing_claim(self, mock_connect_db, mock_repository):
+        """Test that a request that loses the claim replays the winner's committed result"""
+        # Arrange
+        stored = {"message": "Book issued successfully", "transaction_id": 1}
+        mock_repository["get_entry"].side_effect = [None, {"fingerprint": "1:2", "response": stored}]
+        mock_repository["claim"].return_value = False
+        operation = AsyncMock()
+
+        # Act
+        result = await IdempotencyService.run("issue", "key-1", "1:2", operation)
+
+        # Assert
+        operation.assert_not_awaited()
+        assert json.loads(result.body) == stored
+
+    @pytest.mark.asyncio
+    async def test_key_reused_for_different_request(self, mock_connect_db, mock_repository):
+        """Test that a key cannot be replayed for different parameters"""
+        # Arrange
+        mock_repository["get_entry"].return_value = {"fingerprint": "1:2", "response": {}}
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await IdempotencyService.run("issue", "key-1", "9:9", AsyncMock())
+
+        assert exc_info.value.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_database_error_is_rolled_back(self, mock_connect_db, mock_conn, mock_repository):
+        """Test that a transient database error is returned but neither stored nor committed"""
+        # Arrange
+        mock_repository["get_entry"].return_value = None
+        mock_repository["claim"].return_value = True
+        operation = AsyncMock(return_value={"error": "Database error: connection lost"})
+
+        # Act
+        result = await IdempotencyService.run("return", "key-2", "5", operation)
+
+        # Assert
+        mock_repository["complete"].assert_not_called()
+        assert mock_conn.outcome == "rolled back"
+        assert result == {"error": "Database error: connection lost"}
+
+    @pytest.mark.asyncio
+    async def test_cancellation_rolls_back_claim_and_work(self, mock_connect_db, mock_conn, mock_repository):
+        """Test that a request cancelled mid-operation leaves no claim for the retry to trip over"""
+        # Arrange
+        mock_repository["get_entry"].return_value = None
+        mock_repository["claim"].return_value = True
+        operation = AsyncMock(side_effect=asyncio.CancelledError)
+
+        # Act & Assert
+        with pytest.raises(asyncio.CancelledError):
+            await IdempotencyService.run("issue", "key-1", "1:2", operation)
+
+        mock_repository["complete"].assert_not_called()
+        assert mock_conn.outcome == "rolled back"
@@ -1,3 +1,4 @@
+import json
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch, Mock
@@ -5,6 +6,7 @@ from fastapi import HTTPException
 from asyncpg.exceptions import UniqueViolationError
 
 from src.services.member_service import MemberService
+from src.utils.serialization import DataFormat
 
 # Sample test data
 SAMPLE_MEMBER_DATA = {
@@ -19,7 +21,8 @@ SAMPLE_MEMBER_DATA = {
 SAMPLE_MEMBER_RESPONSE = {
     "member_id": 1,
     **SAMPLE_MEMBER_DATA,
-    "membership_date": "2024-01-01"
+    "membership_date": "2024-01-01",
+    "row_version": 1
 }
 
 SAMPLE_MEMBERS_LIST = [
@@ -162,6 +165,88 @@ class TestMemberService:
             # Assert
             assert str(exc_info.value) == "Database error"
 
+    # ==================================
+    # Test conditional GET (ETag) support
+    # ==================================
+
+    @pytest.mark.asyncio
+    async def test_get_member_conditional_not_modified(self, mock_connect_db):
+        """Test that a matching If-None-Match yields 304"""
+        # Arrange
+        etag = MemberService.member_etag(SAMPLE_MEMBER_RESPONSE)
+
+        with patch('src.services.member_service.MemberRepository.get_member',
+                   new_callable=AsyncMock) as mock_get_member:
+            mock_get_member.return_value = SAMPLE_MEMBER_RESPONSE
+
+            # Act
+            fresh = await MemberService.get_member_conditional(1)
+            cached = await MemberService.get_member_conditional(1, etag)
+
+            # Assert
+            assert fresh.status_code == 200
+            assert fresh.headers["etag"] == etag
+            assert cached.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_get_all_members_conditional_not_modified_skips_query(self, mock_connect_db):
+        """Test that an unchanged members list is answered from the table version alone"""
+        # Arrange
+        with patch('src.services.member_service.TableVersionRepository.get_version',
+                   new_callable=AsyncMock) as mock_get_version, \
+                patch('src.services.member_service.MemberRepository.get_all_members',
+                      new_callable=AsyncMock) as mock_get_all_members:
+            mock_get_version.return_value = 3
+            mock_get_all_members.return_value = SAMPLE_MEMBERS_LIST
+            first = await MemberService.get_all_members_conditional()
+
+            # Act
+            second = await MemberService.get_all_members_conditional(if_none_match=first.headers["etag"])
+
+            # Assert
+            mock_get_version.assert_called_with(mock_connect_db, "members")
+            mock_get_all_members.assert_called_once()
+            assert json.loads(first.body) == SAMPLE_MEMBERS_LIST
+            assert second.status_code == 304
+
+    # ============================
+    # Test batch_get_members method
+    # ============================
+
+    @pytest.mark.asyncio
+    async def test_batch_get_members_request_order(self, mock_connect_db):
+        """Test that results follow request order with not-found markers, in one query"""
+        # Arrange
+        with patch('src.services.member_service.MemberRepository.get_members_by_ids',
+                   new_callable=AsyncMock) as mock_get_by_ids:
+            mock_get_by_ids.return_value = SAMPLE_MEMBERS_LIST
+
+            # Act
+            result = await MemberService.batch_get_members([2, 3, 1, 2])
+
+            # Assert
+            mock_get_by_ids.assert_called_once_with(mock_connect_db, [2, 3, 1])
+            assert result == {"results": [
+                {"member_id": 2, "found": True, "member": SAMPLE_MEMBERS_LIST[1]},
+                {"member_id": 3, "found": False},
+                {"member_id": 1, "found": True, "member": SAMPLE_MEMBERS_LIST[0]},
+                {"member_id": 2, "found": True, "member": SAMPLE_MEMBERS_LIST[1]},
+            ]}
+
+    @pytest.mark.asyncio
+    async def test_batch_get_members_none_found(self, mock_connect_db):
+        """Test a batch where no member exists"""
+        # Arrange
+        with patch('src.services.member_service.MemberRepository.get_members_by_ids',
+                   new_callable=AsyncMock) as mock_get_by_ids:
+            mock_get_by_ids.return_value = []
+
+            # Act
+            result = await MemberService.batch_get_members([7])
+
+            # Assert
+            assert result == {"results": [{"member_id": 7, "found": False}]}
+
     # ==========================
     # Test get_all_members method
     # ==========================
@@ -188,7 +273,7 @@ class TestMemberService:
             result = await MemberService.get_all_members()
 
             # Assert
-            mock_get_all_members.assert_called_once_with(mock_connect_db)
+            mock_get_all_members.assert_called_once_with(mock_connect_db, None)
             assert result == SAMPLE_MEMBERS_LIST
             assert len(result) == 2
 
@@ -204,7 +289,7 @@ class TestMemberService:
             result = await MemberService.get_all_members()
 
             # Assert
-            mock_get_all_members.assert_called_once_with(mock_connect_db)
+            mock_get_all_members.assert_called_once_with(mock_connect_db, None)
             assert result == []
 
     @pytest.mark.asyncio
@@ -222,6 +307,69 @@ class TestMemberService:
             # Assert
             assert str(exc_info.value) == "Database error"
 
+    # ==========================
+    # Test export_members method
+    # ==========================
+
+    @pytest.mark.asyncio
+    async def test_export_members_ndjson(self, mock_connect_db):
+        """Test exporting members streams one JSON document per line"""
+        # Arrange
+        async def fake_stream(pool, prefetch):
+            for member in SAMPLE_MEMBERS_LIST:
+                yield member
+
+        with patch('src.services.member_service.MemberRepository.stream_members',
+                   side_effect=fake_stream) as mock_stream:
+            # Act
+            response = await MemberService.export_members(DataFormat.NDJSON)
+            body = "".join([chunk async for chunk in response.body_iterator])
+
+            # Assert
+            mock_stream.assert_called_once_with(mock_connect_db, 1000)
+            assert response.headers["content-disposition"] == 'attachment; filename="members.ndjson"'
+            assert [json.loads(line) for line in body.splitlines()] == SAMPLE_MEMBERS_LIST
+
+    @pytest.mark.asyncio
+    async def test_export_members_empty(self, mock_connect_db):
+        """Test exporting an empty members table produces an empty body"""
+        # Arrange
+        async def fake_stream(pool, prefetch):
+            return
+            yield
+
+        with patch('src.services.member_service.MemberRepository.stream_members', side_effect=fake_stream):
+            # Act
+            response = await MemberService.export_members(DataFormat.CSV)
+            body = "".join([chunk async for chunk in response.body_iterator])
+
+            # Assert
+            assert body == ""
+
+    @pytest.mark.asyncio
+    async def test_get_all_members_with_fields(self, mock_connect_db):
+        """Test that a fields projection skips columns such as address"""
+        # Arrange
+        with patch('src.services.member_service.MemberRepository.get_all_members',
+                   new_callable=AsyncMock) as mock_get_all_members:
+            mock_get_all_members.return_value = []
+
+            # Act
+            await MemberService.get_all_members("first_name,last_name")
+
+            # Assert
+            mock_get_all_members.assert_called_once_with(mock_connect_db, ["member_id", "first_name", "last_name"])
+
+    @pytest.mark.asyncio
+    async def test_get_all_members_unknown_field(self, mock_connect_db):
+        """Test that a column outside the whitelist is refused"""
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await MemberService.get_all_members("password")
+
+        # Assert
+        assert exc_info.value.status_code == 400
+
     # ==========================
     # Test update_member method
     # ==========================
@@ -0,0 +1,165 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.cache import book_cache, isbn_miss_cache
+from src.tasks.change_feed import dispatch, parse_payload, reset_all, run_change_feed, _on_notification
+
+
+@pytest.fixture
+def subscribers():
+    """Isolated subscriber registry"""
+    registry = {}
+    with patch('src.tasks.change_feed._subscribers', registry):
+        yield registry
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    book_cache.clear()
+    isbn_miss_cache.clear()
+    yield
+    book_cache.clear()
+    isbn_miss_cache.clear()
+
+
+class TestChangeFeed:
+
+    # ==================== parse_payload Tests ====================
+
+    def test_parse_payload_with_ids(self):
+        """Test that a row-level event keeps its ids and extra columns"""
+        # Arrange
+        payload = json.dumps({"t": "books", "op": "UPDATE", "ids": [1, 2], "isbn": ["9780451524935"]})
+
+        # Act
+        event = parse_payload(payload)
+
+        # Assert
+        assert event == {"table": "books", "op": "UPDATE", "ids": [1, 2], "isbn": ["9780451524935"]}
+
+    def test_parse_payload_table_wide(self):
+        """Test that an oversized or TRUNCATE event becomes ids=None"""
+        # Act
+        event = parse_payload(json.dumps({"t": "books", "op": "TRUNCATE", "all": True}))
+
+        # Assert
+        assert event == {"table": "books", "op": "TRUNCATE", "ids": None}
+
+    @pytest.mark.parametrize("payload", ["not json", "[]", json.dumps({"op": "UPDATE", "ids": [1]})])
+    def test_parse_payload_malformed(self, payload):
+        """Test that malformed payloads are rejected"""
+        assert parse_payload(payload) is None
+
+    # ==================== dispatch Tests ====================
+
+    def test_dispatch_only_calls_table_subscribers(self, subscribers):
+        """Test that events reach the callbacks of their own table only"""
+        # Arrange
+        books_callback = MagicMock()
+        members_callback = MagicMock()
+        subscribers["books"] = [books_callback]
+        subscribers["members"] = [members_callback]
+
+        # Act
+        _on_notification(None, 1, "library_changes", json.dumps({"t": "books", "op": "DELETE", "ids": [7]}))
+
+        # Assert
+        books_callback.assert_called_once_with({"table": "books", "op": "DELETE", "ids": [7]})
+        members_callback.assert_not_called()
+
+    def test_dispatch_survives_failing_callback(self, subscribers):
+        """Test that one failing callback does not stop the others"""
+        # Arrange
+        failing = MagicMock(side_effect=RuntimeError("boom"))
+        healthy = MagicMock()
+        subscribers["books"] = [failing, healthy]
+
+        # Act
+        dispatch({"table": "books", "op": "UPDATE", "ids": [1]})
+
+        # Assert
+        healthy.assert_called_once()
+
+    def test_reset_all(self, subscribers):
+        """Test that a reconnect tells every subscriber its whole table may have changed"""
+        # Arrange
+        callback = MagicMock()
+        subscribers["books"] = [callback]
+
+        # Act
+        reset_all()
+
+        # Assert
+        callback.assert_called_once_with({"table": "books", "op": "RESET", "ids": None})
+
+    # ==================== Cache invalidation Tests ====================
+
+    def test_books_update_invalidates_cached_rows(self):
+        """Test that a books event from another worker evicts exactly the changed rows"""
+        # Arrange
+        book_cache.set(1, {"book_id": 1})
+        book_cache.set(2, {"book_id": 2})
+
+        # Act
+        _on_notification(None, 1, "library_changes", json.dumps({"t": "books", "op": "UPDATE", "ids": [1], "isbn": []}))
+
+        # Assert
+        assert book_cache.get(1) is None
+        assert book_cache.get(2) == {"book_id": 2}
+
+    def test_books_insert_clears_isbn_miss(self):
+        """Test that inserting a book forgets its ISBN as unknown, whatever its stored spelling"""
+        # Arrange
+        isbn_miss_cache.set("9780451524935", True)
+        isbn_miss_cache.set("9780140449136", True)
+
+        # Act
+        _on_notification(None, 1, "library_changes",
+                         json.dumps({"t": "books", "op": "INSERT", "ids": [3], "isbn": ["0-451-52493-4"]}))
+
+        # Assert
+        assert isbn_miss_cache.get("9780451524935") is None
+        assert isbn_miss_cache.get("9780140449136") is True
+
+    def test_books_table_wide_clears_caches(self):
+        """Test that a table-wide event empties both book caches"""
+        # Arrange
+        book_cache.set(1, {"book_id": 1})
+        isbn_miss_cache.set("9780451524935", True)
+
+        # Act
+        _on_notification(None, 1, "library_changes", json.dumps({"t": "books", "op": "TRUNCATE", "all": True}))
+
+        # Assert
+        assert book_cache.get(1) is None
+        assert isbn_miss_cache.get("9780451524935") is None
+
+    # ==================== run_change_feed Tests ====================
+
+    @pytest.mark.asyncio
+    async def test_unanswered_probe_reconnects(self, subscribers):
+        """Test that a probe timing out on a half-open connection drops it and reconnects"""
+        # Arrange
+        connection = MagicMock()
+        connection.add_listener = AsyncMock()
+        connection.execute = AsyncMock(side_effect=asyncio.TimeoutError)
+        connection.is_closed.return_value = False
+
+        with patch('src.tasks.change_feed.asyncpg.connect', new_callable=AsyncMock) as mock_connect, \
+                patch('src.tasks.change_feed.asyncio.sleep', new_callable=AsyncMock), \
+                patch('src.tasks.change_feed.BookLibraryConfig.CHANGE_FEED_KEEPALIVE_SECONDS', 0.01), \
+                patch('src.tasks.change_feed.BookLibraryConfig.CHANGE_FEED_PROBE_TIMEOUT_SECONDS', 5):
+            mock_connect.side_effect = [connection, asyncio.CancelledError()]
+
+            # Act
+            with pytest.raises(asyncio.CancelledError):
+                await run_change_feed("postgresql://test")
+
+            # Assert
+            connection.execute.assert_awaited_once_with("SELECT 1", timeout=5)
+            connection.terminate.assert_called_once()
+            assert mock_connect.await_count == 2
+
@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from datetime import datetime
+
+from src.tasks.overdue_sweeper import seconds_until_next_sweep, sweep_overdue, ROLLOVER_GRACE_SECONDS
+
+
+@pytest.fixture
+def mock_pool():
+    """Mock database connection pool"""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_connect_db(mock_pool):
+    """Mock connect_db function"""
+    with patch('src.tasks.overdue_sweeper.connect_db', return_value=mock_pool):
+        yield mock_pool
+
+
+class TestOverdueSweeper:
+
+    # ====================================
+    # Test seconds_until_next_sweep
+    # ====================================
+
+    def test_sleeps_full_interval_during_the_day(self):
+        """Test that the interval is used when midnight is further away"""
+        # Act
+        result = seconds_until_next_sweep(datetime(2024, 1, 10, 12, 0, 0), 3600)
+
+        # Assert
+        assert result == 3600
+
+    def test_wakes_up_after_date_rollover(self):
+        """Test that the sleep is cut short so a sweep runs right after midnight"""
+        # Act
+        result = seconds_until_next_sweep(datetime(2024, 1, 10, 23, 50, 0), 3600)
+
+        # Assert
+        assert result == 600 + ROLLOVER_GRACE_SECONDS
+
+    # ===========================
+    # Test sweep_overdue
+    # ===========================
+
+    @pytest.mark.asyncio
+    async def test_sweep_overdue(self, mock_connect_db):
+        """Test that a sweep delegates to the repository update"""
+        # Arrange
+        with patch('src.tasks.overdue_sweeper.BookTransactionRepository.update_overdue_status',
+                   new_callable=AsyncMock) as mock_update_status:
+            mock_update_status.return_value = 3
+
+            # Act
+            result = await sweep_overdue()
+
+            # Assert
+            mock_update_status.assert_called_once_with(mock_connect_db)
+            assert result == 3
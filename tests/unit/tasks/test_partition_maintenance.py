@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.tasks.partition_maintenance import maintain_partitions
+
+
+@pytest.fixture
+def mock_pool():
+    """Mock database connection pool"""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_connect_db(mock_pool):
+    """Mock connect_db function"""
+    with patch('src.tasks.partition_maintenance.connect_db', return_value=mock_pool):
+        yield mock_pool
+
+
+class TestPartitionMaintenance:
+
+    @pytest.mark.asyncio
+    async def test_maintain_partitions(self, mock_connect_db):
+        """Test that maintenance passes the configured horizon and retention to the database"""
+        # Arrange
+        actions = [
+            {"action": "created", "partition_name": "book_transactions_p2024_04"},
+            {"action": "archived", "partition_name": "book_transactions_p2021_12"},
+        ]
+
+        with patch('src.tasks.partition_maintenance.BookTransactionRepository.maintain_partitions',
+                   new_callable=AsyncMock) as mock_maintain, \
+                patch('src.tasks.partition_maintenance.BookLibraryConfig.PARTITION_MONTHS_AHEAD', 3), \
+                patch('src.tasks.partition_maintenance.BookLibraryConfig.PARTITION_ARCHIVE_AFTER_MONTHS', 24):
+            mock_maintain.return_value = actions
+
+            # Act
+            result = await maintain_partitions()
+
+            # Assert
+            mock_maintain.assert_called_once_with(mock_connect_db, 3, 24)
+            assert result == actions